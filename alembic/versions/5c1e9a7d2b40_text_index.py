@@ -0,0 +1,64 @@
+"""review / qna keyword and aspect index
+
+Revision ID: 5c1e9a7d2b40
+Revises: 0b042fa2efd0
+Create Date: 2026-10-19 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a7d2b40'
+down_revision: Union[str, Sequence[str], None] = '0b042fa2efd0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('text_index_docs',
+    sa.Column('source', sa.String(length=10), nullable=False),
+    sa.Column('doc_id', sa.String(length=50), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sentiment', sa.String(length=10), nullable=False),
+    sa.Column('sentiment_score', sa.Float(), nullable=True),
+    sa.Column('aspects', sa.JSON(), nullable=True),
+    sa.Column('indexed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('source', 'doc_id')
+    )
+    op.create_index('ix_text_index_docs_source_product', 'text_index_docs', ['source', 'product_id'], unique=False)
+    op.create_table('text_term_counts',
+    sa.Column('source', sa.String(length=10), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('term', sa.String(length=100), nullable=False),
+    sa.Column('doc_count', sa.Integer(), nullable=False),
+    sa.Column('positive', sa.Integer(), nullable=False),
+    sa.Column('negative', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('source', 'product_id', 'day', 'term')
+    )
+    op.create_index('ix_text_term_counts_source_day', 'text_term_counts', ['source', 'day'], unique=False)
+    op.create_table('text_aspect_counts',
+    sa.Column('source', sa.String(length=10), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('aspect', sa.String(length=20), nullable=False),
+    sa.Column('mentions', sa.Integer(), nullable=False),
+    sa.Column('positive', sa.Integer(), nullable=False),
+    sa.Column('negative', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('source', 'product_id', 'day', 'aspect')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('text_aspect_counts')
+    op.drop_index('ix_text_term_counts_source_day', table_name='text_term_counts')
+    op.drop_table('text_term_counts')
+    op.drop_index('ix_text_index_docs_source_product', table_name='text_index_docs')
+    op.drop_table('text_index_docs')
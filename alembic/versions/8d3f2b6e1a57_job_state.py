@@ -0,0 +1,34 @@
+"""job state for incremental jobs
+
+Revision ID: 8d3f2b6e1a57
+Revises: 5c1e9a7d2b40
+Create Date: 2026-10-19 11:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f2b6e1a57'
+down_revision: Union[str, Sequence[str], None] = '5c1e9a7d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_state',
+    sa.Column('job_name', sa.String(length=50), nullable=False),
+    sa.Column('watermark', sa.DateTime(), nullable=True),
+    sa.Column('state_json', sa.JSON(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('job_name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_state')
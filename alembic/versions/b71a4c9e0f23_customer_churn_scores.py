@@ -0,0 +1,40 @@
+"""customer churn scores
+
+Revision ID: b71a4c9e0f23
+Revises: 8d3f2b6e1a57
+Create Date: 2026-10-19 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71a4c9e0f23'
+down_revision: Union[str, Sequence[str], None] = '8d3f2b6e1a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_churn_scores',
+    sa.Column('customer_id', sa.String(length=50), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('risk_level', sa.String(length=10), nullable=False),
+    sa.Column('features', sa.JSON(), nullable=True),
+    sa.Column('top_factors', sa.JSON(), nullable=True),
+    sa.Column('scored_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('customer_id')
+    )
+    op.create_index('ix_customer_churn_scores_score', 'customer_churn_scores', ['score'], unique=False)
+    op.create_index('ix_customer_churn_scores_risk_score', 'customer_churn_scores', ['risk_level', 'score'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customer_churn_scores_risk_score', table_name='customer_churn_scores')
+    op.drop_index('ix_customer_churn_scores_score', table_name='customer_churn_scores')
+    op.drop_table('customer_churn_scores')
@@ -0,0 +1,46 @@
+"""llm usage
+
+Revision ID: e4a8c2d61b95
+Revises: b71a4c9e0f23
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8c2d61b95'
+down_revision: Union[str, Sequence[str], None] = 'b71a4c9e0f23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_usage',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('caller', sa.String(length=50), nullable=False),
+    sa.Column('session_type', sa.String(length=20), nullable=True),
+    sa.Column('model', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+    sa.Column('completion_tokens', sa.Integer(), nullable=False),
+    sa.Column('cached_tokens', sa.Integer(), nullable=False),
+    sa.Column('estimated', sa.Boolean(), nullable=False),
+    sa.Column('cost_usd', sa.Float(), nullable=True),
+    sa.Column('latency_ms', sa.Float(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('trace_id', sa.String(length=32), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_llm_usage_created_at', 'llm_usage', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_llm_usage_created_at', table_name='llm_usage')
+    op.drop_table('llm_usage')
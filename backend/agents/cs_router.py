@@ -0,0 +1,165 @@
+"""
+CS Fast-Path Router.
+Scores retrieval confidence and question type to decide how much machinery a CS query needs:
+
+- "template": a high-confidence manual hit that carries a ready-made customer script is answered directly.
+- "light":    a confident manual hit is answered with a single completion, without tools.
+- "agent":    ambiguous, low-confidence or account-specific questions go to the full LangGraph agent.
+"""
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+from langchain_core.documents import Document
+
+from backend.config.settings import settings
+from backend.core.metrics import ROUTE_DECISIONS
+from backend.services.rag_service import rag_connector, RetrievalResult
+
+
+ROUTE_CACHE = "cache"
+ROUTE_TEMPLATE = "template"
+ROUTE_LIGHT = "light"
+ROUTE_AGENT = "agent"
+
+# Questions that reference a specific order, account or product need live data (tools)
+ACCOUNT_SPECIFIC_PATTERNS = [
+    re.compile(p) for p in (
+        r"ORD-\d+",
+        r"PO-\d+",
+        r"customer_\d+",
+        r"\b\d{7}\b",                   # originProductNo
+        r"주문\s*번호",
+        r"(제|내|저의|나의)\s*(주문|배송|택배|환불|반품|교환|결제|쿠폰|적립금)",
+        r"송장|운송장",
+        r"배송\s*조회",
+        r"언제\s*(와|오|도착|받)",
+        r"(환불|반품|교환|취소)\s*(됐|되었|처리\s*됐|진행\s*상황)",
+    )
+]
+
+# With a known customer, these imply a lookup of that customer's own orders ("배송 상태 확인해 주세요")
+# even without a possessive or an order number; without one they are policy questions
+ORDER_LOOKUP_PATTERNS = [
+    re.compile(p) for p in (
+        r"(주문|배송|택배|환불|반품|교환|결제)\s*(상태|현황|내역|확인)",
+        r"(아직|왜)\s*(안|못)\s*(왔|와|오|받|됐|되)",
+        r"(주문|배송|택배|물건|상품).{0,10}(어디|언제)",
+        r"(주문한|시킨|구매한|산)\s*(거|것|상품|물건)",
+    )
+]
+
+# Self-evolved rules embed a customer-facing script after this marker
+_SCRIPT_MARKER = re.compile(r"^Script:\s*(.+)$", re.MULTILINE | re.DOTALL)
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    reason: str
+    top_score: float = 0.0
+    documents: list[Document] = field(default_factory=list)
+    retrieval_trace: dict = field(default_factory=dict)
+    script: str | None = None  # customer script of the top hit (template route only)
+
+
+def extract_script(document: Document, score: float = 0.0) -> str | None:
+    """
+    The customer script of a retrieved manual entry, if it carries one.
+    A chunk can end mid-script, so chunk hits are always read from their whole parent rule;
+    when the parent cannot be rebuilt no script is returned rather than a truncated one.
+    """
+    if "chunk_index" in document.metadata:
+        document = rag_connector.expand_to_parents([document], [score])[0][0]
+        if "chunk_index" in document.metadata and document.metadata.get("chunk_count", 1) > 1:
+            return None
+    match = _SCRIPT_MARKER.search(document.page_content)
+    return match.group(1).strip() if match else None
+
+
+class RouteStats:
+    """Thread-safe counters of which path CS traffic takes (also exported as agent_route_decisions_total)."""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record(self, route: str) -> None:
+        with self._lock:
+            self._counts[route] += 1
+        ROUTE_DECISIONS.labels(self.agent, route).inc()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        return {
+            "total": total,
+            "routes": {
+                route: {"count": count, "share": round(count / total, 4) if total else 0.0}
+                for route, count in sorted(counts.items())
+            },
+        }
+
+
+route_stats = RouteStats("cs")
+
+
+def is_account_specific(query: str) -> bool:
+    """True if the question references a concrete order, customer or product."""
+    return any(p.search(query) for p in ACCOUNT_SPECIFIC_PATTERNS)
+
+
+def implies_order_lookup(query: str) -> bool:
+    """True if the question asks about the status of the asker's own orders."""
+    return any(p.search(query) for p in ORDER_LOOKUP_PATTERNS)
+
+
+def route_cs_query(query: str, customer_id: str = None) -> RouteDecision:
+    """
+    Decide which path a CS query takes.
+    Retrieval runs once here; the documents are handed to whichever path is chosen.
+    With a known `customer_id`, questions that imply an order lookup always go to the agent,
+    which can fetch that customer's orders with its tools.
+    """
+    try:
+        retrieval = rag_connector.retrieve(query)
+    except Exception as e:
+        print(f"RAG retrieval error: {e}")
+        retrieval = RetrievalResult()
+    # Adaptive-k selection: near-duplicates and passages far below the top hit are already gone
+    scored = retrieval.scored
+    documents = retrieval.documents
+    trace = retrieval.trace
+    top_score = scored[0][1] if scored else 0.0
+
+    if not settings.CS_FASTPATH_ENABLED:
+        return RouteDecision(ROUTE_AGENT, "fastpath_disabled", top_score, documents, trace)
+    if is_account_specific(query):
+        return RouteDecision(ROUTE_AGENT, "account_specific", top_score, documents, trace)
+    if customer_id and implies_order_lookup(query):
+        return RouteDecision(ROUTE_AGENT, "customer_order_lookup", top_score, documents, trace)
+    if not scored or top_score < settings.CS_FASTPATH_LIGHT_SCORE:
+        return RouteDecision(ROUTE_AGENT, "low_confidence", top_score, documents, trace)
+
+    # Two different manuals scoring almost the same means we can't be sure which policy applies
+    if len(scored) > 1:
+        runner_up_doc, runner_up_score = scored[1]
+        top_doc = scored[0][0]
+        same_topic = runner_up_doc.page_content == top_doc.page_content or (
+            runner_up_doc.metadata.get("parent_id") is not None
+            and runner_up_doc.metadata.get("parent_id") == top_doc.metadata.get("parent_id")
+        )
+        if not same_topic and top_score - runner_up_score < settings.CS_FASTPATH_AMBIGUITY_MARGIN:
+            return RouteDecision(ROUTE_AGENT, "ambiguous", top_score, documents, trace)
+
+    decision = RouteDecision(ROUTE_LIGHT, "manual_match", top_score, documents, trace)
+    if top_score >= settings.CS_FASTPATH_TEMPLATE_SCORE and documents:
+        # Resolved here (a worker thread): it may read the parent rule's chunks from Chroma
+        decision.script = extract_script(documents[0], top_score)
+        if decision.script:
+            decision.route = ROUTE_TEMPLATE
+            decision.reason = "manual_script"
+    return decision
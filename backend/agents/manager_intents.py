@@ -0,0 +1,236 @@
+"""
+Manager Intent Classifier.
+Recognises structured AI Manager questions ("미답변 문의 몇 건?", "재고 부족한 상품은?", ...) that map
+one-to-one onto a data function, runs that function and formats the answer from a template.
+Anything open-ended falls back to the LLM planner in manager_agent_graph.
+"""
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.prompts.templates import MANAGER_DIRECT_TEMPLATES as T
+from backend.services.rag_service import rag_connector
+from backend.agents.cs_router import RouteStats
+from backend.database.legacy import (
+    get_unanswered_qnas_count,
+    get_pending_claims_count,
+    get_low_stock_products_count,
+    get_low_stock_products,
+    get_customers_by_segment,
+    calculate_product_margins,
+    get_recent_negative_reviews,
+)
+
+logger = logging.getLogger(__name__)
+
+
+ROUTE_DIRECT = "direct"
+
+# Requests for judgement, advice or multi-step analysis need the planner
+OPEN_ENDED_PATTERN = re.compile(r"왜|원인|분석|전략|조언|추천|제안|어떻게|방안|개선|비교|예측|계획|마케팅")
+# Policy questions ("반품 기간은 며칠이야?", "VIP 혜택 정책 뭐야?") mention the same nouns as the data intents
+POLICY_PATTERN = re.compile(r"정책|방법|어떻게|기간|규정|조건|혜택")
+
+SEGMENTS = {
+    "VIP": ("VIP", re.compile(r"vip|우수|단골", re.IGNORECASE)),
+    "CHURN_RISK": ("이탈 위험", re.compile(r"이탈|휴면|떠날|churn", re.IGNORECASE)),
+    "NEW": ("신규", re.compile(r"신규|새로운?\s*고객|첫\s*구매")),
+    "REGULAR": ("일반", re.compile(r"일반\s*고객|일반")),
+}
+
+# Keyword rules: every pattern in an intent's tuple must match
+KEYWORD_RULES = {
+    "unanswered_qnas": (re.compile(r"미답변|답변\s*(안|못|대기|없)|답변\s*하지"), re.compile(r"문의|qna|질문", re.IGNORECASE)),
+    "pending_claims": (re.compile(r"클레임|반품|교환"), re.compile(r"대기|미처리|처리\s*안|밀린")),
+    "low_stock": (re.compile(r"재고|품절"), re.compile(r"부족|없|품절|임박|낮|적은|위험|모자")),
+    "top_margin": (
+        re.compile(r"마진|이익|수익|잘\s*팔|많이\s*팔|효자|베스트|매출", re.IGNORECASE),
+        re.compile(r"상위|순위|제일|가장|목록|top|효자|베스트", re.IGNORECASE),
+    ),
+    "negative_reviews": (re.compile(r"리뷰|후기|평점|별점"), re.compile(r"부정|나쁜|악성|불만|낮은|안\s*좋|저평점|1점|2점")),
+    "customer_segment": (re.compile(r"고객|회원|명단|목록"), re.compile(r"vip|우수|단골|이탈|휴면|신규|일반", re.IGNORECASE)),
+    "store_kpis": (
+        re.compile(r"kpi|지표|현황|상황|요약|브리핑", re.IGNORECASE),
+        re.compile(r"스토어|오늘|전체|kpi|지표", re.IGNORECASE),
+    ),
+}
+
+# Example utterances for the embedding fallback (paraphrases the keyword rules miss)
+INTENT_EXAMPLES = {
+    "store_kpis": ["오늘 스토어 현황 알려줘", "주요 지표 보여줘", "지금 처리할 일 요약해줘"],
+    "unanswered_qnas": ["미답변 문의 몇 개야?", "아직 답 안 한 질문 있어?", "고객 문의 쌓인 거 몇 건이야?"],
+    "pending_claims": ["처리 안 된 반품 몇 건이야?", "교환 요청 밀린 거 있어?", "클레임 대기 건수 알려줘"],
+    "low_stock": ["재고 부족한 상품 뭐야?", "곧 품절될 상품 알려줘", "재고 채워야 할 상품 목록"],
+    "top_margin": ["이번 주 마진 제일 높은 상품", "가장 돈 많이 번 상품이 뭐야?", "잘 팔리는 상품 순위 보여줘"],
+    "negative_reviews": ["최근 부정 리뷰 보여줘", "안 좋은 후기 들어온 거 있어?", "별점 낮은 리뷰 목록"],
+    "customer_segment": ["VIP 고객 명단 보여줘", "이탈 위험 고객 누구야?", "신규 고객 목록 알려줘"],
+}
+
+
+@dataclass
+class IntentMatch:
+    intent: str
+    method: str  # "keyword" | "embedding"
+    score: float = 1.0
+    params: dict = field(default_factory=dict)
+
+
+manager_route_stats = RouteStats("manager")
+
+_example_lock = threading.Lock()
+_example_matrix = None  # (n_examples, dim), L2-normalised
+_example_intents: list[str] = []
+
+
+def _extract_period_days(query: str, default: int = 7) -> int:
+    """Pull a look-back window out of phrases like '오늘', '이번 주', '이번 달', '14일'."""
+    match = re.search(r"(\d+)\s*일", query)
+    if match:
+        return max(1, int(match.group(1)))
+    if re.search(r"오늘|하루|어제", query):
+        return 1
+    if re.search(r"이번\s*달|한\s*달|월간", query):
+        return 30
+    if re.search(r"이번\s*주|일주일|주간", query):
+        return 7
+    return default
+
+
+def _extract_params(intent: str, query: str) -> dict:
+    if intent in ("top_margin", "negative_reviews"):
+        default = 1 if intent == "negative_reviews" else 7
+        return {"period_days": _extract_period_days(query, default=default)}
+    if intent == "customer_segment":
+        for segment, (_, pattern) in SEGMENTS.items():
+            if pattern.search(query):
+                return {"segment": segment}
+        return {"segment": "VIP"}
+    return {}
+
+
+def _keyword_match(query: str) -> str | None:
+    if POLICY_PATTERN.search(query):
+        return None
+    for intent, patterns in KEYWORD_RULES.items():
+        if all(p.search(query) for p in patterns):
+            return intent
+    return None
+
+
+def _load_examples() -> tuple[np.ndarray, list[str]]:
+    """Embed the example utterances once per process."""
+    global _example_matrix, _example_intents
+    with _example_lock:
+        if _example_matrix is None:
+            intents, texts = [], []
+            for intent, examples in INTENT_EXAMPLES.items():
+                intents.extend([intent] * len(examples))
+                texts.extend(examples)
+            vectors = np.asarray(rag_connector.embeddings.embed_documents(texts), dtype=np.float32)
+            _example_matrix = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            _example_intents = intents
+        return _example_matrix, _example_intents
+
+
+def _embedding_match(query: str) -> tuple[str, float] | None:
+    try:
+        matrix, intents = _load_examples()
+        vector = np.asarray(rag_connector.embeddings.embed_query(query), dtype=np.float32)
+    except Exception as e:
+        logger.warning(f"Intent embedding error: {e}")
+        return None
+    sims = matrix @ (vector / np.linalg.norm(vector))
+    best = int(np.argmax(sims))
+    if sims[best] < settings.MANAGER_INTENT_EMBED_THRESHOLD:
+        return None
+    return intents[best], float(sims[best])
+
+
+def classify_manager_intent(query: str) -> IntentMatch | None:
+    """Return the structured intent of a manager question, or None if the agent should handle it."""
+    if OPEN_ENDED_PATTERN.search(query) or POLICY_PATTERN.search(query):
+        return None
+    intent = _keyword_match(query)
+    if intent:
+        return IntentMatch(intent, "keyword", params=_extract_params(intent, query))
+    if settings.MANAGER_INTENT_EMBEDDINGS_ENABLED:
+        matched = _embedding_match(query)
+        if matched:
+            intent, score = matched
+            return IntentMatch(intent, "embedding", score, _extract_params(intent, query))
+    return None
+
+
+def _bullets(lines: list[str], limit: int = 10) -> str:
+    shown = [f"• {line}" for line in lines[:limit]]
+    if len(lines) > limit:
+        shown.append(f"• 외 {len(lines) - limit}건")
+    return "\n".join(shown)
+
+
+def answer_manager_intent(match: IntentMatch) -> tuple[str, str]:
+    """
+    Run the data function behind an intent and format the answer.
+    Returns (answer_text, data_function_name).
+    """
+    intent, params = match.intent, match.params
+
+    if intent == "store_kpis":
+        return T["store_kpis"].format(
+            unanswered_qnas=get_unanswered_qnas_count(),
+            pending_claims=get_pending_claims_count(),
+            low_stock_items=get_low_stock_products_count(),
+        ), "check_store_kpis"
+
+    if intent == "unanswered_qnas":
+        return T["unanswered_qnas"].format(count=get_unanswered_qnas_count()), "get_unanswered_qnas_count"
+
+    if intent == "pending_claims":
+        return T["pending_claims"].format(count=get_pending_claims_count()), "get_pending_claims_count"
+
+    if intent == "low_stock":
+        items = sorted(get_low_stock_products(), key=lambda p: p.get("stock_quantity") or 0)
+        if not items:
+            return T["low_stock_empty"], "get_inventory_warnings"
+        lines = [f"{p['product_name']} (재고 {p['stock_quantity']}개)" for p in items]
+        return T["low_stock"].format(count=len(items), items=_bullets(lines)), "get_inventory_warnings"
+
+    if intent == "top_margin":
+        period_days = params["period_days"]
+        margins = calculate_product_margins(period_days)
+        if not margins:
+            return T["top_margin_empty"].format(period_days=period_days), "get_product_sales_analytics"
+        lines = [
+            f"{p['product_name']}: 마진 {p['total_margin']:,}원 ({p['margin_percentage']:.1f}%), 판매 {p['total_quantity_sold']}개"
+            for p in margins[:5]
+        ]
+        return T["top_margin"].format(period_days=period_days, items=_bullets(lines)), "get_product_sales_analytics"
+
+    if intent == "negative_reviews":
+        period_days = params["period_days"]
+        period_label = "24시간 동안" if period_days == 1 else f"{period_days}일 동안"
+        reviews = get_recent_negative_reviews(hours=period_days * 24)
+        if not reviews:
+            return T["negative_reviews_empty"].format(period_label=period_label), "get_negative_reviews"
+        lines = [f"[{r['rating']}점] {r['review_text']}" for r in reviews]
+        return T["negative_reviews"].format(
+            period_label=period_label, count=len(reviews), items=_bullets(lines)
+        ), "get_negative_reviews"
+
+    if intent == "customer_segment":
+        segment = params["segment"]
+        segment_label = SEGMENTS[segment][0]
+        customers = get_customers_by_segment(segment)
+        if not customers:
+            return T["customer_segment_empty"].format(segment_label=segment_label), "get_customer_segment"
+        customers.sort(key=lambda c: c.get("total_spend") or 0, reverse=True)
+        lines = [f"{c['name']} ({c['customer_id']}) · 누적 {(c.get('total_spend') or 0):,}원 / {c['total_orders']}회" for c in customers]
+        return T["customer_segment"].format(
+            segment_label=segment_label, count=len(customers), items=_bullets(lines)
+        ), "get_customer_segment"
+
+    raise ValueError(f"Unknown manager intent: {intent}")
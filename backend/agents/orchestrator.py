@@ -1,11 +1,35 @@
 """
 Agent Orchestrator.
 Routes AI requests to the appropriate agent graph and handles caching.
+CS queries pass through a fast-path router first, so manual-covered questions skip the tool-calling agent.
+Structured manager questions are answered directly from the data functions, bypassing the LLM planner.
 """
-from langchain_core.messages import HumanMessage
-from backend.workflows.cs_agent import cs_agent_graph
-from backend.workflows.manager_agent import manager_agent_graph
+import asyncio
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from backend.workflows.cs_agent import get_cs_agent_graph, get_llm as get_cs_llm
+from backend.workflows.manager_agent import get_manager_agent_graph
 from backend.core.cache import get_cached, set_cached
+from backend.core.tracing import GraphTraceHandler, Trace, retrieved_ids, span, start_trace, usage_tokens
+from backend.config.settings import settings
+from backend.core.llm_gateway import llm_gateway, Priority, estimate_tokens
+from backend.core.llm_usage import usage_session
+from backend.prompts.templates import CS_SUGGESTION_PROMPT
+from backend.services.rag_service import format_context
+from backend.agents.cs_router import (
+    RouteDecision,
+    route_cs_query,
+    route_stats,
+    ROUTE_CACHE,
+    ROUTE_TEMPLATE,
+    ROUTE_AGENT,
+)
+from backend.agents.manager_intents import (
+    classify_manager_intent,
+    answer_manager_intent,
+    manager_route_stats,
+    ROUTE_DIRECT,
+)
 
 
 class AgentOrchestrator:
@@ -13,37 +37,89 @@ class AgentOrchestrator:
 
     def __init__(self, store_context: str):
         self.store_context = store_context
-        # Registry of available graphs
+        # Registry of available graphs (compiled on first use)
         self.graphs = {
-            "cs": cs_agent_graph,
-            "manager": manager_agent_graph,
+            "cs": get_cs_agent_graph,
+            "manager": get_manager_agent_graph,
         }
 
     async def invoke(self, session_type: str, query: str, customer_id: str = None) -> dict:
         """
         Invoke the appropriate AI graph.
-        Returns a dict with the text response and metadata.
+        Returns a dict with the text response and metadata (including the run's trace_id).
         """
+        with start_trace(session_type, query) as trace, usage_session(session_type):
+            result = await self._invoke(session_type, query, customer_id, trace)
+            if trace is not None:
+                trace.route = result.get("route")
+                result["trace_id"] = trace.trace_id
+            return result
+
+    async def _invoke(self, session_type: str, query: str, customer_id: str | None, trace: Trace | None) -> dict:
         # 1. Check Tier 1 runtime cache (diskcache)
         cached = get_cached(session_type, query)
         if cached:
+            if session_type == "cs":
+                route_stats.record(ROUTE_CACHE)
+            elif session_type == "manager":
+                manager_route_stats.record(ROUTE_CACHE)
             return {
                 "text": cached,
                 "cached": True,
                 "model_used": "cache",
-                "tool_calls": []
+                "tool_calls": [],
+                "route": ROUTE_CACHE,
             }
 
         # 2. Verify session type
         if session_type not in self.graphs:
             raise ValueError(f"Unknown session type: {session_type}")
-            
-        graph = self.graphs[session_type]
 
-        # 3. Build initial state
+        # 3. CS fast path: answer manual-covered questions without the tool-calling agent
+        decision = None
+        if session_type == "cs":
+            with span("route_cs_query", "router") as attributes:
+                decision = await asyncio.to_thread(route_cs_query, query, customer_id)
+                if attributes is not None:
+                    attributes.update(route=decision.route, top_score=round(decision.top_score, 4),
+                                      documents=retrieved_ids(decision.retrieval_trace))
+            route_stats.record(decision.route)
+            if decision.route != ROUTE_AGENT:
+                with span(f"fast_path:{decision.route}", "router") as attributes:
+                    response_text, model_used, tokens = await self._answer_fast_path(decision, query)
+                    if attributes is not None:
+                        attributes["tokens"] = tokens
+                set_cached(session_type, query, response_text)
+                return {
+                    "text": response_text,
+                    "cached": False,
+                    "model_used": model_used,
+                    "tool_calls": [],
+                    "route": decision.route,
+                }
+
+        # 3b. Manager direct path: structured questions skip the planner entirely
+        if session_type == "manager" and settings.MANAGER_INTENT_ENABLED:
+            match = await asyncio.to_thread(classify_manager_intent, query)
+            if match:
+                response_text, data_function = await asyncio.to_thread(answer_manager_intent, match)
+                manager_route_stats.record(ROUTE_DIRECT)
+                return {
+                    "text": response_text,
+                    "cached": False,
+                    "model_used": f"intent:{match.method}",
+                    "tool_calls": [data_function],
+                    "route": ROUTE_DIRECT,
+                }
+            manager_route_stats.record(ROUTE_AGENT)
+
+        graph = self.graphs[session_type]()
+
+        # 4. Build initial state (reuse the router's retrieval so the graph doesn't search twice)
         state = {
             "messages": [HumanMessage(content=query)],
-            "retrieved_context": "",
+            "retrieved_context": format_context(decision.documents) if decision and decision.documents else "",
+            "retrieval_trace": decision.retrieval_trace if decision else {},
             "tool_calls_made": [],
             "store_context": self.store_context,
             "session_type": session_type,
@@ -51,21 +127,45 @@ class AgentOrchestrator:
             "model_used": "",
         }
 
-        # 4. Run the graph
-        result = await graph.ainvoke(state)
+        # 5. Run the graph (a span per node and tool when traced)
+        config = {"callbacks": [GraphTraceHandler(trace)]} if trace is not None else None
+        result = await graph.ainvoke(state, config=config)
 
-        # 5. Extract results
+        # 6. Extract results
         response_msg = result["messages"][-1]
         response_text = response_msg.content
         model_used = result.get("model_used", "unknown")
         tools_used = result.get("tool_calls_made", [])
 
-        # 6. Cache the successful result
+        # 7. Cache the successful result
         set_cached(session_type, query, response_text)
 
         return {
             "text": response_text,
             "cached": False,
             "model_used": model_used,
-            "tool_calls": tools_used
+            "tool_calls": tools_used,
+            "route": ROUTE_AGENT,
         }
+
+    async def _answer_fast_path(self, decision: RouteDecision, query: str) -> tuple[str, str, int]:
+        """
+        Answer from the manual script, or with a single tool-free completion over the retrieved manuals.
+        Returns (text, model used, tokens spent).
+        """
+        if decision.route == ROUTE_TEMPLATE:
+            return decision.script, "manual_template", 0
+
+        system = CS_SUGGESTION_PROMPT.format(
+            store_context=self.store_context,
+            context=format_context(decision.documents),
+        )
+        messages = [SystemMessage(content=system), HumanMessage(content=query)]
+        response = await llm_gateway.call(
+            lambda: get_cs_llm().ainvoke(messages),
+            model=settings.CS_AGENT_MODEL,
+            caller="cs_fastpath",
+            priority=Priority.INTERACTIVE,
+            estimated_tokens=estimate_tokens(messages),
+        )
+        return response.content, settings.CS_AGENT_MODEL, usage_tokens(response)
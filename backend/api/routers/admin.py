@@ -0,0 +1,61 @@
+"""
+Admin Router.
+Operational views for the team: AI run traces (slowest runs, per-node latency, single run detail)
+and legacy SQL query timings (top queries, slow-query log with sampled plans), LLM usage and cost.
+"""
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.core.llm_usage import usage_report
+from backend.core.tracing import trace_store
+from backend.database.query_stats import query_stats
+
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+
+@router.get("/traces")
+async def get_slowest_traces(limit: int = 20, session_type: str = None):
+    """Slowest buffered runs (summary per run), optionally for one session type ("cs" / "manager")."""
+    return trace_store.slowest(limit, session_type)
+
+
+@router.get("/traces/stats")
+async def get_trace_stats(session_type: str = None):
+    """Latency per node, tool and router step over the buffered runs."""
+    return trace_store.span_stats(session_type)
+
+
+@router.get("/traces/{key}")
+async def get_trace(key: str):
+    """One run with all of its spans, by inquiry log_id or trace id."""
+    trace = trace_store.get(key)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (expired from the buffer or unknown id)")
+    return trace.to_dict()
+
+
+@router.get("/queries")
+async def get_top_queries(
+    limit: int = 20,
+    order_by: Literal["total_ms", "avg_ms", "p95_ms", "max_ms", "count"] = "total_ms",
+):
+    """Legacy SQL queries by name since process start, heaviest first (total time by default)."""
+    return query_stats.top(limit, order_by)
+
+
+@router.get("/queries/slow")
+async def get_slow_queries(limit: int = 50, name: str = None):
+    """Recent executions over SLOW_QUERY_THRESHOLD_MS, with an EXPLAIN (ANALYZE, BUFFERS) plan when sampled."""
+    return query_stats.slow(limit, name)
+
+
+@router.get("/llm-usage")
+async def get_llm_usage(
+    days: int = Query(7, ge=1, le=366),
+    group_by: list[Literal["day", "caller", "model", "session_type"]] = Query(["day", "caller", "model"]),
+):
+    """LLM calls, tokens, cost (USD) and latency per group over the last `days` store-local days."""
+    return await asyncio.to_thread(usage_report, days, group_by)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from backend.database.legacy import get_orders_from_db, calculate_product_margins
+from backend.core.llm_gateway import llm_gateway, Priority
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
@@ -39,24 +40,20 @@ async def get_analytics_summary():
         })
         
     # Generate Natural AI Briefing
-    import os
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    
     top_item = top_selling[0]["name"] if top_selling else "인기 상품"
     top_margin = top_selling[0]["marginRate"] if top_selling else 0
     fallback_briefing = f"이번 주말 매출이 주중 대비 상승했습니다. 특히 '{top_item}'의 판매가 전체 마진의 큰 부분을 차지하고 있습니다. 마진율이 {top_margin}%로 우수하므로 해당 상품의 마케팅을 강화하는 것을 추천합니다."
     
     briefing = fallback_briefing
-    if api_key and top_selling:
+    if llm_gateway.enabled and top_selling:
         try:
-            import openai
-            client = openai.AsyncOpenAI(api_key=api_key)
-            
             prompt = f"쇼핑몰 사장님을 위한 3문장 이내의 짧은 매출 분석 브리핑을 작성해주세요.\n최고 마진 상품: {top_item} (마진율 {top_margin}%)\n이 데이터를 바탕으로 칭찬과 함께 가벼운 마케팅 액션을 제안해주세요."
             
             # Since get_analytics_summary is async, we can await
-            response = await client.chat.completions.create(
+            response = await llm_gateway.chat(
                 model="gpt-4o-mini",
+                caller="analytics.briefing",
+                priority=Priority.BACKGROUND,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=200
             )
@@ -1,6 +1,9 @@
 """
 CRM Router.
 """
+import asyncio
+from typing import Literal, Optional
+
 from fastapi import APIRouter
 from pydantic import BaseModel
 
@@ -8,8 +11,11 @@ from backend.database.legacy import (
     get_customers_by_segment,
     get_orders_from_db,
     get_claims_by_customer,
-    get_reviews_by_customer
+    get_reviews_by_customer,
+    get_churn_risk_customers
 )
+from backend.services.customer_segmentation import refresh_segments
+from backend.services.churn_scoring import refresh_churn_scores
 
 router = APIRouter(prefix="/api/crm", tags=["CRM"])
 
@@ -17,6 +23,9 @@ class CouponRequest(BaseModel):
     customerId: str
     couponType: str
 
+class SegmentRefreshRequest(BaseModel):
+    mode: Literal["full", "incremental"] = "incremental"
+
 @router.get("/segments/{segment}")
 async def get_customers(segment: str):
     """Get customers by segment (e.g., 'VIP', 'at-risk')."""
@@ -34,6 +43,29 @@ async def get_customers(segment: str):
         
     return get_customers_by_segment(db_segment)
 
+@router.post("/segments/refresh")
+async def refresh_customer_segments(req: SegmentRefreshRequest = SegmentRefreshRequest()):
+    """
+    Recompute RFM segments and customer totals from orders.
+    "incremental" rescores only customers with new orders since the last run; "full" rescores everyone.
+    """
+    return await asyncio.to_thread(refresh_segments, req.mode)
+
+@router.get("/churn-risk")
+async def get_churn_risk(
+    risk_level: Optional[Literal["high", "medium", "low"]] = None,
+    min_score: Optional[float] = None,
+    limit: int = 50,
+    offset: int = 0,
+):
+    """Customers ordered by stored churn-risk score, with the top contributing factors."""
+    return get_churn_risk_customers(risk_level, min_score, max(1, min(limit, 500)), max(0, offset))
+
+@router.post("/churn-risk/refresh")
+async def refresh_churn_risk():
+    """Recompute churn-risk scores for every customer."""
+    return await asyncio.to_thread(refresh_churn_scores)
+
 @router.post("/coupons/send")
 async def send_coupon(req: CouponRequest):
     """Simulate sending a coupon."""
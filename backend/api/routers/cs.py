@@ -2,18 +2,21 @@
 CS Router.
 Handles chat, AI suggestions, and inquiry management.
 """
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 import uuid
 
 from backend.agents.orchestrator import AgentOrchestrator
+from backend.agents.cs_router import route_stats
 from backend.api.deps import get_ai_orchestrator
 from backend.database.legacy import (
     get_inquiries_by_status,
     save_inquiry_log,
     update_inquiry_log_feedback
 )
-from backend.services.evolution_service import evolve_knowledge
+from backend.services.evolution_service import evolution_queue
+from backend.core.llm_gateway import llm_gateway, Priority
+from backend.core.tracing import trace_store
 
 
 router = APIRouter(prefix="/api/cs", tags=["Customer Support"])
@@ -60,11 +63,14 @@ async def chat_with_agent(
                 req.message,
                 result["text"]
             )
+            if result.get("trace_id"):
+                trace_store.attach_log_id(result["trace_id"], log_id)
             
         return {
             "response": result["text"],
             "log_id": log_id,
-            "cached": result["cached"]
+            "cached": result["cached"],
+            "route": result.get("route")
         }
     except Exception as e:
         return {"error": str(e)}
@@ -79,18 +85,15 @@ async def get_ai_suggestion(
     Generate an AI reply draft on-demand using OpenAI API.
     Uses a lightweight model (gpt-4o-mini).
     """
-    import os
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    
     # Fallback if API key is not provided
-    if not api_key:
+    if not llm_gateway.enabled:
         return {"suggestion": f"고객님, 문의하신 '{req.question[:15]}...' 건에 대해 확인 중입니다. 잠시만 기다려주세요. (OpenAI API 키가 설정되지 않았습니다.)"}
         
     try:
-        import openai
-        client = openai.AsyncOpenAI(api_key=api_key)
-        response = await client.chat.completions.create(
+        response = await llm_gateway.chat(
             model="gpt-4o-mini",
+            caller="cs.suggest",
+            priority=Priority.INTERACTIVE,
             messages=[
                 {
                     "role": "system", 
@@ -107,6 +110,12 @@ async def get_ai_suggestion(
         return {"suggestion": f"고객님, 문의하신 '{req.question[:15]}...' 건에 대해 신속히 확인하여 안내해 드리겠습니다. (AI 응답 생성 실패)"}
 
 
+@router.get("/routing-stats")
+async def get_routing_stats():
+    """Share of CS traffic answered from cache, manual template, light completion or the full agent."""
+    return route_stats.snapshot()
+
+
 @router.get("/inquiries")
 async def get_inquiries():
     """Get unresolved inquiries."""
@@ -115,11 +124,12 @@ async def get_inquiries():
 
 
 @router.post("/feedback")
-async def submit_feedback(req: FeedbackRequest, background_tasks: BackgroundTasks):
+async def submit_feedback(req: FeedbackRequest):
     """Submit success/failure feedback for an AI response."""
     update_inquiry_log_feedback(req.log_id, req.resolution_feedback, req.final_resolution)
     
     if req.resolution_feedback == 'failure' and req.final_resolution:
-        background_tasks.add_task(evolve_knowledge, req.log_id, req.final_resolution)
+        # Evolved in micro-batches together with other agents' corrections
+        evolution_queue.submit(req.log_id, req.final_resolution)
         
     return {"status": "success"}
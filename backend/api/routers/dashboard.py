@@ -2,7 +2,6 @@
 Dashboard Router.
 Provides KPI metrics, alerts, and morning briefings.
 """
-import os
 from fastapi import APIRouter
 from pydantic import BaseModel
 
@@ -13,6 +12,7 @@ from backend.database.legacy import (
     get_low_stock_products,
     get_settlement_data_from_db
 )
+from backend.core.llm_gateway import llm_gateway, Priority
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
@@ -82,8 +82,7 @@ async def get_insights():
 각 문장은 '~건 있습니다.', '~예정입니다.', '~증가했습니다.'와 같이 '~다/요' 체로 간결하게 끝내세요.
 """
     
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if not api_key:
+    if not llm_gateway.enabled:
         return {
             "insights": [
                 f"미출고 주문이 8건 있습니다.",
@@ -94,10 +93,10 @@ async def get_insights():
         }
         
     try:
-        import openai
-        client = openai.AsyncOpenAI(api_key=api_key)
-        response = await client.chat.completions.create(
+        response = await llm_gateway.chat(
             model="gpt-4o-mini",
+            caller="dashboard.insights",
+            priority=Priority.BACKGROUND,
             messages=[
                 {"role": "system", "content": system_prompt}
             ],
@@ -0,0 +1,24 @@
+"""
+Health Router.
+Liveness (the process is serving) and readiness (heavy components are warmed up) probes.
+"""
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from backend.core.warmup import warmup
+
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def live():
+    """Always 200 while the event loop is serving requests."""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def ready():
+    """200 once every required component is warmed up, 503 with per-component state until then."""
+    snapshot = warmup.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
@@ -2,10 +2,13 @@
 Inventory Router.
 Handles inventory tracking, warehouse logistics, and AI demand forecasting.
 """
-from fastapi import APIRouter
+import asyncio
+
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from backend.database.legacy import get_products_from_db
+from backend.services.demand_forecast import get_catalog_forecast, get_product_forecast
 
 router = APIRouter(prefix="/api/inventory", tags=["Inventory"])
 
@@ -29,16 +32,30 @@ async def get_inventory():
     return products
 
 
-@router.post("/ai-forecast")
-async def forecast_demand(req: ForecastAiRequest):
+@router.get("/ai-forecast")
+async def forecast_catalog():
     """
-    AI Mockup: Demand forecasting to recommend safety stock and reorder quantity.
+    Demand forecast for every product, most urgent (fewest days of cover) first.
     """
+    result = await asyncio.to_thread(get_catalog_forecast)
+    forecasts = sorted(
+        result["forecasts"].values(),
+        key=lambda f: f["days_of_cover"] if f["days_of_cover"] is not None else float("inf"),
+    )
     return {
-        "status": "success", 
-        "forecast": {
-            "recommended_reorder_qty": 50,
-            "predicted_demand_next_30_days": 45,
-            "reason": "최근 2주간 일평균 판매량이 20% 증가하는 추세입니다."
-        }
+        "status": "success",
+        "generated_at": result["generated_at"],
+        "history_end": result["history_end"],
+        "forecasts": forecasts,
     }
+
+
+@router.post("/ai-forecast")
+async def forecast_demand(req: ForecastAiRequest):
+    """
+    Demand forecasting to recommend safety stock and reorder quantity for one product.
+    """
+    forecast = await asyncio.to_thread(get_product_forecast, int(req.product_id)) if req.product_id.isdigit() else None
+    if forecast is None:
+        raise HTTPException(status_code=404, detail=f"Product {req.product_id} not found")
+    return {"status": "success", "forecast": forecast}
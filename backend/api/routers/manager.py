@@ -3,6 +3,7 @@ from pydantic import BaseModel
 import uuid
 
 from backend.agents.orchestrator import AgentOrchestrator
+from backend.agents.manager_intents import manager_route_stats
 from backend.api.deps import get_ai_orchestrator
 from backend.database.legacy import save_inquiry_log
 
@@ -41,9 +42,16 @@ async def manager_chat(
             "response": result["text"],
             "log_id": log_id,
             "cached": result["cached"],
-            "tools_used": result["tool_calls"]
+            "tools_used": result["tool_calls"],
+            "route": result.get("route")
         }
     except Exception as e:
         import traceback
         print(traceback.format_exc())
         return {"error": str(e)}
+
+
+@router.get("/routing-stats")
+async def get_routing_stats():
+    """Share of manager questions answered from cache, directly from data, or by the agent."""
+    return manager_route_stats.snapshot()
@@ -0,0 +1,14 @@
+"""
+Metrics Router.
+Prometheus scrape endpoint (HTTP, DB pool, caches, LLM calls; see backend/core/metrics.py).
+"""
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
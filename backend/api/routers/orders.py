@@ -7,12 +7,16 @@ from pydantic import BaseModel
 from typing import List, Optional
 
 from backend.database.legacy import get_orders_from_db
+from backend.services.order_risk_engine import recommend_order_actions
 
 router = APIRouter(prefix="/api/orders", tags=["Orders"])
 
 
 class OrderAiRequest(BaseModel):
-    order_ids: List[str]
+    # Empty list = scan every open order
+    order_ids: List[str] = []
+    # Let the LLM polish the drafts of the N most severe cases
+    refine_top_n: int = 0
 
 
 @router.get("/")
@@ -29,16 +33,8 @@ async def get_all_orders(status: Optional[str] = None):
 @router.post("/ai-batch")
 async def analyze_delayed_orders(req: OrderAiRequest):
     """
-    AI Mockup: Analyze delayed orders and recommend actions (apology message, refund, etc.).
-    Returns recommendations. The user must manually approve them.
+    Detect delayed / at-risk orders and recommend actions (apology message, compensation, claim handling, etc.).
+    Returns recommendations with templated drafts. The user must manually approve them.
     """
-    recommendations = []
-    for order_id in req.order_ids:
-        # Mock logic
-        recommendations.append({
-            "order_id": order_id,
-            "recommended_action": "send_apology_message",
-            "draft_message": f"[AI 초안] 고객님, {order_id} 주문의 배송이 지연되어 죄송합니다. 내일 출발 예정입니다.",
-            "reason": "물류 지연"
-        })
-    return {"status": "success", "recommendations": recommendations}
+    result = await recommend_order_actions(req.order_ids or None, req.refine_top_n)
+    return {"status": "success", **result}
@@ -1,64 +1,153 @@
 """
 Reviews Router.
 """
-import os
+import asyncio
+import json
+from contextlib import aclosing
+from datetime import date, datetime, timedelta
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-from backend.database.legacy import get_recent_negative_reviews, get_reviews_from_db
+from typing import List, Optional
+from backend.config.settings import settings
+from backend.database.legacy import get_recent_negative_reviews, get_reviews_from_db, get_reviews_for_reply
+from backend.core.llm_gateway import llm_gateway, Priority
+from backend.services.review_reply_service import generate_reply_drafts, get_stored_drafts, save_drafts
+from backend.services.review_index import get_keyword_summary, get_aspect_summary, summarize_reviews
 
 router = APIRouter(prefix="/api/reviews", tags=["Reviews"])
 
+def _local_since(days: Optional[int]) -> Optional[date]:
+    """First store-local day of the last `days` days (index days are store-local, not server-local)."""
+    if not days:
+        return None
+    local_today = (datetime.utcnow() + timedelta(hours=settings.STORE_UTC_OFFSET_HOURS)).date()
+    return local_today - timedelta(days=days)
+
 class GenerateReplyRequest(BaseModel):
     review_text: str
+    regenerate: bool = False
+
+class BatchReplyRequest(BaseModel):
+    review_ids: Optional[List[str]] = None
+    # Filter used when review_ids is omitted, e.g. unreplied=True, max_rating=2
+    max_rating: Optional[int] = None
+    unreplied: bool = False
+    limit: int = 200
+    regenerate: bool = False
 
 @router.get("/")
-async def get_all_reviews(rating: Optional[int] = None):
+async def get_all_reviews(
+    rating: Optional[int] = None,
+    product_id: Optional[int] = None,
+    aspect: Optional[str] = None,
+    aspect_sentiment: Optional[str] = None,
+    days: Optional[int] = None,
+):
     """
-    Get all reviews, optionally filtered by rating.
-    Returns keywords summary (mock NLP) as well.
+    Get all reviews, optionally filtered by rating, product, or aspect
+    (delivery, packaging, taste, expiry, price; optionally "positive" / "negative").
+    Keyword and aspect summaries cover the same reviews: product / days filters read the incremental
+    review index (kept current in the background); rating / aspect filters summarise the fetched reviews.
     """
-    reviews = get_reviews_from_db()
-    
-    if rating:
-        reviews = [r for r in reviews if r.get("rating") == rating]
-        
-    # Mock NLP Keyword summary
-    summary_keywords = [
-        {"word": "맛있어요", "count": 142, "sentiment": "positive"},
-        {"word": "배송빠름", "count": 98, "sentiment": "positive"},
-        {"word": "가성비", "count": 75, "sentiment": "positive"},
-        {"word": "포장불량", "count": 12, "sentiment": "negative"},
-        {"word": "유통기한", "count": 5, "sentiment": "negative"}
-    ]
-            
+    since = _local_since(days)
+    fetch = asyncio.to_thread(
+        get_reviews_from_db, rating, product_id, aspect, aspect_sentiment, since, settings.STORE_UTC_OFFSET_HOURS
+    )
+    if rating or aspect:
+        reviews = await fetch
+        summary, aspects = await asyncio.to_thread(summarize_reviews, reviews)
+    else:
+        reviews, summary, aspects = await asyncio.gather(
+            fetch,
+            asyncio.to_thread(get_keyword_summary, product_id=product_id, since=since),
+            asyncio.to_thread(get_aspect_summary, product_id=product_id, since=since),
+        )
+
     return {
-        "summary": summary_keywords,
+        "summary": summary,
+        "aspects": aspects,
         "reviews": reviews
     }
 
+@router.get("/keywords")
+async def get_text_keywords(
+    source: str = "review",
+    product_id: Optional[int] = None,
+    days: Optional[int] = None,
+    limit: int = 20,
+):
+    """Keyword and aspect summary for reviews or QnAs (source=qna) straight from the index."""
+    since = _local_since(days)
+    keywords, aspects = await asyncio.gather(
+        asyncio.to_thread(get_keyword_summary, source, product_id, since, limit),
+        asyncio.to_thread(get_aspect_summary, source, product_id, since),
+    )
+    return {
+        "source": source,
+        "keywords": keywords,
+        "aspects": aspects,
+    }
+
 @router.get("/negative")
 async def get_negative_reviews():
     return get_recent_negative_reviews()
 
+@router.post("/generate-replies")
+async def generate_replies_batch(req: BatchReplyRequest):
+    """
+    Generate reply drafts for many reviews at once.
+    Takes explicit review ids or a filter (e.g. unreplied, rating <= 2), packs several reviews into
+    each LLM call and streams NDJSON lines back as batches finish. Drafts are stored for reuse.
+    """
+    limit = max(1, min(req.limit, settings.REVIEW_REPLY_MAX_REVIEWS))
+    reviews = await asyncio.to_thread(
+        get_reviews_for_reply,
+        review_ids=req.review_ids,
+        max_rating=req.max_rating,
+        unreplied=req.unreplied,
+        limit=limit
+    )
+
+    async def stream():
+        yield json.dumps({"type": "start", "total": len(reviews)}, ensure_ascii=False) + "\n"
+        done = 0
+        # aclosing: on client disconnect the drafts generator is closed at once and cancels its batches
+        async with aclosing(generate_reply_drafts(reviews, regenerate=req.regenerate)) as results:
+            async for result in results:
+                done += 1
+                yield json.dumps({"type": "reply", **result}, ensure_ascii=False) + "\n"
+        yield json.dumps({"type": "done", "total": len(reviews), "completed": done}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/{review_id}/draft")
+async def get_reply_draft(review_id: str):
+    """Return the stored reply draft for a review, if one was generated before."""
+    draft = (await asyncio.to_thread(get_stored_drafts, [review_id])).get(review_id)
+    return {"review_id": review_id, "reply": draft}
+
 @router.post("/{review_id}/generate-reply")
 async def generate_reply(review_id: str, req: GenerateReplyRequest):
     """
     Generate an AI reply draft on-demand using OpenAI API.
-    Uses a lightweight model (gpt-4o-mini).
+    Uses a lightweight model (gpt-4o-mini). Returns the stored draft instantly unless regenerate is set.
     """
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    
+    if not req.regenerate:
+        stored = (await asyncio.to_thread(get_stored_drafts, [review_id])).get(review_id)
+        if stored:
+            return {"reply": stored, "cached": True}
+
     # Fallback if API key is not provided
-    if not api_key:
+    if not llm_gateway.enabled:
         fallback_msg = f"소중한 리뷰 감사합니다. 남겨주신 '{req.review_text[:15]}...' 내용 확인했습니다. (OpenAI API 키가 설정되지 않은 임시 응답입니다.)"
         return {"reply": fallback_msg}
         
     try:
-        import openai
-        client = openai.AsyncOpenAI(api_key=api_key)
-        response = await client.chat.completions.create(
+        response = await llm_gateway.chat(
             model="gpt-4o-mini",
+            caller="reviews.reply",
+            priority=Priority.STANDARD,
             messages=[
                 {
                     "role": "system", 
@@ -69,6 +158,7 @@ async def generate_reply(review_id: str, req: GenerateReplyRequest):
             max_tokens=150
         )
         reply = response.choices[0].message.content.strip()
+        await asyncio.to_thread(save_drafts, {review_id: reply}, "gpt-4o-mini")
         return {"reply": reply}
     except Exception as e:
         print(f"OpenAI error: {e}")
@@ -4,6 +4,7 @@ All environment variables and model names are centralized here.
 """
 import os
 from pathlib import Path
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -53,9 +54,140 @@ class Settings(BaseSettings):
     COPILOT_AGENT_MODEL: str = "gpt-4o"
     BRIEFING_MODEL: str = "gpt-4o-mini"
 
+    # --- LLM Gateway ---
+    # Shared connection pool, per-model limits and retry policy for every LLM call.
+    LLM_MAX_CONNECTIONS: int = 50
+    LLM_REQUEST_TIMEOUT: float = 30.0  # seconds, per attempt
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_DELAY: float = 0.5  # seconds, doubled per attempt (with jitter)
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_MODEL_CONCURRENCY: dict[str, int] = {"gpt-4o-mini": 16, "gpt-4o": 4, "text-embedding-3-small": 8}
+    LLM_MODEL_TPM: dict[str, int] = {"gpt-4o-mini": 200000, "gpt-4o": 30000, "text-embedding-3-small": 1000000}
+    LLM_DEFAULT_CONCURRENCY: int = 8
+    LLM_DEFAULT_TPM: int = 60000
+    # Slots per model that only interactive (CS / manager chat) traffic may take
+    LLM_INTERACTIVE_RESERVED_SLOTS: int = 2
+
+    # --- LLM Usage Accounting ---
+    # Every gateway call is written to the llm_usage table through a buffered writer
+    # (see /api/admin/llm-usage). Prices are USD per 1M tokens.
+    LLM_USAGE_ENABLED: bool = True
+    LLM_USAGE_FLUSH_SIZE: int = 200          # rows per insert
+    LLM_USAGE_FLUSH_INTERVAL: float = 5.0    # seconds
+    LLM_USAGE_MAX_BUFFER: int = 10000        # oldest rows are dropped beyond this while the DB is down
+    LLM_MODEL_PRICES: dict[str, dict[str, float]] = {
+        "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+        "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+        "o3-mini": {"input": 1.10, "cached_input": 0.55, "output": 4.40},
+        "text-embedding-3-small": {"input": 0.02, "cached_input": 0.02, "output": 0.0},
+    }
+
+    # --- Batch Review Replies ---
+    REVIEW_REPLY_BATCH_SIZE: int = 8   # reviews packed into one structured-output call
+    REVIEW_REPLY_MAX_REVIEWS: int = 500
+
+    # --- Churn Scoring ---
+    CHURN_DEFAULT_CADENCE_DAYS: float = 30.0  # assumed order gap for one-time buyers
+    CHURN_HIGH_RISK: float = 0.7
+    CHURN_MEDIUM_RISK: float = 0.4
+
+    # --- Negative Review Summary ---
+    REVIEW_SUMMARY_CHUNK_TOKENS: int = 3000  # input budget per map (chunk) call
+    REVIEW_SUMMARY_REDUCE_TOKENS: int = 6000  # input budget per reduce call; larger inputs reduce in rounds
+
+    # --- Review Keyword Index ---
+    TEXT_INDEX_BATCH_SIZE: int = 1000          # reviews / QnAs analysed per transaction
+    TEXT_INDEX_REFRESH_INTERVAL: float = 30.0  # seconds between background refreshes
+
+    # --- Order Delay Detection ---
+    STORE_UTC_OFFSET_HOURS: int = 9       # order timestamps are UTC; cutoffs are store-local (KST)
+    ORDER_DELIVERY_SLA_DAYS: int = 2      # business days from dispatch to expected delivery
+    ORDER_REFINE_MAX: int = 20            # max drafts refined by the LLM per request
+
+    # --- Demand Forecasting ---
+    # Days of sales history fitted per product; the trend compares the last two fortnights, so >= 28
+    FORECAST_HISTORY_DAYS: int = Field(default=56, ge=28)
+    FORECAST_HORIZON_DAYS: int = 30
+    FORECAST_SMOOTHING_ALPHA: float = 0.3
+    FORECAST_SEASONAL_SHRINKAGE: float = 50.0  # units sold before a product's own weekly pattern dominates
+    FORECAST_WATERMARK_TTL: float = 10.0       # seconds a cached forecast is served before the watermark is re-read
+    INVENTORY_LEAD_TIME_DAYS: int = 3
+    INVENTORY_REVIEW_PERIOD_DAYS: int = 14     # days of demand a reorder should cover after arrival
+    INVENTORY_SERVICE_LEVEL: float = 0.95
+
     # --- ChromaDB ---
     CHROMA_DB_PATH: str = str(PROJECT_ROOT / "chroma_data")
-    CHROMA_COLLECTION_NAME: str = "smart_store_data"
+    CHROMA_COLLECTION_NAME: str = "smart_store_data"  # prefix; one collection per corpus
+    RAG_DEFAULT_CORPORA: list[str] = ["manual", "self_evolution"]  # what CS retrieval searches by default
+    RAG_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_CACHE_DIR: str = str(PROJECT_ROOT / ".cache" / "embeddings")  # persistent, keyed by model + content hash
+
+    # --- RAG Ingestion ---
+    RAG_INGEST_BATCH_SIZE: int = 256        # documents per embedding request
+    RAG_INGEST_BATCH_TOKENS: int = 60000    # estimated tokens per embedding request
+    RAG_INGEST_CONCURRENCY: int = 4         # embedding requests in flight
+
+    # --- RAG Chunking ---
+    # Section-aware chunks ("문제 정의", "해결 흐름", numbered steps) with parent back-references
+    RAG_CHUNKED_CORPORA: list[str] = ["manual", "self_evolution", "product"]
+    RAG_CHUNK_TOKENS: int = 80
+    RAG_CHUNK_OVERLAP_TOKENS: int = 20
+    RAG_EXPAND_PARENTS: bool = False  # widen retrieved chunks to their whole document
+
+    # --- Hybrid Retrieval ---
+    # Dense (Chroma) and BM25 rankings fused with reciprocal-rank fusion.
+    RAG_HYBRID_ENABLED: bool = True
+    RAG_CANDIDATE_MULTIPLIER: int = 4  # each ranking contributes k * this candidates to the fusion
+    RAG_RRF_K: int = 60
+    RAG_BM25_K1: float = 1.2
+    RAG_BM25_B: float = 0.75
+    # Adaptive-k selection of prompt passages (see rag_service.select_passages)
+    RAG_CANDIDATES: int = 8
+    RAG_MIN_RELEVANCE: float = 0.35
+    RAG_SCORE_GAP: float = 0.1              # relevance drop between neighbours that ends the list
+    RAG_MMR_LAMBDA: float = 0.7             # 1.0 = pure relevance, lower = more diversity
+    RAG_DUPLICATE_SIMILARITY: float = 0.95  # passages this similar to a picked one are dropped
+    RAG_MAX_PASSAGES: int = 5
+    RAG_CONTEXT_TOKEN_BUDGET: int = 1500
+    RAG_QUERY_EMBEDDING_CACHE_SIZE: int = 2048  # in-process LRU of query vectors
+    RAG_RESULT_CACHE_SIZE: int = 1024           # in-process LRU of results, versioned by ingestion generation
+
+    # --- Self-Evolution ---
+    # Evolved CS rules are appended to a JSONL journal and periodically folded into the manual snapshot.
+    CS_MANUALS_PATH: str = str(PROJECT_ROOT / "data" / "cs_manuals.json")
+    RULE_JOURNAL_PATH: str = str(PROJECT_ROOT / "data" / "cs_manuals.journal.jsonl")
+    RULE_JOURNAL_COMPACT_EVERY: int = 50  # journal entries before they are compacted into the snapshot
+    # Failure feedback is queued and evolved in micro-batches (one LLM call + one embedding call each)
+    EVOLUTION_BATCH_SIZE: int = 16
+    EVOLUTION_BATCH_WINDOW_SECONDS: float = 2.0  # how long the first event waits for others to join
+    EVOLUTION_DUPLICATE_SIMILARITY: float = 0.9  # rules this similar to an existing one are merged into it
+
+    # --- CS Fast-Path Routing ---
+    # Queries whose top manual hit clears these relevance scores skip the tool-calling agent.
+    CS_FASTPATH_ENABLED: bool = True
+    CS_FASTPATH_TEMPLATE_SCORE: float = 0.85  # answer straight from the manual script
+    CS_FASTPATH_LIGHT_SCORE: float = 0.55     # single completion without tools
+    CS_FASTPATH_AMBIGUITY_MARGIN: float = 0.03  # top-2 hits closer than this are "ambiguous"
+
+    # --- AI Manager Direct Answers ---
+    # Structured manager questions are answered straight from the data functions.
+    MANAGER_INTENT_ENABLED: bool = True
+    MANAGER_INTENT_EMBEDDINGS_ENABLED: bool = True
+    MANAGER_INTENT_EMBED_THRESHOLD: float = 0.82
+
+    # --- Tracing ---
+    # Per-node spans of AI runs, kept in an in-process ring buffer (see /api/admin/traces)
+    TRACING_ENABLED: bool = True
+    TRACE_BUFFER_SIZE: int = 500
+
+    # --- Query Instrumentation ---
+    # Legacy SQL timings per query name; slow executions are logged with a sampled
+    # EXPLAIN (ANALYZE, BUFFERS) plan (see /api/admin/queries)
+    QUERY_STATS_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 30000
+    SLOW_QUERY_LOG_SIZE: int = 200
 
     # --- Caching ---
     DISKCACHE_DIR: str = str(PROJECT_ROOT / ".cache" / "ai_responses")
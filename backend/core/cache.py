@@ -4,11 +4,27 @@ Used for short-lived, ephemeral caching to avoid redundant LLM calls (e.g., repe
 NOT for persistent artifacts (use ai_cache DB table for those).
 """
 import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+
 from diskcache import Cache
 from backend.config.settings import settings
+from backend.core.metrics import record_cache
+
+# Opened on first use (or by the startup warm-up), not at import
+_cache: Cache | None = None
+_cache_lock = threading.Lock()
+
 
-# Initialize diskcache
-cache = Cache(settings.DISKCACHE_DIR)
+def get_cache() -> Cache:
+    """The runtime diskcache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = Cache(settings.DISKCACHE_DIR)
+    return _cache
 
 
 def _generate_cache_key(session_type: str, query: str) -> str:
@@ -20,7 +36,9 @@ def _generate_cache_key(session_type: str, query: str) -> str:
 def get_cached(session_type: str, query: str) -> str | None:
     """Retrieve a cached response if it exists and is still valid."""
     key = _generate_cache_key(session_type, query)
-    return cache.get(key)
+    value = get_cache().get(key)
+    record_cache("runtime", hits=int(value is not None), misses=int(value is None))
+    return value
 
 
 def set_cached(session_type: str, query: str, response: str, ttl: int = None) -> None:
@@ -28,9 +46,73 @@ def set_cached(session_type: str, query: str, response: str, ttl: int = None) ->
     if ttl is None:
         ttl = settings.CACHE_TTL
     key = _generate_cache_key(session_type, query)
-    cache.set(key, response, expire=ttl)
+    get_cache().set(key, response, expire=ttl)
 
 
 def clear_cache() -> None:
     """Clear all items in the runtime cache."""
-    cache.clear()
+    get_cache().clear()
+
+
+def get_generation(name: str) -> int:
+    """Ingestion generation of a data set (e.g. a vector collection); shared across processes."""
+    return get_cache().get(f"generation:{name}", 0)
+
+
+def bump_generation(name: str) -> int:
+    """Mark a data set as changed so results cached against the old generation are no longer used."""
+    return get_cache().incr(f"generation:{name}", default=0)
+
+
+def get_shared_value(name: str) -> Any:
+    """
+    A structured value (dict, list) shared across processes under a fixed name, e.g. a computed
+    forecast. Kept apart from the hashed query -> response entries of get_cached / set_cached.
+    """
+    value = get_cache().get(f"shared:{name}")
+    record_cache("shared", hits=int(value is not None), misses=int(value is None))
+    return value
+
+
+def set_shared_value(name: str, value: Any, ttl: int = None) -> None:
+    """Store a structured value under a fixed name with a TTL (default from config)."""
+    get_cache().set(f"shared:{name}", value, expire=settings.CACHE_TTL if ttl is None else ttl)
+
+
+class LRUCache:
+    """Bounded, thread-safe in-process LRU for hot lookups where a disk round-trip is too slow."""
+
+    def __init__(self, maxsize: int, name: str | None = None):
+        self.maxsize = maxsize
+        self.name = name  # reported in cache_requests_total when set
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                value = self._data[key]
+            else:
+                self.misses += 1
+                value = default
+        if self.name:
+            record_cache(self.name, hits=int(value is not default), misses=int(value is default))
+        return value
+
+    def set(self, key, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,119 @@
+"""
+Persistent embedding cache via diskcache.
+Document embeddings are keyed by (model, sha256 of the text), so re-ingesting an unchanged corpus,
+or a corpus where only a few rows changed, only pays for the texts the cache has never seen.
+Unlike the runtime response cache, entries do not expire: an embedding never goes stale for a
+given model and text. Query embeddings are kept in a bounded in-process LRU instead, keyed by the
+normalised query, so repeated CS questions skip the embedding call.
+Synchronous embedding calls (query embeddings, sync ingestion) bypass the async gateway, so their
+usage is recorded here; async batches are recorded by the gateway.
+"""
+import hashlib
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+from diskcache import Cache
+from langchain_core.embeddings import Embeddings
+
+from backend.config.settings import settings
+from backend.core.cache import LRUCache
+from backend.core.llm_usage import usage_writer
+from backend.core.metrics import record_cache
+
+_embedding_cache: Cache | None = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Cache:
+    """The persistent embedding cache, opened on first use."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = Cache(settings.EMBEDDING_CACHE_DIR)
+    return _embedding_cache
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves document vectors from the disk cache and embeds only misses."""
+
+    def __init__(self, underlying: Embeddings, model: str):
+        self.underlying = underlying
+        self.model = model
+        self.query_cache = LRUCache(settings.RAG_QUERY_EMBEDDING_CACHE_SIZE, name="query_embedding")
+
+    def _key(self, text: str) -> str:
+        return f"{self.model}:{content_hash(text)}"
+
+    def lookup(self, texts: list[str]) -> list[list[float] | None]:
+        """Cached vectors in input order, None where the text has not been embedded yet."""
+        cache = get_embedding_cache()
+        blobs = [cache.get(self._key(text)) for text in texts]
+        hits = sum(blob is not None for blob in blobs)
+        record_cache("embedding", hits=hits, misses=len(blobs) - hits)
+        return [np.frombuffer(blob, dtype=np.float32).tolist() if blob is not None else None for blob in blobs]
+
+    def _store(self, texts: list[str], vectors: list, missing: list[int], embedded: dict) -> list[list[float]]:
+        # float32 bytes: a quarter of the pickled list size, and one transaction per batch
+        cache = get_embedding_cache()
+        with cache.transact():
+            for text, vector in embedded.items():
+                cache.set(self._key(text), np.asarray(vector, dtype=np.float32).tobytes())
+        for i in missing:
+            vectors[i] = embedded[texts[i]]
+        return vectors
+
+    def _embed_uncached(self, fn: Callable[[], list], texts: list[str], caller: str):
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = fn()
+            status = "ok"
+            return result
+        finally:
+            usage_writer.record(
+                model=self.model,
+                caller=caller,
+                status=status,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                estimated_tokens=sum(len(text) for text in texts) // 2 + 1,
+            )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.lookup(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Duplicate texts in one batch are embedded once
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            embedded = dict(zip(unique, self._embed_uncached(
+                lambda: self.underlying.embed_documents(unique), unique, "embedding.documents"
+            )))
+            vectors = self._store(texts, vectors, missing, embedded)
+        return vectors
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.lookup(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            embedded = dict(zip(unique, await self.underlying.aembed_documents(unique)))
+            vectors = self._store(texts, vectors, missing, embedded)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        key = (self.model, normalize_query(text))
+        vector = self.query_cache.get(key)
+        if vector is None:
+            vector = self._embed_uncached(lambda: self.underlying.embed_query(text), [text], "embedding.query")
+            self.query_cache.set(key, vector)
+        return vector
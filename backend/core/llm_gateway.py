@@ -0,0 +1,349 @@
+"""
+Central LLM Gateway.
+Every OpenAI chat call in the backend goes through here:
+
+- one shared HTTP connection pool (raw OpenAI client, LangChain chat models and embeddings),
+- per-model concurrency and token-per-minute limits,
+- priority admission so interactive CS traffic is served ahead of background work,
+- per-attempt timeouts and retries with jittered exponential backoff,
+- token / cost accounting of every call (see llm_usage).
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from enum import IntEnum
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+import httpx
+
+from backend.config.settings import settings
+from backend.core.llm_usage import token_counts, usage_writer
+from backend.core.metrics import LLM_CALL_DURATION, LLM_CALLS, LLM_TOKENS
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    import openai
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+    INTERACTIVE = 0  # CS chat/suggestions, AI Manager chat
+    STANDARD = 1     # user-triggered one-off drafts (review replies)
+    BACKGROUND = 2   # insights, briefings, self-evolution, batch jobs
+
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> tuple[type[BaseException], ...]:
+    # openai is imported on first use: it is the slowest import of the API process
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+        asyncio.TimeoutError,
+    )
+
+
+def estimate_tokens(messages: list, max_tokens: int | None = None) -> int:
+    """
+    Rough token estimate for rate limiting before the call is made.
+    Korean text averages about two characters per token; the actual usage is reconciled afterwards.
+    """
+    chars = 0
+    for m in messages:
+        content = m.get("content") if isinstance(m, dict) else getattr(m, "content", "")
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // 2 + (max_tokens or 256)
+
+
+class _PrioritySemaphore:
+    """
+    Semaphore that wakes waiters in priority order.
+    The last `reserved` slots are only handed to INTERACTIVE callers, so background work can never
+    occupy every slot of a model.
+    """
+
+    def __init__(self, value: int, reserved: int = 0):
+        self._value = value
+        self._reserved = min(reserved, max(value - 1, 0))
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+
+    def _can_grant(self, priority: int) -> bool:
+        return self._value > 0 and (priority == Priority.INTERACTIVE or self._value > self._reserved)
+
+    async def acquire(self, priority: int) -> None:
+        if not self._waiters and self._can_grant(priority):
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        # A higher-priority arrival may be grantable even though the queue head is not
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot was granted just before we were cancelled: hand it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._value += 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_grant(priority):
+                return
+            heapq.heappop(self._waiters)
+            self._value -= 1
+            future.set_result(None)
+
+
+class _TokenBucket:
+    """Token-per-minute budget, refilled continuously."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    async def take(self, amount: int) -> None:
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) * 60.0 / self.capacity)
+
+    def adjust(self, delta: int) -> None:
+        """Charge (or refund) the difference between estimated and actual usage."""
+        self._refill()
+        self.tokens = max(-self.capacity, min(self.capacity, self.tokens - delta))
+
+
+class _ModelLimiter:
+    def __init__(self, concurrency: int, tokens_per_minute: int, reserved: int):
+        self.slots = _PrioritySemaphore(concurrency, reserved)
+        self.bucket = _TokenBucket(tokens_per_minute)
+
+
+class LLMGateway:
+    """Shared client, limits and retry policy for all LLM calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiters: dict[str, _ModelLimiter] = {}
+        self._http_client: httpx.Client | None = None
+        self._http_async_client: httpx.AsyncClient | None = None
+        self._client: "openai.AsyncOpenAI | None" = None
+
+    # --- Shared clients ---
+
+    @property
+    def api_key(self) -> str:
+        return settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY", "")
+
+    @property
+    def enabled(self) -> bool:
+        """False when no API key is configured; callers fall back to their canned responses."""
+        return bool(self.api_key)
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+        )
+
+    @property
+    def http_client(self) -> httpx.Client:
+        """Pooled sync HTTP client (LangChain sync paths, embeddings)."""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=self._limits(), timeout=settings.LLM_REQUEST_TIMEOUT)
+            return self._http_client
+
+    @property
+    def http_async_client(self) -> httpx.AsyncClient:
+        """Pooled async HTTP client shared by the OpenAI client and LangChain chat models."""
+        with self._lock:
+            if self._http_async_client is None:
+                self._http_async_client = httpx.AsyncClient(limits=self._limits(), timeout=settings.LLM_REQUEST_TIMEOUT)
+            return self._http_async_client
+
+    @property
+    def client(self) -> "openai.AsyncOpenAI":
+        """Shared raw OpenAI client. Retries are handled by the gateway, not the SDK."""
+        import openai
+
+        http_async_client = self.http_async_client
+        with self._lock:
+            if self._client is None:
+                self._client = openai.AsyncOpenAI(
+                    api_key=self.api_key,
+                    http_client=http_async_client,
+                    max_retries=0,
+                )
+            return self._client
+
+    def chat_model(self, model: str, temperature: float = 0, **kwargs):
+        """LangChain ChatOpenAI bound to the shared connection pool; invoke it through `call()`."""
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            api_key=self.api_key or None,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+            max_retries=0,
+            timeout=settings.LLM_REQUEST_TIMEOUT,
+            **kwargs,
+        )
+
+    def embeddings(self, model: str):
+        """LangChain OpenAIEmbeddings bound to the shared connection pool."""
+        from langchain_openai import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(
+            api_key=self.api_key,
+            model=model,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+        )
+
+    async def aclose(self) -> None:
+        """Close the shared connection pools (application shutdown)."""
+        with self._lock:
+            http_client, self._http_client = self._http_client, None
+            http_async_client, self._http_async_client = self._http_async_client, None
+            self._client = None
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+    # --- Limits ---
+
+    def _limiter(self, model: str) -> _ModelLimiter:
+        with self._lock:
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                limiter = _ModelLimiter(
+                    concurrency=settings.LLM_MODEL_CONCURRENCY.get(model, settings.LLM_DEFAULT_CONCURRENCY),
+                    tokens_per_minute=settings.LLM_MODEL_TPM.get(model, settings.LLM_DEFAULT_TPM),
+                    reserved=settings.LLM_INTERACTIVE_RESERVED_SLOTS,
+                )
+                self._limiters[model] = limiter
+            return limiter
+
+    # --- Calls ---
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        *,
+        model: str,
+        caller: str,
+        priority: Priority = Priority.STANDARD,
+        estimated_tokens: int = 1000,
+    ) -> Any:
+        """
+        Run `fn` (a factory returning a fresh awaitable per attempt) under the model's limits.
+        Retries rate-limit, timeout, connection and 5xx errors with jittered exponential backoff.
+        """
+        limiter = self._limiter(model)
+        call_started = time.perf_counter()
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            await limiter.slots.acquire(priority)
+            outcome = "error"
+            result = None
+            try:
+                await limiter.bucket.take(estimated_tokens)
+                result = await asyncio.wait_for(fn(), timeout=settings.LLM_REQUEST_TIMEOUT)
+                counts = token_counts(result)
+                actual = counts[0] + counts[1] if counts is not None else None
+                if actual is not None:
+                    limiter.bucket.adjust(actual - estimated_tokens)
+                LLM_TOKENS.labels(model, caller).inc(actual if actual is not None else estimated_tokens)
+                outcome = "ok"
+                return result
+            except retryable_errors() as e:
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                outcome = "retry"
+                delay = self._backoff(attempt, e)
+                logger.warning(f"LLM call retry ({caller}, {model}, attempt {attempt + 1}): {type(e).__name__}, waiting {delay:.2f}s")
+            finally:
+                limiter.slots.release()
+                LLM_CALL_DURATION.labels(model, caller, outcome).observe(time.perf_counter() - started)
+                LLM_CALLS.labels(model, caller, outcome).inc()
+                if outcome != "retry":
+                    usage_writer.record(
+                        model=model,
+                        caller=caller,
+                        status=outcome,
+                        latency_ms=(time.perf_counter() - call_started) * 1000,
+                        attempts=attempt + 1,
+                        result=result,
+                        estimated_tokens=estimated_tokens,
+                    )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when the API sends one."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, settings.LLM_RETRY_BASE_DELAY)
+            except ValueError:
+                pass
+        cap = min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+        return random.uniform(cap / 2, cap)
+
+    async def chat(
+        self,
+        messages: list[dict],
+        *,
+        model: str,
+        caller: str,
+        priority: Priority = Priority.STANDARD,
+        **kwargs,
+    ):
+        """Chat completion through the shared OpenAI client."""
+        return await self.call(
+            lambda: self.client.chat.completions.create(model=model, messages=messages, **kwargs),
+            model=model,
+            caller=caller,
+            priority=priority,
+            estimated_tokens=estimate_tokens(messages, kwargs.get("max_tokens")),
+        )
+
+
+# Singleton instance
+llm_gateway = LLMGateway()
@@ -0,0 +1,253 @@
+"""
+LLM token and cost accounting.
+The gateway reports every call (caller, model, prompt / completion / cached tokens, latency and
+attempts); the session type and trace id come from the surrounding orchestrator run. Rows are
+buffered in memory and inserted in batches by a background task, so accounting never adds a DB
+round-trip to an LLM call. `usage_report` aggregates the llm_usage table by day, caller, model
+and session type for /api/admin/llm-usage.
+"""
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import func, insert, literal_column
+
+from backend.config.settings import settings
+from backend.core.tracing import current_trace
+from backend.database.session import SessionLocal
+from backend.models.orm import LLMUsage
+
+logger = logging.getLogger(__name__)
+
+GROUP_KEYS = ("day", "caller", "model", "session_type")
+
+_session_type: ContextVar[str | None] = ContextVar("llm_session_type", default=None)
+
+
+@contextmanager
+def usage_session(session_type: str):
+    """Tag the LLM calls made inside the block (an orchestrator run) with its session type."""
+    token = _session_type.set(session_type)
+    try:
+        yield
+    finally:
+        _session_type.reset(token)
+
+
+def token_counts(result: Any) -> tuple[int, int, int] | None:
+    """(prompt, completion, cached) tokens reported by an OpenAI completion or a LangChain AIMessage."""
+    usage = getattr(result, "usage", None)
+    if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        return usage.prompt_tokens, usage.completion_tokens or 0, getattr(details, "cached_tokens", None) or 0
+    usage_metadata = getattr(result, "usage_metadata", None)
+    if usage_metadata:
+        details = usage_metadata.get("input_token_details") or {}
+        return (
+            usage_metadata.get("input_tokens", 0),
+            usage_metadata.get("output_tokens", 0),
+            details.get("cache_read") or 0,
+        )
+    return None
+
+
+def cost_usd(model: str, prompt: int, completion: int, cached: int) -> float | None:
+    price = settings.LLM_MODEL_PRICES.get(model)
+    if price is None:
+        return None
+    return ((prompt - cached) * price["input"] + cached * price["cached_input"] + completion * price["output"]) / 1_000_000
+
+
+class UsageWriter:
+    """Buffers usage rows and inserts them in batches (LLM_USAGE_FLUSH_SIZE / LLM_USAGE_FLUSH_INTERVAL)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer: list[dict] = []
+        self._wakeup: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+        self._closing = False
+        self.dropped = 0
+
+    def record(
+        self,
+        *,
+        model: str,
+        caller: str,
+        status: str,
+        latency_ms: float,
+        attempts: int = 1,
+        result: Any = None,
+        estimated_tokens: int = 0,
+    ) -> None:
+        """Queue one call; tokens come from `result`, or the pre-call estimate when the API reports none."""
+        if not settings.LLM_USAGE_ENABLED:
+            return
+        counts = token_counts(result) if status == "ok" else (0, 0, 0)
+        estimated = counts is None
+        prompt, completion, cached = counts if counts is not None else (estimated_tokens, 0, 0)
+        trace = current_trace()
+        row = {
+            "created_at": datetime.utcnow(),
+            "caller": caller,
+            "session_type": _session_type.get(),
+            "model": model,
+            "status": status,
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "cached_tokens": cached,
+            "estimated": estimated,
+            "cost_usd": cost_usd(model, prompt, completion, cached),
+            "latency_ms": round(latency_ms, 1),
+            "attempts": attempts,
+            "trace_id": trace.trace_id if trace is not None else None,
+        }
+        with self._lock:
+            self._buffer.append(row)
+            self._trim()
+            full = len(self._buffer) >= settings.LLM_USAGE_FLUSH_SIZE
+        if self._ensure_worker() and full:
+            self._wakeup.set()
+
+    def _trim(self) -> None:
+        overflow = len(self._buffer) - settings.LLM_USAGE_MAX_BUFFER
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            logger.warning(f"LLM 사용량 버퍼 초과: {overflow}건 삭제 (누적 {self.dropped}건)")
+
+    def _ensure_worker(self) -> bool:
+        """
+        Start the flush task on the running loop. False off the loop (worker threads, sync scripts),
+        where rows wait for the next periodic or explicit flush.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        return True
+
+    async def _run(self) -> None:
+        while not self._closing:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), settings.LLM_USAGE_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Insert everything buffered so far. Failed rows go back to the buffer for the next flush."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        try:
+            await asyncio.to_thread(self._insert, rows)
+            return len(rows)
+        except Exception as e:
+            logger.error(f"LLM 사용량 저장 실패 ({len(rows)}건, 다음 주기에 재시도): {e}")
+            with self._lock:
+                self._buffer[:0] = rows
+                self._trim()
+            return 0
+
+    @staticmethod
+    def _insert(rows: list[dict]) -> None:
+        db = SessionLocal()
+        try:
+            for i in range(0, len(rows), settings.LLM_USAGE_FLUSH_SIZE):
+                db.execute(insert(LLMUsage), rows[i:i + settings.LLM_USAGE_FLUSH_SIZE])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def aclose(self) -> None:
+        """
+        Stop the flush task of the running loop and write what is left. Called at application
+        shutdown and at the end of every `asyncio.run` (script) entry point, whose loop would
+        otherwise take the task down with the rows still buffered.
+        """
+        worker = self._worker
+        if worker is not None and worker.get_loop() is asyncio.get_running_loop():
+            # Let the task finish its current flush instead of cancelling it mid-insert
+            self._closing = True
+            self._wakeup.set()
+            try:
+                await worker
+            finally:
+                self._closing = False
+                self._worker = None
+        await self.flush()
+
+
+usage_writer = UsageWriter()
+
+
+def usage_report(days: int = 7, group_by: list[str] = ("day", "caller", "model")) -> dict:
+    """
+    Calls, tokens, cost and latency over the last `days` store-local days, grouped by any of
+    GROUP_KEYS. Rows are ordered by day (newest first) when grouped by day, then by cost.
+    """
+    offset = timedelta(hours=settings.STORE_UTC_OFFSET_HOURS)
+    local_today = (datetime.utcnow() + offset).date()
+    since = datetime.combine(local_today - timedelta(days=days - 1), time.min) - offset
+    columns = {
+        # Literal interval: a bound parameter would differ between SELECT and GROUP BY
+        "day": func.date(LLMUsage.created_at + literal_column(f"interval '{settings.STORE_UTC_OFFSET_HOURS} hours'")),
+        "caller": LLMUsage.caller,
+        "model": LLMUsage.model,
+        "session_type": LLMUsage.session_type,
+    }
+    groups = [columns[key].label(key) for key in group_by]
+    cost = func.sum(LLMUsage.cost_usd)
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(
+                *groups,
+                func.count().label("calls"),
+                func.count().filter(LLMUsage.status == "error").label("errors"),
+                func.sum(LLMUsage.prompt_tokens).label("prompt_tokens"),
+                func.sum(LLMUsage.completion_tokens).label("completion_tokens"),
+                func.sum(LLMUsage.cached_tokens).label("cached_tokens"),
+                cost.label("cost_usd"),
+                func.avg(LLMUsage.latency_ms).label("avg_latency_ms"),
+                func.percentile_cont(0.95).within_group(LLMUsage.latency_ms).label("p95_latency_ms"),
+            )
+            .filter(LLMUsage.created_at >= since)
+            .group_by(*groups)
+        )
+        order = [groups[group_by.index("day")].desc()] if "day" in group_by else []
+        rows = query.order_by(*order, cost.desc().nullslast()).all()
+    except Exception as e:
+        logger.error(f"LLM 사용량 집계 실패: {e}")
+        rows = []
+    finally:
+        db.close()
+
+    report = []
+    for row in rows:
+        item = row._asdict()
+        if "day" in item:
+            item["day"] = item["day"].isoformat()
+        for key in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+            item[key] = int(item[key] or 0)
+        item["cost_usd"] = round(item["cost_usd"] or 0.0, 6)
+        item["avg_latency_ms"] = round(item["avg_latency_ms"] or 0.0, 1)
+        item["p95_latency_ms"] = round(item["p95_latency_ms"] or 0.0, 1)
+        report.append(item)
+    totals = {
+        key: sum(item[key] for item in report)
+        for key in ("calls", "errors", "prompt_tokens", "completion_tokens", "cached_tokens")
+    }
+    totals["cost_usd"] = round(sum(item["cost_usd"] for item in report), 6)
+    return {"since": since.isoformat(), "days": days, "group_by": list(group_by), "totals": totals, "rows": report}
@@ -0,0 +1,96 @@
+"""
+Prometheus metrics for the API process, exposed at /metrics.
+Covers HTTP latency per route, the SQLAlchemy connection pool, legacy SQL queries, cache hit/miss
+counts and LLM calls per model and caller. Metrics are per process: scrape every worker (or run one worker per
+container) rather than expecting numbers aggregated across workers.
+"""
+import time
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from starlette.requests import Request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+# --- HTTP ---
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served.", ["method"])
+
+# --- Database pool ---
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.", buckets=POOL_WAIT_BUCKETS,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Pool checkouts that timed out.")
+
+# --- Database queries (legacy SQL layer, labelled by query name) ---
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Legacy SQL execution time by query name.", ["query"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_ROWS = Counter("db_query_rows_total", "Rows returned or affected by query name.", ["query"])
+DB_SLOW_QUERIES = Counter("db_slow_queries_total", "Executions over SLOW_QUERY_THRESHOLD_MS by query name.", ["query"])
+
+# --- Caches ---
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"])
+
+# --- LLM ---
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds", "LLM/embedding call latency per attempt, including limiter wait.",
+    ["model", "caller", "outcome"], buckets=LLM_LATENCY_BUCKETS,
+)
+LLM_CALLS = Counter("llm_calls_total", "LLM call attempts by outcome (ok/retry/error).", ["model", "caller", "outcome"])
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the API (estimate when it reports none).", ["model", "caller"])
+
+# --- Routing ---
+ROUTE_DECISIONS = Counter("agent_route_decisions_total", "Which path AI requests take.", ["agent", "route"])
+
+
+def record_cache(cache: str, hits: int, misses: int = 0) -> None:
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+
+class PoolCollector:
+    """Pool occupancy read at scrape time from the SQLAlchemy QueuePool."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.pool
+        metrics = {
+            "db_pool_size": ("Configured pool size.", pool.size()),
+            "db_pool_checked_out": ("Connections in use.", pool.checkedout()),
+            "db_pool_checked_in": ("Idle connections in the pool.", pool.checkedin()),
+            "db_pool_overflow": ("Connections opened beyond pool_size.", max(pool.overflow(), 0)),
+        }
+        for name, (documentation, value) in metrics.items():
+            yield GaugeMetricFamily(name, documentation, value=value)
+
+
+def register_pool(engine) -> None:
+    REGISTRY.register(PoolCollector(engine))
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Times every request and labels it with the matched route template (not the raw path)."""
+    method = request.method
+    HTTP_REQUESTS_IN_PROGRESS.labels(method).inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.labels(method, getattr(route, "path", "unmatched"), str(status)).observe(
+            time.perf_counter() - started
+        )
+        HTTP_REQUESTS_IN_PROGRESS.labels(method).dec()
@@ -0,0 +1,265 @@
+"""
+Per-run tracing of AI requests.
+Every orchestrator run records a trace: one span per LangGraph node and tool (via a LangChain
+callback handler), plus the CS router and fast-path answers, each with its duration, LLM token
+usage and retrieved document ids. Finished traces go to an in-process ring buffer, keyed by trace
+id and by the inquiry log_id once the CS router has saved the log, and are browsed through the
+admin router (slowest runs, per-node latency).
+"""
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from backend.config.settings import settings
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str  # "router" | "node" | "tool" | "llm"
+    start_ms: float  # offset from the start of the trace
+    duration_ms: float | None = None
+    status: str = "ok"
+    attributes: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "start_ms": round(self.start_ms, 1),
+            "duration_ms": round(self.duration_ms, 1) if self.duration_ms is not None else None,
+            "status": self.status,
+            **({"attributes": self.attributes} if self.attributes else {}),
+        }
+
+
+@dataclass
+class Trace:
+    session_type: str
+    query: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    log_id: str | None = None
+    started_at: float = field(default_factory=time.time)
+    duration_ms: float | None = None
+    route: str | None = None
+    spans: list[Span] = field(default_factory=list)
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def now_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def open_span(self, name: str, kind: str, **attributes) -> Span:
+        span = Span(name=name, kind=kind, start_ms=self.now_ms(), attributes=attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def close_span(self, span: Span, status: str = "ok") -> None:
+        span.duration_ms = self.now_ms() - span.start_ms
+        span.status = status
+
+    @property
+    def loops(self) -> int:
+        """Tool round-trips of the agent (each "tools" node run sends the model back to "generate")."""
+        return sum(1 for s in self.spans if s.kind == "node" and s.name == "tools")
+
+    @property
+    def tokens(self) -> int:
+        return sum(s.attributes.get("tokens", 0) for s in self.spans if s.kind in ("node", "router"))
+
+    def summary(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "log_id": self.log_id,
+            "session_type": self.session_type,
+            "query": self.query[:80],
+            "route": self.route,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 1) if self.duration_ms is not None else None,
+            "loops": self.loops,
+            "tokens": self.tokens,
+            "spans": len(self.spans),
+        }
+
+    def to_dict(self) -> dict:
+        return {**self.summary(), "query": self.query, "spans": [s.to_dict() for s in self.spans]}
+
+
+class TraceStore:
+    """Thread-safe ring buffer of finished traces."""
+
+    def __init__(self, maxsize: int):
+        self._lock = threading.Lock()
+        self._traces: deque[Trace] = deque(maxlen=maxsize)
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def _all(self, session_type: str | None = None) -> list[Trace]:
+        with self._lock:
+            traces = list(self._traces)
+        return [t for t in traces if session_type is None or t.session_type == session_type]
+
+    def attach_log_id(self, trace_id: str, log_id: str) -> None:
+        for trace in self._all():
+            if trace.trace_id == trace_id:
+                trace.log_id = log_id
+                return
+
+    def get(self, key: str) -> Trace | None:
+        """Look a trace up by log_id or trace id."""
+        for trace in reversed(self._all()):
+            if key in (trace.log_id, trace.trace_id):
+                return trace
+        return None
+
+    def slowest(self, limit: int = 20, session_type: str | None = None) -> list[dict]:
+        traces = sorted(self._all(session_type), key=lambda t: t.duration_ms or 0, reverse=True)
+        return [t.summary() for t in traces[:limit]]
+
+    def span_stats(self, session_type: str | None = None) -> list[dict]:
+        """Latency per (kind, name) over the buffered traces, slowest total first."""
+        durations: dict[tuple[str, str], list[float]] = {}
+        for trace in self._all(session_type):
+            for span in trace.spans:
+                if span.duration_ms is not None:
+                    durations.setdefault((span.kind, span.name), []).append(span.duration_ms)
+        stats = []
+        for (kind, name), values in durations.items():
+            values.sort()
+            stats.append({
+                "kind": kind,
+                "name": name,
+                "count": len(values),
+                "total_ms": round(sum(values), 1),
+                "avg_ms": round(sum(values) / len(values), 1),
+                "p50_ms": round(values[len(values) // 2], 1),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+                "max_ms": round(values[-1], 1),
+            })
+        return sorted(stats, key=lambda s: s["total_ms"], reverse=True)
+
+
+trace_store = TraceStore(settings.TRACE_BUFFER_SIZE)
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+
+
+def current_trace() -> Trace | None:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(session_type: str, query: str):
+    """Trace one orchestrator run; yields the Trace (None when tracing is disabled)."""
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+    trace = Trace(session_type=session_type, query=query)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        trace.duration_ms = trace.now_ms()
+        trace_store.add(trace)
+
+
+@contextmanager
+def span(name: str, kind: str, **attributes):
+    """Record a span on the current trace; yields its attribute dict (None outside a trace)."""
+    trace = current_trace()
+    if trace is None:
+        yield None
+        return
+    opened = trace.open_span(name, kind, **attributes)
+    try:
+        yield opened.attributes
+    except BaseException:
+        trace.close_span(opened, status="error")
+        raise
+    trace.close_span(opened)
+
+
+def retrieved_ids(retrieval_trace: dict) -> list[str]:
+    """Ids of the passages a retrieval put into the prompt (see rag_service.select_passages)."""
+    return [c["id"] for c in retrieval_trace.get("candidates", []) if c.get("selected")]
+
+
+def usage_tokens(message: Any) -> int:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("total_tokens", 0)
+
+
+class GraphTraceHandler(BaseCallbackHandler):
+    """
+    LangChain callbacks -> spans. A span per LangGraph node run (chain events whose name is the
+    node name) and per tool run; chat model token usage is added to the node that made the call.
+    """
+
+    run_inline = True
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self._spans: dict[Any, Span] = {}
+        self._parents: dict[Any, Any] = {}
+
+    def _node_of(self, run_id) -> Span | None:
+        while run_id is not None:
+            span = self._spans.get(run_id)
+            if span is not None and span.kind == "node":
+                return span
+            run_id = self._parents.get(run_id)
+        return None
+
+    def _close(self, run_id, status: str = "ok") -> Span | None:
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            self.trace.close_span(span, status)
+        return span
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self._parents[run_id] = parent_run_id
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._spans[run_id] = self.trace.open_span(node, "node", step=(metadata or {}).get("langgraph_step"))
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        span = self._close(run_id)
+        if span is not None and isinstance(outputs, dict) and outputs.get("retrieval_trace"):
+            span.attributes["documents"] = retrieved_ids(outputs["retrieval_trace"])
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, status="error")
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._parents[run_id] = parent_run_id
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        self._spans[run_id] = self.trace.open_span(name, "tool")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, status="error")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._parents[run_id] = parent_run_id
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        node = self._node_of(self._parents.get(run_id))
+        if node is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                tokens = usage_tokens(getattr(generation, "message", None))
+                if tokens:
+                    node.attributes["tokens"] = node.attributes.get("tokens", 0) + tokens
@@ -0,0 +1,73 @@
+"""
+Background warm-up of the API process's heavy components.
+The lifespan only registers components and starts the warm-up task, so the worker accepts traffic
+(and answers /health/live) immediately. Each component is also initialised lazily on first use,
+so a request that arrives before warm-up finishes still works, and a component that fails to
+warm up (database down, missing API key) is reported by /health/ready instead of killing startup.
+"""
+import asyncio
+import logging
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+class Warmup:
+    def __init__(self):
+        self._components: dict[str, dict] = {}
+        self._initializers: dict[str, Callable[[], object]] = {}
+        self._task: asyncio.Task | None = None
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    def register(self, name: str, initializer: Callable[[], object], required: bool = True) -> None:
+        """`initializer` is a blocking callable run in a worker thread; optional components do not gate readiness."""
+        self._initializers[name] = initializer
+        self._components[name] = {"status": PENDING, "required": required, "elapsed_ms": None, "error": None}
+
+    async def _warm(self, name: str) -> None:
+        state = self._components[name]
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._initializers[name])
+            state["status"] = READY
+        except Exception as e:
+            state["status"] = FAILED
+            state["error"] = f"{type(e).__name__}: {e}"
+            logger.error(f"웜업 실패 ({name}): {e}")
+        state["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def run(self) -> None:
+        self.started_at = time.time()
+        await asyncio.gather(*(self._warm(name) for name in self._initializers))
+        self.finished_at = time.time()
+        logger.info(f"웜업 완료: {self.snapshot()}")
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def aclose(self) -> None:
+        """Wait for an in-progress warm-up (its threads cannot be interrupted) before shutdown."""
+        if self._task is not None and not self._task.done():
+            await self._task
+        self._task = None
+
+    @property
+    def ready(self) -> bool:
+        return all(c["status"] == READY for c in self._components.values() if c["required"])
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "components": {name: dict(state) for name, state in self._components.items()},
+        }
+
+
+warmup = Warmup()
@@ -39,6 +39,7 @@ _original_db_connector.get_db_connection = _patched_get_db_connection
 
 # Re-export all public functions from the original module so routers
 # can do: from backend.database.legacy import get_customers_from_db, etc.
+get_db_connection = _original_db_connector.get_db_connection
 get_customers_from_db = _original_db_connector.get_customers_from_db
 get_products_from_db = _original_db_connector.get_products_from_db
 get_orders_from_db = _original_db_connector.get_orders_from_db
@@ -51,12 +52,25 @@ get_pending_claims_count = _original_db_connector.get_pending_claims_count
 get_low_stock_products_count = _original_db_connector.get_low_stock_products_count
 get_low_stock_products = _original_db_connector.get_low_stock_products
 get_recent_negative_reviews = _original_db_connector.get_recent_negative_reviews
+get_reviews_for_reply = _original_db_connector.get_reviews_for_reply
+get_unindexed_texts = _original_db_connector.get_unindexed_texts
+iter_reviews_in_window = _original_db_connector.iter_reviews_in_window
+get_customer_rfm_aggregates = _original_db_connector.get_customer_rfm_aggregates
+bulk_update_customer_rfm = _original_db_connector.bulk_update_customer_rfm
+get_churn_features = _original_db_connector.get_churn_features
+get_churn_risk_customers = _original_db_connector.get_churn_risk_customers
+iter_rag_source_rows = _original_db_connector.iter_rag_source_rows
+get_order_fulfilment_snapshot = _original_db_connector.get_order_fulfilment_snapshot
+get_sales_watermark = _original_db_connector.get_sales_watermark
+get_daily_product_sales = _original_db_connector.get_daily_product_sales
 get_claims_by_customer = _original_db_connector.get_claims_by_customer
 get_reviews_by_customer = _original_db_connector.get_reviews_by_customer
 get_inquiries_by_status = _original_db_connector.get_inquiries_by_status
 get_failure_logs_by_customer = _original_db_connector.get_failure_logs_by_customer
 save_inquiry_log = _original_db_connector.save_inquiry_log
 update_inquiry_log_feedback = _original_db_connector.update_inquiry_log_feedback
+get_inquiry_logs_by_ids = _original_db_connector.get_inquiry_logs_by_ids
+mark_inquiry_logs_learned = _original_db_connector.mark_inquiry_logs_learned
 initialize_db_and_data = _original_db_connector.initialize_db_and_data
 load_manuals_from_json = _original_db_connector.load_manuals_from_json
 calculate_product_margins = _original_db_connector.calculate_product_margins
@@ -1,10 +1,14 @@
 import os
 import psycopg2
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 import json
-from typing import List, Dict, Any
-from backend.services.rag_service import RAGConnector
+from datetime import date, datetime, time, timedelta
+from typing import List, Dict, Any, Iterator
+from backend.services.rag_service import rag_connector
+from backend.services.rule_journal import rule_journal
 from backend.schemas.legacy import FailureLog
+from backend.database.query_stats import measure, timed_execute
 
 # 환경 변수 로드
 load_dotenv()
@@ -51,7 +55,7 @@ def get_customers_from_db() -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT customer_id, name, segment, total_spend, total_orders, last_order_date, main_category, avg_rating, total_claims FROM customers")
+            timed_execute(cur, "get_customers_from_db", "SELECT customer_id, name, segment, total_spend, total_orders, last_order_date, main_category, avg_rating, total_claims FROM customers")
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in cur.fetchall()]
     except Exception as e:
@@ -66,7 +70,7 @@ def get_products_from_db() -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT origin_product_no, product_name, category_name, sale_price, cost_price, stock_quantity, status FROM products")
+            timed_execute(cur, "get_products_from_db", "SELECT origin_product_no, product_name, category_name, sale_price, cost_price, stock_quantity, status FROM products")
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in cur.fetchall()]
     except Exception as e:
@@ -81,7 +85,7 @@ def get_orders_from_db() -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute("""
+            timed_execute(cur, "get_orders_from_db", """
                 SELECT 
                     o.product_order_id, o.order_id, o.origin_product_no, o.product_name, 
                     o.quantity, o.total_amount, o.customer_id, o.order_status, 
@@ -104,7 +108,7 @@ def get_qnas_from_db() -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT question_id, origin_product_no, customer_id, question_type, question_text, is_answered, answer_text FROM qnas")
+            timed_execute(cur, "get_qnas_from_db", "SELECT question_id, origin_product_no, customer_id, question_type, question_text, is_answered, answer_text FROM qnas")
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in cur.fetchall()]
     except Exception as e:
@@ -113,13 +117,43 @@ def get_qnas_from_db() -> List[Dict[str, Any]]:
     finally:
         conn.close()
 
-def get_reviews_from_db() -> List[Dict[str, Any]]:
-    """DB에서 리뷰 데이터를 조회합니다."""
+def get_reviews_from_db(rating: int = None, product_id: int = None, aspect: str = None,
+                        aspect_sentiment: str = None, since: date = None,
+                        utc_offset_hours: int = 9) -> List[Dict[str, Any]]:
+    """
+    DB에서 리뷰 데이터를 조회합니다.
+    :param rating: 이 평점의 리뷰만 조회
+    :param product_id: 이 상품의 리뷰만 조회
+    :param aspect: 키워드 인덱스(text_index_docs)에서 이 관점(delivery, taste 등)이 언급된 리뷰만 조회
+    :param aspect_sentiment: aspect와 함께 지정하면 해당 극성("positive" / "negative")인 리뷰만 조회
+    :param since: 이 스토어 현지 날짜 이후에 작성된 리뷰만 조회 (created_at은 UTC)
+    """
     conn = get_db_connection()
     if not conn: return []
+    conditions, params = [], []
+    if rating:
+        conditions.append("r.rating = %s")
+        params.append(rating)
+    if product_id is not None:
+        conditions.append("r.product_id = %s")
+        params.append(product_id)
+    if aspect:
+        polarity = "t.aspects ->> %s = %s" if aspect_sentiment else "t.aspects ->> %s IS NOT NULL"
+        conditions.append(
+            f"EXISTS (SELECT 1 FROM text_index_docs t WHERE t.source = 'review' AND t.doc_id = r.review_id AND {polarity})"
+        )
+        params.extend([aspect, aspect_sentiment] if aspect_sentiment else [aspect])
+    if since is not None:
+        conditions.append("r.created_at >= %s")
+        params.append(datetime.combine(since, time.min) - timedelta(hours=utc_offset_hours))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT review_id, customer_id, product_id, rating, review_text, created_at FROM reviews")
+            timed_execute(
+                cur, "get_reviews_from_db",
+                f"SELECT r.review_id, r.customer_id, r.product_id, r.rating, r.review_text, r.created_at FROM reviews r {where}",
+                params
+            )
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in cur.fetchall()]
     except Exception as e:
@@ -128,7 +162,6 @@ def get_reviews_from_db() -> List[Dict[str, Any]]:
     finally:
         conn.close()
 
-from datetime import datetime, timedelta
 
 def calculate_product_margins(period_days: int = 7) -> List[Dict[str, Any]]:
     """
@@ -145,7 +178,8 @@ def calculate_product_margins(period_days: int = 7) -> List[Dict[str, Any]]:
             cutoff_date = datetime.now() - timedelta(days=period_days)
 
             # 상품 정보 (원가 포함)와 주문 정보를 조인하여 마진 계산
-            cur.execute(
+            timed_execute(
+                cur, "calculate_product_margins",
                 """
                 SELECT
                     p.origin_product_no,
@@ -213,7 +247,8 @@ def get_customers_by_segment(segment: str) -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute(
+            timed_execute(
+                cur, "get_customers_by_segment",
                 "SELECT customer_id, name, segment, total_spend, total_orders, last_order_date, main_category, avg_rating, total_claims FROM customers WHERE segment = %s",
                 (segment,)
             )
@@ -231,7 +266,7 @@ def get_settlement_data_from_db() -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT settle_date, total_payment_amount, total_commission, total_settlement_amount FROM settlement ORDER BY settle_date ASC")
+            timed_execute(cur, "get_settlement_data_from_db", "SELECT settle_date, total_payment_amount, total_commission, total_settlement_amount FROM settlement ORDER BY settle_date ASC")
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in cur.fetchall()]
     except Exception as e:
@@ -246,7 +281,7 @@ def get_unanswered_qnas_count() -> int:
     if not conn: return 0
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM qnas WHERE is_answered = FALSE")
+            timed_execute(cur, "get_unanswered_qnas_count", "SELECT COUNT(*) FROM qnas WHERE is_answered = FALSE")
             return cur.fetchone()[0]
     except Exception as e:
         print(f"⚠️ 미답변 문의 수 조회 중 오류 발생: {e}")
@@ -262,7 +297,7 @@ def get_pending_claims_count() -> int:
         with conn.cursor() as cur:
             # claim_type이 null이 아니고, order_status가 'RETURN' 또는 'EXCHANGE'인 경우를 처리 대기로 간주
             # 또는 claimData가 있으나 status가 'APPROVED'가 아닌 건수
-            cur.execute("SELECT COUNT(*) FROM orders WHERE claim_type IS NOT NULL AND (order_status = 'RETURN' OR order_status = 'EXCHANGE')")
+            timed_execute(cur, "get_pending_claims_count", "SELECT COUNT(*) FROM orders WHERE claim_type IS NOT NULL AND (order_status = 'RETURN' OR order_status = 'EXCHANGE')")
             return cur.fetchone()[0]
     except Exception as e:
         print(f"⚠️ 처리 대기 클레임 수 조회 중 오류 발생: {e}")
@@ -276,7 +311,7 @@ def get_low_stock_products_count(threshold: int = 50) -> int:
     if not conn: return 0
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM products WHERE stock_quantity < %s", (threshold,))
+            timed_execute(cur, "get_low_stock_products_count", "SELECT COUNT(*) FROM products WHERE stock_quantity < %s", (threshold,))
             return cur.fetchone()[0]
     except Exception as e:
         print(f"⚠️ 재고 위험 상품 수 조회 중 오류 발생: {e}")
@@ -290,7 +325,7 @@ def get_low_stock_products(threshold: int = 50) -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT origin_product_no, product_name, stock_quantity FROM products WHERE stock_quantity < %s", (threshold,))
+            timed_execute(cur, "get_low_stock_products", "SELECT origin_product_no, product_name, stock_quantity FROM products WHERE stock_quantity < %s", (threshold,))
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in cur.fetchall()]
     except Exception as e:
@@ -306,7 +341,8 @@ def get_recent_negative_reviews(hours: int = 24, rating_threshold: int = 2) -> L
     try:
         with conn.cursor() as cur:
             # created_at이 TIMESTAMP WITH TIME ZONE 타입일 경우, 타임존 고려
-            cur.execute(
+            timed_execute(
+                cur, "get_recent_negative_reviews",
                 "SELECT review_id, product_id, review_text, rating, created_at FROM reviews WHERE created_at >= NOW() - INTERVAL '%s hours' AND rating <= %s",
                 (hours, rating_threshold)
             )
@@ -318,6 +354,448 @@ def get_recent_negative_reviews(hours: int = 24, rating_threshold: int = 2) -> L
     finally:
         conn.close()
 
+def iter_reviews_in_window(since: datetime, max_rating: int = 2, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    기간/평점 조건에 맞는 리뷰를 서버 사이드 커서로 작성 시각 순서대로 스트리밍합니다.
+    전체 리뷰를 메모리에 올리지 않고 batch_size 단위로 가져옵니다.
+    :param since: 이 시각 이후 작성된 리뷰만 조회
+    :param max_rating: 이 평점 이하의 리뷰만 조회
+    """
+    conn = get_db_connection()
+    if not conn: return
+    try:
+        with conn.cursor(name="review_window_stream") as cur:
+            cur.itersize = batch_size
+            timed_execute(
+                cur, "iter_reviews_in_window",
+                """
+                SELECT r.review_id, r.product_id, p.product_name, r.rating, r.review_text, r.created_at
+                FROM reviews r
+                LEFT JOIN products p ON p.origin_product_no = r.product_id
+                WHERE r.created_at >= %s AND r.rating <= %s
+                ORDER BY r.created_at, r.review_id
+                """,
+                (since, max_rating)
+            )
+            columns = None
+            for row in cur:
+                if columns is None:
+                    columns = [desc[0] for desc in cur.description]
+                yield dict(zip(columns, row))
+    except Exception as e:
+        print(f"⚠️ 기간별 리뷰 스트리밍 조회 중 오류 발생: {e}")
+    finally:
+        conn.close()
+
+RAG_SOURCE_QUERIES = {
+    "product": """
+        SELECT origin_product_no, product_name, category_name, sale_price, status
+        FROM products
+        ORDER BY origin_product_no
+    """,
+    "qna": """
+        SELECT q.question_id, q.origin_product_no, p.product_name, q.question_type, q.question_text,
+               q.is_answered, q.answer_text
+        FROM qnas q
+        LEFT JOIN products p ON p.origin_product_no = q.origin_product_no
+        ORDER BY q.question_id
+    """,
+    "review": """
+        SELECT r.review_id, r.product_id, p.product_name, r.rating, r.review_text, r.created_at
+        FROM reviews r
+        LEFT JOIN products p ON p.origin_product_no = r.product_id
+        ORDER BY r.review_id
+    """,
+}
+
+def iter_rag_source_rows(source: str, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    RAG 적재용 원본 행(상품/Q&A/리뷰)을 서버 사이드 커서로 스트리밍합니다.
+    :param source: "product", "qna", "review" 중 하나
+    :param batch_size: 한 번에 가져올 행 수
+    """
+    conn = get_db_connection()
+    if not conn: return
+    try:
+        with conn.cursor(name=f"rag_{source}_stream") as cur:
+            cur.itersize = batch_size
+            timed_execute(cur, f"iter_rag_source_rows.{source}", RAG_SOURCE_QUERIES[source])
+            columns = None
+            for row in cur:
+                if columns is None:
+                    columns = [desc[0] for desc in cur.description]
+                yield dict(zip(columns, row))
+    except Exception as e:
+        print(f"⚠️ RAG 원본 데이터({source}) 스트리밍 조회 중 오류 발생: {e}")
+    finally:
+        conn.close()
+
+def get_customer_rfm_aggregates(since: datetime = None, last_order_ranges: List[tuple] = None) -> List[Dict[str, Any]]:
+    """
+    고객별 RFM 집계(최근 구매 시각, 주문 수, 구매 금액, 클레임 수)를 한 번의 집계 쿼리로 조회합니다.
+    현재 customers 테이블에 저장된 값도 함께 반환하여 변경된 고객만 갱신할 수 있게 합니다.
+    :param since: 지정하면 이 시각 이후 주문(결제)이 발생한 고객만 조회 (증분 갱신)
+    :param last_order_ranges: since와 함께 지정하면 저장된 최근 주문일(last_order_date)이
+                              이 (시작일, 종료일) 구간에 속하는 고객도 함께 조회
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    if since is not None:
+        subquery = "SELECT customer_id FROM orders WHERE payment_date > %s"
+        params = [since]
+        for start, end in last_order_ranges or []:
+            subquery += " UNION SELECT customer_id FROM customers WHERE last_order_date BETWEEN %s AND %s"
+            params.extend([start, end])
+        scope = f"WHERE customer_id IN ({subquery})"
+    else:
+        scope, params = "", []
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_customer_rfm_aggregates",
+                f"""
+                WITH agg AS (
+                    SELECT
+                        customer_id,
+                        MAX(payment_date) FILTER (WHERE order_status NOT IN ('취소', '환불')) AS last_payment,
+                        MIN(payment_date) FILTER (WHERE order_status NOT IN ('취소', '환불')) AS first_payment,
+                        COUNT(DISTINCT order_id) FILTER (WHERE order_status NOT IN ('취소', '환불')) AS frequency,
+                        COALESCE(SUM(total_amount) FILTER (WHERE order_status NOT IN ('취소', '환불')), 0) AS monetary,
+                        COUNT(claim_type) AS claims,
+                        MAX(payment_date) AS last_activity
+                    FROM orders
+                    {scope}
+                    GROUP BY customer_id
+                )
+                SELECT
+                    c.customer_id, c.segment, c.total_spend, c.total_orders, c.last_order_date, c.total_claims,
+                    a.last_payment, a.first_payment, COALESCE(a.frequency, 0) AS frequency,
+                    COALESCE(a.monetary, 0) AS monetary, COALESCE(a.claims, 0) AS claims, a.last_activity
+                FROM customers c
+                {"JOIN" if since is not None else "LEFT JOIN"} agg a ON a.customer_id = c.customer_id
+                """,
+                params
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"⚠️ 고객 RFM 집계 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        conn.close()
+
+def bulk_update_customer_rfm(rows: List[tuple]) -> int:
+    """
+    고객 세그먼트와 집계 값을 한 번의 UPDATE ... FROM (VALUES ...)로 갱신합니다.
+    :param rows: (customer_id, segment, total_spend, total_orders, last_order_date, total_claims) 튜플 목록
+    :return: 갱신 요청한 행 수
+    """
+    if not rows: return 0
+    conn = get_db_connection()
+    if not conn: return 0
+    try:
+        with conn.cursor() as cur, measure(cur, "bulk_update_customer_rfm"):
+            execute_values(
+                cur,
+                """
+                UPDATE customers AS c SET
+                    segment = v.segment,
+                    total_spend = v.total_spend,
+                    total_orders = v.total_orders,
+                    last_order_date = v.last_order_date,
+                    total_claims = v.total_claims
+                FROM (VALUES %s) AS v(customer_id, segment, total_spend, total_orders, last_order_date, total_claims)
+                WHERE c.customer_id = v.customer_id
+                """,
+                rows,
+                template="(%s, %s, %s::integer, %s::integer, %s::date, %s::integer)",
+                page_size=1000
+            )
+        conn.commit()
+        return len(rows)
+    except Exception as e:
+        print(f"⚠️ 고객 세그먼트 일괄 갱신 중 오류 발생: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        conn.close()
+
+def get_churn_features() -> List[Dict[str, Any]]:
+    """
+    이탈 위험 점수 계산에 필요한 고객별 특성을 한 번의 쿼리로 조회합니다.
+    주문(최근/최초 구매, 주문 수, 클레임 수), 리뷰 평균 평점, CS 실패 문의 수를 함께 집계합니다.
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_churn_features",
+                """
+                WITH o AS (
+                    SELECT
+                        customer_id,
+                        MAX(payment_date) FILTER (WHERE order_status NOT IN ('취소', '환불')) AS last_payment,
+                        MIN(payment_date) FILTER (WHERE order_status NOT IN ('취소', '환불')) AS first_payment,
+                        COUNT(DISTINCT order_id) FILTER (WHERE order_status NOT IN ('취소', '환불')) AS order_count,
+                        COUNT(*) AS order_lines,
+                        COUNT(claim_type) AS claim_count
+                    FROM orders
+                    GROUP BY customer_id
+                ),
+                r AS (
+                    SELECT customer_id, AVG(rating)::float AS avg_rating, COUNT(*) AS review_count
+                    FROM reviews
+                    GROUP BY customer_id
+                ),
+                l AS (
+                    SELECT customer_id, COUNT(*) FILTER (WHERE resolution_feedback = 'failure') AS failed_cs
+                    FROM inquiry_logs
+                    GROUP BY customer_id
+                )
+                SELECT
+                    c.customer_id, o.last_payment, o.first_payment,
+                    COALESCE(o.order_count, 0) AS order_count, COALESCE(o.order_lines, 0) AS order_lines,
+                    COALESCE(o.claim_count, 0) AS claim_count,
+                    r.avg_rating, COALESCE(r.review_count, 0) AS review_count,
+                    COALESCE(l.failed_cs, 0) AS failed_cs
+                FROM customers c
+                LEFT JOIN o ON o.customer_id = c.customer_id
+                LEFT JOIN r ON r.customer_id = c.customer_id
+                LEFT JOIN l ON l.customer_id = c.customer_id
+                """
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"⚠️ 이탈 위험 특성 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        conn.close()
+
+def get_churn_risk_customers(risk_level: str = None, min_score: float = None,
+                             limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    저장된 이탈 위험 점수(customer_churn_scores)를 점수 내림차순으로 고객 정보와 함께 조회합니다.
+    :param risk_level: "high" | "medium" | "low" 필터
+    :param min_score: 이 점수 이상만 조회
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    conditions, params = [], []
+    if risk_level:
+        conditions.append("s.risk_level = %s")
+        params.append(risk_level)
+    if min_score is not None:
+        conditions.append("s.score >= %s")
+        params.append(min_score)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.extend([limit, offset])
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_churn_risk_customers",
+                f"""
+                SELECT
+                    c.customer_id, c.name, c.segment, c.total_spend, c.total_orders, c.last_order_date,
+                    s.score, s.risk_level, s.top_factors, s.scored_at
+                FROM customer_churn_scores s
+                JOIN customers c ON c.customer_id = s.customer_id
+                {where}
+                ORDER BY s.score DESC
+                LIMIT %s OFFSET %s
+                """,
+                params
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"⚠️ 이탈 위험 고객 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        conn.close()
+
+def get_reviews_for_reply(review_ids: List[str] = None, max_rating: int = None, unreplied: bool = False,
+                          limit: int = 200, draft_artifact_type: str = "review_reply_draft") -> List[Dict[str, Any]]:
+    """
+    답변 초안 생성 대상 리뷰를 상품명과 함께 조회합니다.
+    :param review_ids: 특정 리뷰 ID 목록 (없으면 전체 대상)
+    :param max_rating: 이 평점 이하의 리뷰만 조회
+    :param unreplied: True이면 저장된 답변 초안(ai_cache)이 없는 리뷰만 조회
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    conditions, params = [], []
+    if review_ids:
+        conditions.append("r.review_id = ANY(%s)")
+        params.append(list(review_ids))
+    if max_rating is not None:
+        conditions.append("r.rating <= %s")
+        params.append(max_rating)
+    if unreplied:
+        conditions.append(
+            "NOT EXISTS (SELECT 1 FROM ai_cache a WHERE a.artifact_type = %s AND a.entity_id = r.review_id)"
+        )
+        params.append(draft_artifact_type)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit)
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_reviews_for_reply",
+                f"""
+                SELECT r.review_id, r.product_id, p.product_name, r.rating, r.review_text, r.created_at
+                FROM reviews r
+                LEFT JOIN products p ON p.origin_product_no = r.product_id
+                {where}
+                ORDER BY r.rating ASC, r.created_at DESC
+                LIMIT %s
+                """,
+                params
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"⚠️ 답변 대상 리뷰 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        conn.close()
+
+def get_unindexed_texts(limit: int = 1000, utc_offset_hours: int = 9) -> List[Dict[str, Any]]:
+    """
+    키워드/관점 인덱스(text_index_docs)에 아직 반영되지 않은 리뷰와 문의를 조회합니다.
+    day는 스토어 현지 날짜이며, 작성 시각이 없는 문의는 인덱싱한 날짜로 집계합니다.
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_unindexed_texts",
+                """
+                SELECT 'review' AS source, r.review_id AS doc_id, COALESCE(r.product_id, 0) AS product_id,
+                       COALESCE((r.created_at + make_interval(hours => %s))::date, CURRENT_DATE) AS day,
+                       r.review_text AS text, r.rating
+                FROM reviews r
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM text_index_docs d WHERE d.source = 'review' AND d.doc_id = r.review_id
+                )
+                UNION ALL
+                SELECT 'qna', q.question_id, COALESCE(q.origin_product_no, 0), CURRENT_DATE, q.question_text, NULL
+                FROM qnas q
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM text_index_docs d WHERE d.source = 'qna' AND d.doc_id = q.question_id
+                )
+                LIMIT %s
+                """,
+                (utc_offset_hours, limit)
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"⚠️ 미색인 리뷰/문의 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        conn.close()
+
+def get_order_fulfilment_snapshot(order_ids: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    지연/지연 위험 판단에 필요한 주문 정보를 한 번의 쿼리로 조회합니다.
+    고객 세그먼트와 스토어 당일 발송 마감 시간(same_day_cutoff)을 함께 가져옵니다.
+    :param order_ids: 특정 주문 ID(order_id 또는 product_order_id) 목록. 없으면 미배송 주문 전체
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    if order_ids:
+        where = "WHERE o.order_id = ANY(%s) OR o.product_order_id = ANY(%s)"
+        params = (list(order_ids), list(order_ids))
+    else:
+        where = "WHERE o.delivery_complete_date IS NULL AND o.order_status NOT IN ('취소', '환불')"
+        params = ()
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_order_fulfilment_snapshot",
+                f"""
+                SELECT
+                    o.product_order_id, o.order_id, o.product_name, o.quantity, o.total_amount,
+                    o.customer_id, c.name AS customer_name, c.segment AS customer_segment,
+                    o.order_status, o.payment_date, o.delivery_complete_date, o.claim_type, o.claim_reason,
+                    s.same_day_cutoff
+                FROM orders o
+                LEFT JOIN customers c ON o.customer_id = c.customer_id
+                LEFT JOIN (SELECT same_day_cutoff FROM store_settings ORDER BY id LIMIT 1) s ON TRUE
+                {where}
+                """,
+                params
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"⚠️ 주문 지연 분석 데이터 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        conn.close()
+
+def get_sales_watermark() -> Dict[str, Any]:
+    """
+    수요 예측 캐시 무효화용 워터마크를 조회합니다.
+    주문 건수/최신 결제 시각과 전체 재고 합계가 바뀌면 예측을 다시 계산합니다.
+    """
+    conn = get_db_connection()
+    if not conn: return {}
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_sales_watermark",
+                """
+                SELECT
+                    (SELECT COUNT(*) FROM orders) AS order_count,
+                    (SELECT MAX(payment_date) FROM orders) AS last_payment_date,
+                    (SELECT COALESCE(SUM(stock_quantity), 0) FROM products) AS total_stock
+                """
+            )
+            columns = [desc[0] for desc in cur.description]
+            return dict(zip(columns, cur.fetchone()))
+    except Exception as e:
+        print(f"⚠️ 판매 워터마크 조회 중 오류 발생: {e}")
+        return {}
+    finally:
+        conn.close()
+
+def get_daily_product_sales(start_date, utc_offset_hours: int = 9) -> List[Dict[str, Any]]:
+    """
+    상품별·일자별 판매 수량을 한 번의 집계 쿼리로 조회합니다. (취소/환불 제외)
+    day_index는 start_date로부터 경과한 일 수입니다.
+    :param start_date: 집계 시작일 (스토어 현지 날짜 기준)
+    :param utc_offset_hours: 결제 시각(UTC)을 스토어 현지 날짜로 바꿀 때 더할 시간
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_daily_product_sales",
+                """
+                SELECT
+                    origin_product_no,
+                    (payment_date + make_interval(hours => %s))::date - %s::date AS day_index,
+                    SUM(quantity) AS quantity
+                FROM orders
+                WHERE payment_date >= %s - make_interval(hours => %s)
+                  AND order_status NOT IN ('취소', '환불')
+                GROUP BY 1, 2
+                """,
+                (utc_offset_hours, start_date, start_date, utc_offset_hours)
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"⚠️ 일자별 판매 수량 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        conn.close()
+
 def initialize_db_and_data():
     """DB 테이블 생성 및 CS 매뉴얼 데이터를 로드하고 반환합니다."""
     
@@ -359,8 +837,8 @@ def initialize_db_and_data():
     finally:
         conn.close()
 
-    # 2. CS 매뉴얼 데이터 로드 및 DB 삽입 (로컬 JSON에서)
-    manuals = load_manuals_from_json()
+    # 2. CS 매뉴얼 데이터 로드 및 DB 삽입 (스냅샷 + 아직 압축되지 않은 규칙 저널)
+    manuals = rule_journal.load()
     if not manuals:
         return []
     
@@ -372,6 +850,8 @@ def initialize_db_and_data():
                 cur.execute("TRUNCATE cs_manuals RESTART IDENTITY;")
                 
                 for item in manuals:
+                    if not item.get('manual_id'):
+                        continue  # 자가진화 규칙(스냅샷에 압축된 항목)은 메타데이터 대상이 아님
                     cur.execute(
                         "INSERT INTO cs_manuals (manual_id, domain, difficulty, urgency) VALUES (%s, %s, %s, %s)",
                         (item['manual_id'], item['domain'], item['difficulty'], item['urgency'])
@@ -384,21 +864,23 @@ def initialize_db_and_data():
         finally:
             conn.close()
             
-    # 3. ChromaDB (벡터 콘텐츠) 로드 (CS 매뉴얼만 여기서 로드)
-    rag_connector = RAGConnector()
+    # 3. ChromaDB (벡터 콘텐츠) 적재: 변경된 문서만 배치 임베딩하여 upsert
+    def report(p):
+        print(f"   ... {p['source']}: {p['seen']}건 확인, 추가 {p['added']} / 갱신 {p['updated']} / 변경 없음 {p['unchanged']}")
+
     try:
-        rag_connector.add_manuals(manuals)
-        print("✅ ChromaDB: CS 매뉴얼 RAG 콘텐츠 로드 및 벡터화 완료.")
+        result = rag_connector.add_manuals(manuals, progress=report)
+        print(f"✅ ChromaDB: CS 매뉴얼 RAG 콘텐츠 동기화 완료. {result}")
 
-        # 제품, Q&A, 리뷰 데이터 벡터화
-        rag_connector.add_products(get_products_from_db())
-        print("✅ ChromaDB: 제품 정보 RAG 콘텐츠 로드 및 벡터화 완료.")
-        
-        rag_connector.add_qnas(get_qnas_from_db())
-        print("✅ ChromaDB: Q&A RAG 콘텐츠 로드 및 벡터화 완료.")
-        
-        rag_connector.add_reviews(get_reviews_from_db())
-        print("✅ ChromaDB: 리뷰 RAG 콘텐츠 로드 및 벡터화 완료.")
+        # 제품, Q&A, 리뷰 데이터는 커서로 스트리밍하며 벡터화
+        result = rag_connector.add_products(iter_rag_source_rows("product"), progress=report)
+        print(f"✅ ChromaDB: 제품 정보 RAG 콘텐츠 동기화 완료. {result}")
+
+        result = rag_connector.add_qnas(iter_rag_source_rows("qna"), progress=report)
+        print(f"✅ ChromaDB: Q&A RAG 콘텐츠 동기화 완료. {result}")
+
+        result = rag_connector.add_reviews(iter_rag_source_rows("review"), progress=report)
+        print(f"✅ ChromaDB: 리뷰 RAG 콘텐츠 동기화 완료. {result}")
 
     except Exception as e:
         print(f"⚠️ ChromaDB 저장 오류: {e}")
@@ -411,7 +893,8 @@ def get_claims_by_customer(customer_id: str) -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute(
+            timed_execute(
+                cur, "get_claims_by_customer",
                 "SELECT product_order_id, product_name, claim_type, claim_reason, order_status FROM orders WHERE customer_id = %s AND claim_type IS NOT NULL",
                 (customer_id,)
             )
@@ -429,7 +912,8 @@ def get_reviews_by_customer(customer_id: str) -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute(
+            timed_execute(
+                cur, "get_reviews_by_customer",
                 "SELECT review_id, product_id, rating, review_text, created_at FROM reviews WHERE customer_id = %s ORDER BY created_at DESC",
                 (customer_id,)
             )
@@ -447,7 +931,8 @@ def get_inquiries_by_status(is_answered: bool) -> List[Dict[str, Any]]:
     if not conn: return []
     try:
         with conn.cursor() as cur:
-            cur.execute(
+            timed_execute(
+                cur, "get_inquiries_by_status",
                 "SELECT question_id, origin_product_no, customer_id, question_type, question_text, is_answered FROM qnas WHERE is_answered = %s",
                 (is_answered,)
             )
@@ -465,7 +950,8 @@ def save_inquiry_log(log_id: str, customer_id: str, input_text: str, ai_action_f
     if not conn: return
     try:
         with conn.cursor() as cur:
-            cur.execute(
+            timed_execute(
+                cur, "save_inquiry_log",
                 """
                 INSERT INTO inquiry_logs (log_id, customer_id, input_text, ai_action_failed)
                 VALUES (%s, %s, %s, %s)
@@ -485,7 +971,8 @@ def update_inquiry_log_feedback(log_id: str, feedback: str, final_resolution: st
     if not conn: return
     try:
         with conn.cursor() as cur:
-            cur.execute(
+            timed_execute(
+                cur, "update_inquiry_log_feedback",
                 """
                 UPDATE inquiry_logs
                 SET resolution_feedback = %s, final_resolution = %s, is_learned = TRUE
@@ -500,6 +987,47 @@ def update_inquiry_log_feedback(log_id: str, feedback: str, final_resolution: st
     finally:
         conn.close()
 
+def get_inquiry_logs_by_ids(log_ids: List[str]) -> List[Dict[str, Any]]:
+    """자가진화 대상 문의 로그(고객 문의, 실패한 AI 답변)를 한 번에 조회합니다."""
+    if not log_ids:
+        return []
+    conn = get_db_connection()
+    if not conn: return []
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "get_inquiry_logs_by_ids",
+                "SELECT log_id::text, input_text, ai_action_failed FROM inquiry_logs WHERE log_id IN %s",
+                (tuple(log_ids),)
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+    except Exception as e:
+        print(f"⚠️ 문의 로그 조회 중 오류 발생: {e}")
+        return []
+    finally:
+        conn.close()
+
+def mark_inquiry_logs_learned(log_ids: List[str]) -> None:
+    """자가진화에 반영된 문의 로그를 학습 완료로 표시합니다."""
+    if not log_ids:
+        return
+    conn = get_db_connection()
+    if not conn: return
+    try:
+        with conn.cursor() as cur:
+            timed_execute(
+                cur, "mark_inquiry_logs_learned",
+                "UPDATE inquiry_logs SET is_learned = TRUE WHERE log_id IN %s",
+                (tuple(log_ids),)
+            )
+        conn.commit()
+    except Exception as e:
+        print(f"⚠️ 학습 완료 표시 중 오류 발생: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
 def get_failure_logs_by_customer(customer_id: str, limit: int = 3) -> List[FailureLog]:
     """특정 고객의 최근 실패 로그를 DB에서 조회합니다."""
     conn = get_db_connection()
@@ -508,7 +1036,8 @@ def get_failure_logs_by_customer(customer_id: str, limit: int = 3) -> List[Failu
 
     try:
         with conn.cursor() as cur:
-            cur.execute(
+            timed_execute(
+                cur, "get_failure_logs_by_customer",
                 """
                 SELECT log_id, customer_id, input_text, ai_action_failed, resolution_feedback, final_resolution, created_at
                 FROM inquiry_logs
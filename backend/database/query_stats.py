@@ -0,0 +1,175 @@
+"""
+Per-query instrumentation of the legacy SQL layer.
+Every data function in legacy_connector runs its SQL through `timed_execute` under a stable query
+name, which records latency and row counts per name (in-process and as Prometheus metrics).
+Queries slower than SLOW_QUERY_THRESHOLD_MS are logged and kept in a slow-query ring buffer; a
+sample of them is re-run under EXPLAIN (ANALYZE, BUFFERS) to capture the plan. The EXPLAIN runs in
+a background thread on its own pooled connection inside a rolled-back transaction, so it neither
+delays the caller nor persists anything. Browsed through /api/admin/queries.
+
+Server-side (named) cursors only time the DECLARE; their rows are fetched by the caller and are
+not counted.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable
+
+from backend.config.settings import settings
+from backend.core.metrics import DB_QUERY_DURATION, DB_QUERY_ROWS, DB_SLOW_QUERIES
+
+logger = logging.getLogger(__name__)
+
+SQL_PREVIEW_CHARS = 4000
+EXPLAINABLE = ("SELECT", "WITH")
+
+
+class QueryStats:
+    """Latency/row aggregates per query name plus a ring buffer of slow executions."""
+
+    def __init__(self, slow_log_size: int, samples_per_query: int = 512):
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+        self._samples_per_query = samples_per_query
+        self._slow: deque[dict] = deque(maxlen=slow_log_size)
+        self._explaining: set[str] = set()
+        self._explain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+    def record(self, name: str, duration_ms: float, rows: int | None, error: bool = False) -> None:
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = {
+                    "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "samples": deque(maxlen=self._samples_per_query),
+                }
+            stat["count"] += 1
+            stat["errors"] += int(error)
+            stat["total_ms"] += duration_ms
+            stat["max_ms"] = max(stat["max_ms"], duration_ms)
+            stat["rows"] += rows or 0
+            stat["samples"].append(duration_ms)
+        DB_QUERY_DURATION.labels(name).observe(duration_ms / 1000)
+        if rows:
+            DB_QUERY_ROWS.labels(name).inc(rows)
+
+    def record_slow(self, name: str, duration_ms: float, rows: int | None, sql: str) -> None:
+        DB_SLOW_QUERIES.labels(name).inc()
+        logger.warning(f"느린 쿼리 ({name}): {duration_ms:.1f}ms, {rows if rows is not None else '?'}행")
+        entry = {
+            "name": name,
+            "at": time.time(),
+            "duration_ms": round(duration_ms, 1),
+            "rows": rows,
+            "sql": sql[:SQL_PREVIEW_CHARS],
+            "plan": None,
+        }
+        with self._lock:
+            self._slow.append(entry)
+            explain = (
+                sql.lstrip().upper().startswith(EXPLAINABLE)
+                and name not in self._explaining
+                and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+            )
+            if explain:
+                self._explaining.add(name)
+        if explain:
+            self._explain_pool.submit(self._explain, entry, sql)
+
+    def _explain(self, entry: dict, sql: str) -> None:
+        # Resolved at call time: backend.database.legacy swaps in the pooled connection factory.
+        from backend.database import legacy_connector
+
+        conn = legacy_connector.get_db_connection()
+        try:
+            if not conn:
+                return
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL statement_timeout = %s", (settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,))
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql)
+                entry["plan"] = "\n".join(row[0] for row in cur.fetchall())
+        except Exception as e:
+            entry["plan_error"] = f"{type(e).__name__}: {e}"
+            logger.error(f"느린 쿼리 실행 계획 수집 실패 ({entry['name']}): {e}")
+        finally:
+            if conn:
+                conn.rollback()
+                conn.close()
+            with self._lock:
+                self._explaining.discard(entry["name"])
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> list[dict]:
+        """Aggregates per query name, heaviest first (`order_by`: total_ms / avg_ms / p95_ms / max_ms / count)."""
+        with self._lock:
+            snapshot = {name: {**stat, "samples": sorted(stat["samples"])} for name, stat in self._stats.items()}
+        rows = []
+        for name, stat in snapshot.items():
+            samples = stat["samples"]
+            rows.append({
+                "name": name,
+                "count": stat["count"],
+                "errors": stat["errors"],
+                "total_ms": round(stat["total_ms"], 1),
+                "avg_ms": round(stat["total_ms"] / stat["count"], 1),
+                "p50_ms": round(samples[len(samples) // 2], 1),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+                "max_ms": round(stat["max_ms"], 1),
+                "rows": stat["rows"],
+                "avg_rows": round(stat["rows"] / stat["count"], 1),
+            })
+        return sorted(rows, key=lambda r: r.get(order_by, 0), reverse=True)[:limit]
+
+    def slow(self, limit: int = 50, name: str | None = None) -> list[dict]:
+        """Most recent slow executions first, with the captured plan when this one was sampled."""
+        with self._lock:
+            entries = [dict(e) for e in reversed(self._slow) if name is None or e["name"] == name]
+        return entries[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+
+query_stats = QueryStats(settings.SLOW_QUERY_LOG_SIZE)
+
+
+def _rowcount(cur) -> int | None:
+    return cur.rowcount if cur.rowcount is not None and cur.rowcount >= 0 else None
+
+
+def _decode(sql) -> str:
+    return sql.decode(errors="replace") if isinstance(sql, bytes) else sql
+
+
+@contextmanager
+def measure(cur, name: str, sql: Callable[[], str | bytes] | None = None):
+    """
+    Time a block that executes SQL on `cur` (e.g. execute_values) under the query name `name`.
+    `sql` builds the statement text for the slow-query log; defaults to the cursor's last query.
+    """
+    if not settings.QUERY_STATS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        query_stats.record(name, (time.perf_counter() - started) * 1000, None, error=True)
+        raise
+    duration_ms = (time.perf_counter() - started) * 1000
+    rows = _rowcount(cur)
+    query_stats.record(name, duration_ms, rows)
+    if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+        statement = sql() if sql is not None else (cur.query or b"")
+        query_stats.record_slow(name, duration_ms, rows, _decode(statement))
+
+
+def timed_execute(cur, name: str, query: str, params=None) -> None:
+    """`cur.execute(query, params)`, recorded under the query name `name`."""
+    with measure(cur, name, lambda: cur.mogrify(query, params)):
+        cur.execute(query, params)
@@ -2,19 +2,40 @@
 SQLAlchemy engine, session factory, and connection pool.
 Also provides a pooled connection for legacy psycopg2 code.
 """
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 from backend.config.settings import settings
+from backend.core.metrics import DB_POOL_CHECKOUT_TIMEOUTS, DB_POOL_CHECKOUT_WAIT, register_pool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
 
 
 # SQLAlchemy engine with connection pooling
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
     pool_size=5,
     max_overflow=10,
     pool_pre_ping=True,  # Verify connections are alive before using them
     echo=False,
 )
+register_pool(engine)  # in-use / idle / overflow gauges for /metrics
 
 # Session factory for new SQLAlchemy-based code
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,14 +1,31 @@
 """
 Main FastAPI Application Entrypoint.
 """
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.database.session import engine
+from backend.core.llm_gateway import llm_gateway
+from backend.core.llm_usage import usage_writer
+from backend.services.evolution_service import evolution_queue
+from backend.services.rag_service import vector_store_registry
+from backend.services.review_index import index_refresher
+from backend.core.cache import get_cache
+from backend.core.warmup import warmup
+from backend.core.metrics import metrics_middleware
 from backend.models.orm import Base
+from backend.workflows.cs_agent import get_cs_agent_graph
+from backend.workflows.manager_agent import get_manager_agent_graph
 # Import all routers
-from backend.api.routers import dashboard, cs, reviews, crm, orders, products, inventory, analytics, manager
+from backend.api.routers import dashboard, cs, reviews, crm, orders, products, inventory, analytics, manager, health, metrics, admin
+
+def _open_llm_client():
+    # Without a key every LLM caller falls back to canned responses; readiness must say so
+    if not llm_gateway.enabled:
+        raise RuntimeError("OPENAI_API_KEY is not configured")
+    return llm_gateway.client
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -16,12 +33,31 @@ async def lifespan(app: FastAPI):
     Lifespan handler replacing deprecated @app.on_event("startup").
     """
     print("AI Store Manager Backend starting...")
+    # Heavy components warm up in the background so the worker accepts traffic right away;
+    # each is also built lazily on first use. /health/ready reports their state.
     # Ensure all tables are created (useful during initial dev before Alembic is fully set up)
-    Base.metadata.create_all(bind=engine)
+    warmup.register("database", lambda: Base.metadata.create_all(bind=engine))
+    # One Chroma client for the whole process, shared by every RAG caller
+    warmup.register("vector_store", vector_store_registry.open)
+    # BM25 mirrors for hybrid retrieval; until built, searches are dense-only (not a readiness gate)
+    warmup.register("lexical_index", lambda: vector_store_registry.get().refresh_lexical_indexes(), required=False)
+    warmup.register("runtime_cache", get_cache)
+    warmup.register("llm_client", _open_llm_client)
+    warmup.register("cs_agent_graph", get_cs_agent_graph)
+    warmup.register("manager_agent_graph", get_manager_agent_graph)
+    warmup.start()
+    # Reviews / QnAs are folded into the keyword index in the background, never on request paths
+    index_refresher.start()
     
     yield
     
     print("AI Store Manager Backend shutting down...")
+    await warmup.aclose()
+    await index_refresher.aclose()
+    await evolution_queue.aclose()  # evolve corrections still queued before the gateway closes
+    await usage_writer.aclose()  # write buffered LLM usage before the engine is disposed
+    await asyncio.to_thread(vector_store_registry.close)
+    await llm_gateway.aclose()
     engine.dispose()
 
 
@@ -41,6 +77,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency per route template for /metrics
+app.middleware("http")(metrics_middleware)
+
 # Include Routers
 app.include_router(dashboard.router)
 app.include_router(cs.router)
@@ -51,6 +90,9 @@ app.include_router(products.router)
 app.include_router(inventory.router)
 app.include_router(analytics.router)
 app.include_router(manager.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
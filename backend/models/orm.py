@@ -5,7 +5,7 @@ Existing tables (customers, products, orders, etc.) remain managed by legacy cod
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, JSON
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Text, Boolean, Date, DateTime, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 
 from backend.database.session import Base
@@ -51,3 +51,99 @@ class AICache(Base):
     generated_at = Column(DateTime, default=datetime.utcnow, index=True)
     expires_at = Column(DateTime, nullable=True)
     # NULL = never expires; set a datetime to auto-invalidate
+
+
+class JobState(Base):
+    """Watermark and saved parameters of incremental background jobs (e.g. RFM segmentation)."""
+    __tablename__ = "job_state"
+
+    job_name = Column(String(50), primary_key=True)
+    watermark = Column(DateTime, nullable=True)
+    state_json = Column(JSON, default=dict)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CustomerChurnScore(Base):
+    """Latest churn-risk score per customer with its top contributing features."""
+    __tablename__ = "customer_churn_scores"
+
+    customer_id = Column(String(50), primary_key=True)
+    score = Column(Float, nullable=False)
+    risk_level = Column(String(10), nullable=False)  # "high" | "medium" | "low"
+    features = Column(JSON, default=dict)
+    top_factors = Column(JSON, default=list)  # [{"feature", "label", "contribution"}]
+    scored_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_customer_churn_scores_score", "score"),
+        Index("ix_customer_churn_scores_risk_score", "risk_level", "score"),
+    )
+
+
+class TextIndexDoc(Base):
+    """
+    Reviews / QnAs already folded into the keyword index.
+    Also the anti-join target for incremental indexing and the source for aspect filters.
+    """
+    __tablename__ = "text_index_docs"
+
+    source = Column(String(10), primary_key=True)  # "review" | "qna"
+    doc_id = Column(String(50), primary_key=True)
+    product_id = Column(Integer, nullable=False, default=0)
+    day = Column(Date, nullable=False)
+    sentiment = Column(String(10), nullable=False)
+    sentiment_score = Column(Float, default=0.0)
+    aspects = Column(JSON, default=dict)  # {"delivery": "negative", ...}
+    indexed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_text_index_docs_source_product", "source", "product_id"),)
+
+
+class TextTermCount(Base):
+    """Document frequency of each term per product and day (with positive / negative doc counts)."""
+    __tablename__ = "text_term_counts"
+
+    source = Column(String(10), primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    term = Column(String(100), primary_key=True)
+    doc_count = Column(Integer, nullable=False, default=0)
+    positive = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_text_term_counts_source_day", "source", "day"),)
+
+
+class TextAspectCount(Base):
+    """Aspect mentions (delivery, packaging, taste, expiry, price) per product and day."""
+    __tablename__ = "text_aspect_counts"
+
+    source = Column(String(10), primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    aspect = Column(String(20), primary_key=True)
+    mentions = Column(Integer, nullable=False, default=0)
+    positive = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+
+
+class LLMUsage(Base):
+    """One LLM / embedding call: who made it, with which model, token counts, cost and latency."""
+    __tablename__ = "llm_usage"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # UTC
+    caller = Column(String(50), nullable=False)  # gateway caller label, e.g. "cs_agent", "review_analyzer"
+    session_type = Column(String(20))  # "cs" | "manager" for orchestrator runs, NULL for direct feature calls
+    model = Column(String(50), nullable=False)
+    status = Column(String(10), nullable=False)  # "ok" | "error"
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cached_tokens = Column(Integer, nullable=False, default=0)  # part of prompt_tokens served from the prompt cache
+    estimated = Column(Boolean, nullable=False, default=False)  # API reported no usage (embeddings): prompt_tokens is the estimate
+    cost_usd = Column(Float)  # NULL when the model has no price in LLM_MODEL_PRICES
+    latency_ms = Column(Float, nullable=False)  # whole call: limiter waits and retries included
+    attempts = Column(Integer, nullable=False, default=1)
+    trace_id = Column(String(32))  # see /api/admin/traces/{trace_id}
+
+    __table_args__ = (Index("ix_llm_usage_created_at", "created_at"),)
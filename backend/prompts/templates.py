@@ -82,3 +82,73 @@ MORNING_BRIEFING_PROMPT = """당신은 온라인 스토어 사장님의 AI 비
 
 전체 분량은 200자 이내로 간결하게 작성하세요.
 """
+
+# --- AI Manager direct answers ---
+# Structured manager questions recognised by the intent classifier are answered from these
+# templates without calling the LLM planner.
+MANAGER_DIRECT_TEMPLATES = {
+    "store_kpis": """현재 스토어 주요 지표입니다.
+• 미답변 문의: {unanswered_qnas}건
+• 처리 대기 클레임: {pending_claims}건
+• 재고 부족 상품: {low_stock_items}개""",
+    "unanswered_qnas": "현재 답변을 기다리는 문의(QnA)는 {count}건입니다.",
+    "pending_claims": "현재 처리 대기 중인 클레임(반품/교환)은 {count}건입니다.",
+    "low_stock": """재고가 부족한 상품은 {count}개입니다.
+{items}""",
+    "low_stock_empty": "현재 재고가 부족한 상품은 없습니다.",
+    "top_margin": """최근 {period_days}일 기준 마진 상위 상품입니다.
+{items}""",
+    "top_margin_empty": "최근 {period_days}일 동안 판매된 상품이 없습니다.",
+    "negative_reviews": """최근 {period_label} 접수된 부정 리뷰는 {count}건입니다.
+{items}""",
+    "negative_reviews_empty": "최근 {period_label} 접수된 부정 리뷰가 없습니다.",
+    "customer_segment": """'{segment_label}' 고객은 총 {count}명입니다.
+{items}""",
+    "customer_segment_empty": "현재 '{segment_label}' 고객이 없습니다.",
+}
+
+# --- Batch review replies ---
+REVIEW_REPLY_BATCH_SYSTEM = """당신은 쇼핑몰의 친절하고 센스있는 CS 담당자입니다.
+여러 개의 고객 리뷰가 주어지면 각 리뷰마다 답변 초안을 하나씩 작성하세요.
+긍정적인 리뷰에는 감사를 표하고 재방문을 유도하며, 부정적인 리뷰에는 정중히 사과하고 문제 해결 의지를 보여주세요.
+따뜻하고 자연스러운 톤으로 리뷰당 2~3문장 이내로 작성하고, 불필요한 인사말(안녕하세요 등)은 생략하세요.
+각 답변에는 반드시 해당 리뷰의 review_id를 그대로 적으세요."""
+
+REVIEW_REPLY_BATCH_PROMPT = """[답변할 리뷰 목록]
+{reviews}"""
+
+# --- Negative review summary (map-reduce) ---
+REVIEW_SUMMARY_SYSTEM = """당신은 판매 데이터를 분석하는 전문 애널리스트입니다.
+최근 부정적인 고객 리뷰를 분석하여 주요 불만 사항과 반복되는 패턴을 요약합니다.
+결과는 판매자가 쉽게 이해할 수 있도록 명확하고 간결하게 작성하세요."""
+
+REVIEW_CHUNK_SUMMARY_PROMPT = """[부정 리뷰 목록 ({period})]
+{reviews}
+
+[요청]
+위 리뷰들에서 불만 카테고리(제품 품질, 배송, 포장 등)별로 언급된 문제점과 대략적인 언급 횟수,
+상품명이 드러나는 경우 관련 상품을 5줄 이내의 글머리표로 정리하세요. 개별 리뷰를 그대로 옮기지 마세요."""
+
+REVIEW_SUMMARY_REDUCE_PROMPT = """[기간별 부정 리뷰 요약 (총 {review_count}건)]
+{summaries}
+
+[분석 및 요약 요청]
+위 요약들을 종합하여 다음 항목에 대해 요약 보고서를 작성해주세요:
+1. 주요 불만 카테고리 (예: 제품 품질, 배송, 포장 등)
+2. 가장 자주 언급되는 문제점
+3. 판매자가 즉시 조치해야 할 사항 (있을 경우)"""
+
+# --- Delayed-order bulk actions ---
+# Draft messages attached to each recommended action (refined by the LLM for the top cases only).
+# {delay_phrase} is "N영업일 지연되어", or just "지연되어" for orders flagged by status with no measured delay.
+ORDER_ACTION_TEMPLATES = {
+    "process_claim": "[AI 초안] {customer_name}님, {order_id} 주문({product_name})의 {claim_label} 요청을 확인했습니다. 빠르게 처리 후 결과를 안내드리겠습니다.",
+    "offer_compensation": "[AI 초안] {customer_name}님, {order_id} 주문({product_name})의 배송이 {delay_phrase} 진심으로 사과드립니다. 불편을 드린 점 보상해 드리고자 할인 쿠폰을 함께 보내드립니다.",
+    "send_apology_message": "[AI 초안] {customer_name}님, {order_id} 주문({product_name})의 배송이 {delay_phrase} 죄송합니다. 최대한 빠르게 받아보실 수 있도록 조치하겠습니다.",
+    "expedite_dispatch": "[AI 초안] {customer_name}님, {order_id} 주문({product_name})은 오늘 우선 출고 예정입니다. 기다려 주셔서 감사합니다.",
+}
+
+ORDER_DRAFT_REFINE_SYSTEM = """당신은 쇼핑몰의 CS 담당자입니다.
+배송 지연 또는 클레임이 발생한 주문에 대해 미리 작성된 고객 안내 초안이 주어집니다.
+각 초안을 주문 상황(지연 일수, 고객 등급, 클레임 사유)에 맞게 더 정중하고 구체적으로 다듬어 2~3문장으로 작성하세요.
+'[AI 초안]' 표기는 유지하고, 각 결과에는 반드시 입력의 product_order_id를 그대로 적으세요."""
@@ -0,0 +1,83 @@
+"""
+Startup-time benchmark for the API process.
+Each run is a fresh interpreter (a cold worker) that measures:
+  import   - `import backend.main`
+  accept   - lifespan startup finished, i.e. the worker starts accepting traffic
+  ready    - background warm-up finished (what /health/ready waits for)
+Usage: python -m backend.scripts.benchmark_startup [--runs 5] [--ready-timeout 120]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = str(Path(__file__).resolve().parent.parent.parent)
+
+CHILD = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from backend.main import app
+from backend.core.warmup import warmup
+t_import = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        t_accept = time.perf_counter()
+        deadline = t_accept + {timeout}
+        while warmup.finished_at is None and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        t_ready = time.perf_counter()
+        snapshot = warmup.snapshot()
+    print("BENCH " + json.dumps({{
+        "import": t_import - t0,
+        "accept": t_accept - t0,
+        "ready": t_ready - t0,
+        "all_ready": snapshot["ready"],
+        "components": {{name: (c["status"], c["elapsed_ms"]) for name, c in snapshot["components"].items()}},
+    }}))
+
+asyncio.run(main())
+"""
+
+
+def run_once(timeout: float) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(timeout=timeout)],
+        cwd=project_root,
+        env={**os.environ, "PYTHONPATH": project_root},
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])
+    raise RuntimeError(f"benchmark run failed:\n{result.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ready-timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        run = run_once(args.ready_timeout)
+        runs.append(run)
+        print(f"run {i + 1}: import {run['import']:.2f}s, accept {run['accept']:.2f}s, ready {run['ready']:.2f}s"
+              f"{'' if run['all_ready'] else ' (not ready)'}")
+
+    print(f"\n{'phase':<8}{'median':>9}{'min':>9}{'max':>9}")
+    for phase in ("import", "accept", "ready"):
+        values = [run[phase] for run in runs]
+        print(f"{phase:<8}{statistics.median(values):>8.2f}s{min(values):>8.2f}s{max(values):>8.2f}s")
+    print("\nwarm-up components (last run):")
+    for name, (status, elapsed_ms) in runs[-1]["components"].items():
+        print(f"  {name:<22}{status:<9}{elapsed_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
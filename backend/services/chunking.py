@@ -0,0 +1,134 @@
+"""
+Section-aware chunking for RAG documents.
+Manuals are written as "문제 정의: ... 고객 문의: ... 해결 흐름: 1. ... 2. ..." (self-evolved rules as
+"Category/Topic/Policy/Script"), so text is split on those markers and on numbered steps first,
+and only oversized pieces fall back to sentence and character splits. Units are packed up to a
+target token size with whole-unit overlap. Every chunk after the first carries the document's
+title line, and all chunks point back to their parent document so retrieval can expand a hit.
+"""
+import re
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+
+SECTION_MARKER = r"(?:문제 정의|고객 문의|해결 흐름|Category|Topic|Policy|Script)\s*:"
+SECTION_RE = re.compile(rf"(?:(?<=\s)|^)(?={SECTION_MARKER})")
+SECTION_START_RE = re.compile(SECTION_MARKER)
+STEP_RE = re.compile(r"(?:(?<=\s)|^)(?=\d{1,2}\.\s)")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+TITLE_CHARS = 80
+
+
+def estimate_tokens(text: str) -> int:
+    # Korean averages about two characters per token (same estimate as the LLM gateway)
+    return len(text) // 2 + 1
+
+
+@dataclass
+class Chunk:
+    text: str
+    body_offset: int  # where this chunk's own content starts (after title / overlap)
+
+
+def _split_oversized(unit: str, target: int) -> list[str]:
+    if estimate_tokens(unit) <= target:
+        return [unit]
+    pieces, current = [], ""
+    for sentence in SENTENCE_RE.split(unit):
+        if current and estimate_tokens(current + " " + sentence) > target:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    # A single sentence longer than the target is cut on character boundaries
+    size = target * 2
+    return [piece[i:i + size] for piece in pieces for i in range(0, len(piece), size)]
+
+
+def _join(units: list[str]) -> str:
+    """Units separated by spaces; sections keep their own line ("Script: ..." stays line-anchored)."""
+    text = ""
+    for unit in units:
+        if text:
+            text += "\n" if SECTION_START_RE.match(unit) else " "
+        text += unit
+    return text
+
+
+def split_units(text: str, target: int) -> list[str]:
+    """Sections, then numbered steps, then sentences: the smallest meaningful pieces of a document."""
+    units = []
+    for section in SECTION_RE.split(text):
+        for step in STEP_RE.split(section.strip()):
+            step = step.strip()
+            if step:
+                units.extend(_split_oversized(step, target))
+    return units
+
+
+def chunk_text(text: str, target: int, overlap: int) -> list[Chunk]:
+    """Pack units into chunks of about `target` tokens, repeating up to `overlap` tokens of trailing units."""
+    units = split_units(text, target)
+    if not units:
+        return []
+    title = units[0] if len(units[0]) <= TITLE_CHARS else units[0][:TITLE_CHARS] + "…"
+
+    groups: list[tuple[list[str], list[str]]] = []  # (overlap units, own units)
+    carried, own, tokens = [], [], 0
+    for unit in units:
+        cost = estimate_tokens(unit)
+        if own and tokens + cost > target:
+            groups.append((carried, own))
+            carried, carry_tokens = [], 0
+            for previous in reversed(own):
+                if carry_tokens + estimate_tokens(previous) > overlap:
+                    break
+                carried.insert(0, previous)
+                carry_tokens += estimate_tokens(previous)
+            own, tokens = [], carry_tokens
+        own.append(unit)
+        tokens += cost
+    groups.append((carried, own))
+
+    chunks = []
+    for index, (carried, own) in enumerate(groups):
+        prefix = []
+        if index > 0 and not (carried and carried[0] == units[0]):
+            prefix.append(title)
+        prefix.extend(carried)
+        head = _join(prefix) + "\n" if prefix else ""
+        chunks.append(Chunk(text=head + _join(own), body_offset=len(head)))
+    return chunks
+
+
+def chunk_document(doc: Document, target: int, overlap: int) -> list[Document]:
+    """
+    Split a document into chunk documents with ids "<parent id>#<n>" and back-reference metadata
+    (parent_id, chunk_index, chunk_count, body_offset). Short documents become a single chunk.
+    """
+    chunks = chunk_text(doc.page_content, target, overlap)
+    return [
+        Document(
+            id=f"{doc.id}#{index}",
+            page_content=chunk.text,
+            metadata={
+                **doc.metadata,
+                "parent_id": doc.id,
+                "chunk_index": index,
+                "chunk_count": len(chunks),
+                "body_offset": chunk.body_offset,
+            },
+        )
+        for index, chunk in enumerate(chunks)
+    ]
+
+
+def parent_id_of(doc_id: str) -> str:
+    return doc_id.split("#", 1)[0]
+
+
+def join_chunks(chunks: list[Document]) -> str:
+    """Rebuild the parent text from its chunks (dropping repeated titles and overlap)."""
+    ordered = sorted(chunks, key=lambda d: d.metadata.get("chunk_index", 0))
+    return _join([d.page_content[d.metadata.get("body_offset", 0):] for d in ordered])
@@ -0,0 +1,178 @@
+"""
+RFM customer segmentation.
+Aggregates recency / frequency / monetary for all customers in one query, scores them into
+quintiles with NumPy and writes segment + totals back to `customers` for changed rows only.
+
+A full refresh recomputes the quintile cut points; an incremental refresh rescores customers with
+orders after the stored watermark, against the cut points saved by the last full refresh. Recency
+cut points are ages (time since the last order), so scores stay relative to the time of scoring;
+an incremental refresh also rescores customers whose age crossed a cut point since the previous
+run, which is how customers without new orders lapse into CHURN_RISK.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.database.legacy import get_customer_rfm_aggregates, bulk_update_customer_rfm
+from backend.database.session import SessionLocal
+from backend.models.orm import JobState
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "customer_rfm"
+QUINTILES = [0.2, 0.4, 0.6, 0.8]
+
+_lock = threading.Lock()
+
+
+# --- Job state ---
+
+def _load_state() -> JobState | None:
+    db = SessionLocal()
+    try:
+        return db.get(JobState, JOB_NAME)
+    except Exception as e:
+        logger.error(f"RFM 작업 상태 조회 실패: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def _save_state(watermark: datetime | None, state: dict) -> None:
+    db = SessionLocal()
+    try:
+        db.merge(JobState(job_name=JOB_NAME, watermark=watermark, state_json=state, updated_at=datetime.utcnow()))
+        db.commit()
+    except Exception as e:
+        logger.error(f"RFM 작업 상태 저장 실패: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+# --- Scoring ---
+
+def _age(values: list[datetime | None], now: datetime) -> np.ndarray:
+    """Seconds from each timestamp to `now`; customers without orders are infinitely old."""
+    reference = np.datetime64(now, "s").astype(np.int64)
+    return np.array(
+        [reference - np.datetime64(v, "s").astype(np.int64) if v else np.inf for v in values], dtype=np.float64
+    )
+
+
+def compute_cuts(rows: list[dict], now: datetime) -> dict:
+    """Quintile cut points over customers that have at least one order (recency as age at `now`)."""
+    buyers = [r for r in rows if r["frequency"] > 0]
+    if not buyers:
+        return {}
+    return {
+        "recency_age": np.quantile(_age([r["last_payment"] for r in buyers], now), QUINTILES).tolist(),
+        "frequency": np.quantile([r["frequency"] for r in buyers], QUINTILES).tolist(),
+        "monetary": np.quantile([r["monetary"] for r in buyers], QUINTILES).tolist(),
+    }
+
+
+def score_segments(rows: list[dict], cuts: dict, now: datetime) -> np.ndarray:
+    """
+    Score R/F/M into 1..5 against the cut points and assign segments:
+    NEW (<= 2 orders, recent), VIP (recent, top spend, frequent), CHURN_RISK (valuable but lapsing), REGULAR.
+    Recency is scored by age at `now`. Customers with no orders are NEW.
+    """
+    age = _age([r["last_payment"] for r in rows], now)
+    frequency = np.array([r["frequency"] for r in rows], dtype=np.float64)
+    monetary = np.array([r["monetary"] for r in rows], dtype=np.float64)
+
+    r_score = 5 - np.searchsorted(cuts["recency_age"], age, side="left")
+    f_score = np.searchsorted(cuts["frequency"], frequency, side="right") + 1
+    m_score = np.searchsorted(cuts["monetary"], monetary, side="right") + 1
+    value = f_score + m_score
+
+    return np.select(
+        [
+            frequency == 0,
+            (frequency <= 2) & (r_score >= 4),
+            (r_score >= 3) & (m_score == 5) & (f_score >= 4),
+            (r_score <= 2) & (value >= 6),
+        ],
+        ["NEW", "NEW", "VIP", "CHURN_RISK"],
+        default="REGULAR",
+    )
+
+
+def crossed_cut_ranges(cuts: dict, previous_run: datetime, now: datetime) -> list[tuple]:
+    """
+    Store-local last-order-date ranges of customers whose age crossed a recency cut point between
+    `previous_run` and `now` (one range per cut; a day wider on each side to absorb date rounding).
+    """
+    ranges = []
+    for age in cuts["recency_age"]:
+        start = _local_date(previous_run - timedelta(seconds=age)) - timedelta(days=1)
+        end = _local_date(now - timedelta(seconds=age)) + timedelta(days=1)
+        ranges.append((start, end))
+    return ranges
+
+
+def _local_date(value: datetime | None):
+    return (value + timedelta(hours=settings.STORE_UTC_OFFSET_HOURS)).date() if value else None
+
+
+# --- Job ---
+
+def refresh_segments(mode: str = "incremental") -> dict:
+    """
+    Recompute RFM segments. `mode` is "full" or "incremental"; incremental falls back to full
+    when no previous full refresh (cut points + watermark) is stored.
+    """
+    started = time.perf_counter()
+    with _lock:
+        now = datetime.utcnow()
+        state = _load_state()
+        job = (state.state_json or {}) if state else {}
+        cuts = job.get("cuts")
+        # Cut points saved before recency was stored as age are unusable: rescore everyone
+        if mode == "incremental" and cuts and "recency_age" in cuts and state.watermark:
+            previous_run = datetime.fromisoformat(job.get("scored_at") or job["last_full_refresh"])
+            rows = get_customer_rfm_aggregates(
+                since=state.watermark, last_order_ranges=crossed_cut_ranges(cuts, previous_run, now)
+            )
+        else:
+            mode = "full"
+            rows = get_customer_rfm_aggregates()
+            cuts = compute_cuts(rows, now)
+
+        segments = score_segments(rows, cuts, now) if rows and cuts else np.array([], dtype=object)
+        changed = []
+        for row, segment in zip(rows, segments):
+            new = (
+                str(segment),
+                int(row["monetary"]),
+                int(row["frequency"]),
+                _local_date(row["last_payment"]),
+                int(row["claims"]),
+            )
+            old = (row["segment"], row["total_spend"], row["total_orders"], row["last_order_date"], row["total_claims"])
+            if new != old:
+                changed.append((row["customer_id"],) + new)
+        updated = bulk_update_customer_rfm(changed)
+
+        activity = [r["last_activity"] for r in rows if r["last_activity"]]
+        previous = state.watermark if state else None
+        watermark = max(activity + ([previous] if previous else []), default=None)
+        job = {"cuts": cuts, "last_full_refresh": now.isoformat()} if mode == "full" else job
+        _save_state(watermark, {**job, "scored_at": now.isoformat()})
+
+    counts = dict(zip(*np.unique(segments, return_counts=True))) if len(segments) else {}
+    result = {
+        "mode": mode,
+        "scanned": len(rows),
+        "changed": updated,
+        "segments": {str(k): int(v) for k, v in counts.items()},
+        "watermark": watermark.isoformat() if watermark else None,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info(f"RFM 세그먼트 갱신: {result}")
+    return result
@@ -0,0 +1,205 @@
+"""
+Vectorised demand forecasting.
+Builds a products x days sales matrix from one aggregate query and fits a weekly-seasonal
+exponential-smoothing model for the whole catalog at once. Results are cached until new orders
+(or stock changes) move the sales watermark, so single-product requests are cache lookups; the
+watermark itself is re-read at most once per FORECAST_WATERMARK_TTL.
+"""
+import logging
+import math
+import threading
+import time
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.core.cache import get_shared_value, set_shared_value
+from backend.database.legacy import get_products_from_db, get_daily_product_sales, get_sales_watermark
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = "inventory_forecast:catalog"
+
+_lock = threading.Lock()
+_memo: dict | None = None  # last result in this process: {"watermark", "generated_at", "forecasts"}
+_memo_checked_at = float("-inf")  # monotonic time the memo was last validated against the watermark
+
+
+def _watermark_key(watermark: dict) -> str:
+    last = watermark.get("last_payment_date")
+    return f"{watermark.get('order_count')}|{last.isoformat() if last else ''}|{watermark.get('total_stock')}"
+
+
+def _sales_matrix(product_ids: np.ndarray, rows: list[dict], days: int) -> np.ndarray:
+    """Scatter (product, day_index, qty) rows into a dense products x days matrix."""
+    matrix = np.zeros((len(product_ids), days), dtype=np.float64)
+    if not rows:
+        return matrix
+    pid = np.array([r["origin_product_no"] for r in rows])
+    day = np.array([r["day_index"] for r in rows], dtype=np.int64)
+    qty = np.array([r["quantity"] or 0 for r in rows], dtype=np.float64)
+    row_idx = np.searchsorted(product_ids, pid)
+    valid = (row_idx < len(product_ids)) & (day >= 0) & (day < days)
+    valid &= product_ids[np.minimum(row_idx, len(product_ids) - 1)] == pid
+    np.add.at(matrix, (row_idx[valid], day[valid]), qty[valid])
+    return matrix
+
+
+def _seasonal_indices(sales: np.ndarray, weekday: np.ndarray) -> np.ndarray:
+    """
+    Multiplicative day-of-week indices per product, shrunk towards the catalog-wide profile
+    so that slow movers do not get noisy weekly patterns. Shape (products, 7), mean 1 per row.
+    """
+    weekday_sum = np.stack([sales[:, weekday == d].sum(axis=1) for d in range(7)], axis=1)
+    weekday_days = np.array([(weekday == d).sum() for d in range(7)], dtype=np.float64)
+    weekday_mean = weekday_sum / np.maximum(weekday_days, 1)
+
+    catalog = weekday_mean.sum(axis=0)
+    catalog = catalog / catalog.mean() if catalog.mean() > 0 else np.ones(7)
+
+    row_mean = weekday_mean.mean(axis=1, keepdims=True)
+    own = np.divide(weekday_mean, row_mean, out=np.ones_like(weekday_mean), where=row_mean > 0)
+
+    units = sales.sum(axis=1, keepdims=True)
+    weight = units / (units + settings.FORECAST_SEASONAL_SHRINKAGE)
+    indices = weight * own + (1 - weight) * catalog
+    return indices / indices.mean(axis=1, keepdims=True)
+
+
+def fit_forecasts(products: list[dict], rows: list[dict], history_end: date) -> dict[int, dict]:
+    """
+    Fit every product at once and return {origin_product_no: forecast}.
+    `rows` are daily sales with `day_index` counted from the first day of the history window.
+    """
+    if not products:
+        return {}
+    products = sorted(products, key=lambda p: p["origin_product_no"])
+    product_ids = np.array([p["origin_product_no"] for p in products])
+    stock = np.array([p["stock_quantity"] or 0 for p in products], dtype=np.float64)
+
+    days = settings.FORECAST_HISTORY_DAYS
+    horizon = settings.FORECAST_HORIZON_DAYS
+    lead_time = settings.INVENTORY_LEAD_TIME_DAYS
+    review_period = settings.INVENTORY_REVIEW_PERIOD_DAYS
+    alpha = settings.FORECAST_SMOOTHING_ALPHA
+
+    start = np.datetime64(history_end, "D") - (days - 1)
+    sales = _sales_matrix(product_ids, rows, days)
+    # numpy weekday: 1970-01-01 was a Thursday (3)
+    weekday = ((start + np.arange(days)).astype(np.int64) + 3) % 7
+    seasonal = _seasonal_indices(sales, weekday)
+    season_hist = seasonal[:, weekday]
+
+    # Simple exponential smoothing on the deseasonalised series, all products per time step.
+    # A weekday nothing in the catalog sells on has index 0 and says nothing about the level (NaN).
+    deseasonalised = np.divide(sales, season_hist, out=np.full_like(sales, np.nan), where=season_hist > 0)
+    level = np.nanmean(deseasonalised[:, :7], axis=1)
+    errors = np.empty((len(products), days - 7))
+    for t in range(7, days):
+        errors[:, t - 7] = sales[:, t] - level * season_hist[:, t]
+        observed = ~np.isnan(deseasonalised[:, t])
+        level = np.where(observed, alpha * deseasonalised[:, t] + (1 - alpha) * level, level)
+    sigma = errors.std(axis=1)
+
+    future_weekday = (weekday[-1] + 1 + np.arange(max(horizon, lead_time + review_period))) % 7
+    future = level[:, None] * seasonal[:, future_weekday]
+    demand_horizon = future[:, :horizon].sum(axis=1)
+    demand_lead = future[:, :lead_time].sum(axis=1)
+    demand_cover = future[:, :lead_time + review_period].sum(axis=1)
+
+    z = NormalDist().inv_cdf(settings.INVENTORY_SERVICE_LEVEL)
+    safety_stock = z * sigma * math.sqrt(lead_time)
+    reorder_point = demand_lead + safety_stock
+    reorder_qty = np.maximum(0, np.ceil(demand_cover + safety_stock - stock))
+    daily = demand_horizon / horizon
+    days_of_cover = np.divide(stock, daily, out=np.full_like(stock, np.inf), where=daily > 0)
+
+    recent = sales[:, -14:].mean(axis=1)
+    previous = sales[:, -28:-14].mean(axis=1)
+    trend_pct = np.divide(recent - previous, previous, out=np.zeros_like(recent), where=previous > 0) * 100
+
+    forecasts = {}
+    for i, p in enumerate(products):
+        forecasts[int(product_ids[i])] = {
+            "origin_product_no": int(product_ids[i]),
+            "product_name": p["product_name"],
+            "current_stock": int(stock[i]),
+            "avg_daily_demand": round(float(daily[i]), 2),
+            "predicted_demand_next_30_days": int(round(demand_horizon[i])),
+            "safety_stock": int(math.ceil(safety_stock[i])),
+            "reorder_point": int(math.ceil(reorder_point[i])),
+            "recommended_reorder_qty": int(reorder_qty[i]),
+            "needs_reorder": bool(stock[i] <= reorder_point[i]),
+            "days_of_cover": None if math.isinf(days_of_cover[i]) else round(float(days_of_cover[i]), 1),
+            "trend_pct": round(float(trend_pct[i]), 1),
+            "reason": _reason(recent[i], previous[i], trend_pct[i], days_of_cover[i], lead_time),
+        }
+    return forecasts
+
+
+def _reason(recent: float, previous: float, trend_pct: float, days_of_cover: float, lead_time: int) -> str:
+    if recent == 0 and previous == 0:
+        return "최근 4주간 판매 이력이 없어 추가 발주가 필요하지 않습니다."
+    parts = []
+    if previous > 0 and abs(trend_pct) >= 10:
+        direction = "증가" if trend_pct > 0 else "감소"
+        parts.append(f"최근 2주간 일평균 판매량이 {abs(trend_pct):.0f}% {direction}하는 추세입니다.")
+    else:
+        parts.append(f"최근 2주간 일평균 판매량은 {recent:.1f}개로 안정적입니다.")
+    if days_of_cover <= lead_time:
+        parts.append(f"현재 재고는 약 {days_of_cover:.1f}일분으로 입고 리드타임({lead_time}일)보다 짧습니다.")
+    elif not math.isinf(days_of_cover):
+        parts.append(f"현재 재고로 약 {days_of_cover:.0f}일 판매가 가능합니다.")
+    return " ".join(parts)
+
+
+def _compute(watermark: dict) -> dict:
+    started = time.perf_counter()
+    last = watermark.get("last_payment_date")
+    # The history window ends on the day of the latest recorded order (store-local date)
+    offset = timedelta(hours=settings.STORE_UTC_OFFSET_HOURS)
+    history_end = (last + offset).date() if last else (datetime.utcnow() + offset).date()
+    start = history_end - timedelta(days=settings.FORECAST_HISTORY_DAYS - 1)
+
+    rows = get_daily_product_sales(start, settings.STORE_UTC_OFFSET_HOURS)
+    forecasts = fit_forecasts(get_products_from_db(), rows, history_end)
+    logger.info(f"수요 예측 계산 완료: {len(forecasts)}개 상품, {(time.perf_counter() - started) * 1000:.0f}ms")
+    return {
+        "watermark": _watermark_key(watermark),
+        "generated_at": datetime.utcnow().isoformat(),
+        "history_end": history_end.isoformat(),
+        "forecasts": forecasts,
+    }
+
+
+def get_catalog_forecast() -> dict:
+    """
+    Return the cached catalog forecast, recomputing it only when the sales watermark has moved.
+    Checked in order: in-process memo (trusted without a DB read for FORECAST_WATERMARK_TTL),
+    shared diskcache entry, full recompute.
+    """
+    global _memo, _memo_checked_at
+    if _memo is not None and time.monotonic() - _memo_checked_at < settings.FORECAST_WATERMARK_TTL:
+        return _memo
+    checked_at = time.monotonic()
+    watermark = get_sales_watermark()
+    key = _watermark_key(watermark)
+    if _memo is not None and _memo["watermark"] == key:
+        _memo_checked_at = checked_at
+        return _memo
+    with _lock:
+        if _memo is None or _memo["watermark"] != key:
+            cached = get_shared_value(CACHE_NAME)
+            if cached is None or cached["watermark"] != key:
+                cached = _compute(watermark)
+                set_shared_value(CACHE_NAME, cached)
+            _memo = cached
+        _memo_checked_at = checked_at
+        return _memo
+
+
+def get_product_forecast(product_id: int) -> dict | None:
+    """Forecast for one product (a lookup into the catalog forecast)."""
+    return get_catalog_forecast()["forecasts"].get(product_id)
@@ -1,11 +1,23 @@
-import os
+"""
+Self-evolution of the CS knowledge base from human corrections.
+Failure feedback is queued and processed in micro-batches: one DB read for the batch's logs, one
+structured-output call that turns every correction into a rule (merging corrections of the same
+failure), one batched embedding, and a similarity check against the existing rules so that the
+dozens of corrections an incident produces end up as a single rule. DB connections are only held
+for the short reads/writes, never across LLM or embedding calls.
+"""
+import asyncio
 import json
 import logging
-import openai
+
+import numpy as np
 from pydantic import BaseModel, Field
-from backend.database.legacy import get_db_connection
-from backend.services.rag_service import RAGConnector
-from langchain_core.documents import Document
+
+from backend.config.settings import settings
+from backend.core.llm_gateway import llm_gateway, Priority
+from backend.database.legacy import get_inquiry_logs_by_ids, mark_inquiry_logs_learned
+from backend.services.rag_service import rag_connector, evolution_document
+from backend.services.rule_journal import rule_journal
 
 logger = logging.getLogger(__name__)
 
@@ -16,104 +28,242 @@ class CSManualEntry(BaseModel):
     script: str = Field(description="A sample script to say to the customer")
 
 
+RULE_FIELDS = ["category", "topic", "policy", "script"]
+
+EVOLUTION_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "rules": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "log_ids": {"type": "array", "items": {"type": "string"}},
+                    **{
+                        name: {"type": "string", "description": prop["description"]}
+                        for name, prop in CSManualEntry.model_json_schema()["properties"].items()
+                    },
+                },
+                "required": ["log_ids", *RULE_FIELDS],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["rules"],
+    "additionalProperties": False,
+}
+
+EVOLUTION_BATCH_PROMPT = """당신은 AI 상담원의 실수를 교정하고 새로운 규칙을 만들어내는 '지식 진화 엔진'입니다.
+다음은 여러 건의 [고객 문의, 기존 AI의 잘못된 답변, 상담원이 제시한 올바른 정답]입니다.
+
+{cases}
+
+각 건을 분석하여, 앞으로 AI가 동일한 실수를 반복하지 않도록 명확한 CS 매뉴얼 항목을 도출하세요.
+- 같은 문제에 대한 교정이 여러 건이면 하나의 규칙으로 합치고, 해당 log_id를 모두 log_ids에 넣으세요.
+- 모든 log_id는 정확히 하나의 규칙에 포함되어야 합니다.
+반드시 제공된 JSON 스키마에 맞게 결과를 반환하세요.
+"""
+
+
+def _rule_text(rule: dict) -> str:
+    return evolution_document("", rule).page_content
+
+
+class EvolutionQueue:
+    """
+    Collects failure feedback and evolves it in micro-batches on a single worker task.
+    A batch closes after EVOLUTION_BATCH_SIZE events or EVOLUTION_BATCH_WINDOW_SECONDS.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        # log_id -> (rule entry, unit vector) of the rules already learned, as of journal seq _rules_seq
+        self._rules: dict[str, tuple[dict, np.ndarray | None]] | None = None
+        self._rules_seq = 0
+
+    def submit(self, log_id: str, final_resolution: str) -> None:
+        """Queue one correction; must be called from the event loop (e.g. a request handler)."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        self._queue.put_nowait((log_id, final_resolution))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + settings.EVOLUTION_BATCH_WINDOW_SECONDS
+            while len(batch) < settings.EVOLUTION_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self.evolve_batch(batch)
+            except Exception as e:
+                logger.error(f"자가진화 배치 처리 중 오류 발생: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def aclose(self) -> None:
+        """Finish the queued corrections, then stop the worker (application shutdown)."""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    async def _known_rules(self) -> dict[str, tuple[dict, np.ndarray | None]]:
+        """
+        Rules learned so far, reloaded whenever the journal moved on (other workers, populate_rag).
+        Vectors of rules whose text is unchanged are kept, so a reload only embeds what changed.
+        """
+        seq = await asyncio.to_thread(rule_journal.last_seq)
+        if self._rules is None or seq != self._rules_seq:
+            previous = self._rules or {}
+            rules = await asyncio.to_thread(rule_journal.evolved_rules)
+            self._rules = {}
+            for rule in rules:
+                if not all(rule.get(f) for f in RULE_FIELDS):
+                    continue
+                old_rule, vector = previous.get(rule["log_id"], (None, None))
+                if old_rule is None or _rule_text(old_rule) != _rule_text(rule):
+                    vector = None
+                self._rules[rule["log_id"]] = (rule, vector)
+            self._rules_seq = seq
+        return self._rules
+
+    async def evolve_batch(self, events: list[tuple[str, str]]) -> dict:
+        """
+        Evolve a batch of (log_id, final_resolution) corrections.
+        Returns counts: {"events", "rules", "merged"}.
+        """
+        # The latest correction for a log wins
+        resolutions = dict(events)
+        stats = {"events": len(resolutions), "rules": 0, "merged": 0}
+        logger.info(f"자가진화 배치 시작: {len(resolutions)}건")
+        if not llm_gateway.enabled:
+            logger.error("OPENAI_API_KEY가 설정되지 않았습니다.")
+            return stats
+
+        # 1. 문의 로그 조회 (짧은 DB 연결, 네트워크 호출 전에 반납)
+        logs = await asyncio.to_thread(get_inquiry_logs_by_ids, list(resolutions))
+        if len(logs) < len(resolutions):
+            missing = set(resolutions) - {row["log_id"] for row in logs}
+            logger.error(f"로그를 찾을 수 없습니다: log_id={sorted(missing)}")
+        if not logs:
+            return stats
+
+        # 2. 배치 전체를 한 번의 구조화 출력 호출로 규칙화
+        cases = "\n\n".join(
+            f"[log_id: {row['log_id']}]\n- 고객 문의: {row['input_text']}\n"
+            f"- 기존 AI의 잘못된 답변: {row['ai_action_failed']}\n- 상담원이 제시한 올바른 정답: {resolutions[row['log_id']]}"
+            for row in logs
+        )
+        response = await llm_gateway.chat(
+            model="gpt-4o-mini",
+            caller="evolution",
+            priority=Priority.BACKGROUND,
+            messages=[{"role": "system", "content": EVOLUTION_BATCH_PROMPT.format(cases=cases)}],
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "cs_manual_entries", "schema": EVOLUTION_BATCH_SCHEMA, "strict": True},
+            },
+        )
+        wanted = {row["log_id"] for row in logs}
+        proposed, claimed = [], set()
+        for item in json.loads(response.choices[0].message.content).get("rules", []):
+            log_ids = [log_id for log_id in dict.fromkeys(item.get("log_ids", [])) if log_id in wanted and log_id not in claimed]
+            if not log_ids or not all(item.get(f) for f in RULE_FIELDS):
+                continue
+            claimed.update(log_ids)
+            proposed.append((log_ids, {f: item[f] for f in RULE_FIELDS}))
+        if wanted - claimed:
+            logger.warning(f"규칙이 생성되지 않은 로그: {sorted(wanted - claimed)}")
+        if not proposed:
+            return stats
+
+        # 3. 한 번의 배치 임베딩: 새 규칙, 벡터가 없는 기존 규칙, 저장될 청크를 함께
+        known = await self._known_rules()
+        unvectored = [log_id for log_id, (_, vector) in known.items() if vector is None]
+        documents = [evolution_document(log_ids[0], rule) for log_ids, rule in proposed]
+        rule_texts = [doc.page_content for doc in documents] + [_rule_text(known[log_id][0]) for log_id in unvectored]
+        piece_texts = [piece.page_content for doc in documents for piece in rag_connector.pieces(doc, "self_evolution")]
+        vectors = await rag_connector.aembed_batch(list(dict.fromkeys(rule_texts + piece_texts)), caller="evolution")
+        by_text = dict(zip(dict.fromkeys(rule_texts + piece_texts), vectors))
+
+        def unit(text: str) -> np.ndarray:
+            vector = np.asarray(by_text[text], dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            return vector / norm if norm else vector
+
+        for log_id in unvectored:
+            rule, _ = known[log_id]
+            known[log_id] = (rule, unit(_rule_text(rule)))
+
+        # 4. 기존 규칙(및 같은 배치의 앞선 규칙)과 거의 같은 규칙은 새로 만들지 않고 병합:
+        #    더 최근의 교정이 기존 규칙의 내용을 대체하고, 원래 규칙의 log_id로 다시 저장된다
+        new_rules, updated, upserts = [], {}, {}
+        for (log_ids, rule), doc in zip(proposed, documents):
+            vector = unit(doc.page_content)
+            best_id, best = None, -1.0
+            for known_id, (_, known_vector) in known.items():
+                similarity = float(vector @ known_vector)
+                if similarity > best:
+                    best_id, best = known_id, similarity
+            if best_id is not None and best >= settings.EVOLUTION_DUPLICATE_SIMILARITY:
+                entry = updated.get(best_id, known[best_id][0])
+                merged_ids = list(dict.fromkeys(entry.get("merged_log_ids", []) + log_ids))
+                updated[best_id] = {**rule, "merged_log_ids": merged_ids}
+                upserts[best_id] = evolution_document(best_id, rule)
+                known[best_id] = ({"log_id": best_id, **updated[best_id]}, vector)
+                stats["merged"] += len(log_ids)
+                logger.info(f"유사 규칙에 병합: {log_ids} -> {best_id} (similarity={best:.3f})")
+                continue
+            entry = {**rule, "merged_log_ids": log_ids[1:]}
+            new_rules.append((log_ids[0], entry))
+            upserts[log_ids[0]] = doc
+            known[log_ids[0]] = ({"log_id": log_ids[0], **entry}, vector)
+
+        # 5. 저널 기록 (락 1회) 및 ChromaDB upsert (병합된 규칙도 내용이 같으므로 청크 임베딩은 이미 캐시됨)
+        journal_rules = [(log_id, updated.pop(log_id, entry)) for log_id, entry in new_rules] + list(updated.items())
+        for log_id, entry in journal_rules:
+            known[log_id] = ({"log_id": log_id, **entry}, known[log_id][1])
+        seqs = await asyncio.to_thread(rule_journal.append_many, journal_rules)
+        logger.info(f"새로운 지식이 규칙 저널에 기록되었습니다: seq={seqs}")
+        if seqs and seqs[0] == self._rules_seq + 1:
+            # Nobody else appended in between: the cache already holds these entries
+            self._rules_seq = seqs[-1]
+        if upserts:
+            await rag_connector.aupsert_documents(list(upserts.values()), source="self_evolution", prune=False)
+            logger.info("새로운 지식이 ChromaDB(RAG)에 추가되었습니다.")
+
+        # 저널이 충분히 쌓이면 매뉴얼 스냅샷으로 압축
+        await asyncio.to_thread(rule_journal.maybe_compact)
+
+        # 6. DB 업데이트 (is_learned = TRUE)
+        await asyncio.to_thread(mark_inquiry_logs_learned, sorted(claimed))
+        stats["rules"] = len(new_rules)
+        logger.info(f"자가진화 성공: {stats}")
+        return stats
+
+
+evolution_queue = EvolutionQueue()
+
+
 async def evolve_knowledge(log_id: str, final_resolution: str):
     """
     Analyzes the failure log and the correct final resolution provided by the human agent,
-    generates a new CS manual entry, and updates both the JSON file and ChromaDB.
+    generates a new CS manual entry (or merges it into a near-identical existing rule),
+    appends it to the rule journal and upserts it into ChromaDB.
     """
-    logger.info(f"진화 프로세스 시작: log_id={log_id}")
-    
-    conn = get_db_connection()
-    if not conn:
-        logger.error("DB 연결 실패")
-        return
-        
     try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT input_text, ai_action_failed FROM inquiry_logs WHERE log_id = %s",
-                (log_id,)
-            )
-            row = cur.fetchone()
-            if not row:
-                logger.error(f"로그를 찾을 수 없습니다: log_id={log_id}")
-                return
-                
-            input_text, ai_action_failed = row
-            
-            # 1. GPT를 사용해 새로운 지식(Manual Entry) 추출
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                logger.error("OPENAI_API_KEY가 설정되지 않았습니다.")
-                return
-                
-            client = openai.AsyncOpenAI(api_key=api_key)
-            
-            prompt = f"""당신은 AI 상담원의 실수를 교정하고 새로운 규칙을 만들어내는 '지식 진화 엔진'입니다.
-다음은 고객의 문의, 기존 AI의 잘못된 답변, 그리고 상담원이 새로 제공한 올바른 가이드(정답)입니다.
-
-- 고객 문의: {input_text}
-- 기존 AI의 잘못된 답변: {ai_action_failed}
-- 상담원이 제시한 올바른 정답: {final_resolution}
-
-위 정보를 분석하여, 앞으로 AI가 동일한 실수를 반복하지 않도록 명확한 CS 매뉴얼 항목 하나를 도출하세요.
-반드시 제공된 JSON 스키마에 맞게 결과를 반환하세요.
-"""
-            
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": prompt}
-                ],
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "cs_manual_entry",
-                        "schema": CSManualEntry.model_json_schema(),
-                        "strict": True
-                    }
-                }
-            )
-            
-            new_entry_data = json.loads(response.choices[0].message.content)
-            
-            # 2. JSON 파일에 추가
-            manuals_path = "data/cs_manuals.json"
-            try:
-                with open(manuals_path, 'r', encoding='utf-8') as f:
-                    manuals = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                manuals = []
-                
-            manuals.append(new_entry_data)
-            
-            with open(manuals_path, 'w', encoding='utf-8') as f:
-                json.dump(manuals, f, indent=4, ensure_ascii=False)
-                
-            logger.info("새로운 지식이 cs_manuals.json에 저장되었습니다.")
-            
-            # 3. ChromaDB에 임베딩 추가
-            doc_content = f"Category: {new_entry_data['category']}\nTopic: {new_entry_data['topic']}\nPolicy: {new_entry_data['policy']}\nScript: {new_entry_data['script']}"
-            document = Document(
-                page_content=doc_content,
-                metadata={"source": "self_evolution", "category": new_entry_data["category"]}
-            )
-            
-            rag = RAGConnector()
-            rag.add_documents([document])
-            
-            logger.info("새로운 지식이 ChromaDB(RAG)에 추가되었습니다.")
-            
-            # 4. DB 업데이트 (is_learned = TRUE)
-            cur.execute(
-                "UPDATE inquiry_logs SET is_learned = TRUE WHERE log_id = %s",
-                (log_id,)
-            )
-        conn.commit()
-        logger.info(f"자가진화 성공: {new_entry_data['topic']}")
-        
+        await evolution_queue.evolve_batch([(log_id, final_resolution)])
     except Exception as e:
         logger.error(f"자가진화 중 오류 발생: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
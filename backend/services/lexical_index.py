@@ -0,0 +1,87 @@
+"""
+In-process BM25 index for the RAG corpus.
+Dense embeddings blur exact identifiers ("[SPOIL-101]", product numbers) and short place names
+("제주"), so retrieval also ranks documents lexically. Korean text is tokenised without a
+morphological analyser: josa-stripped words plus character bigrams, so "제주도로" still matches
+"제주", alongside whole identifier tokens and digit runs.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from backend.services.text_analyzer import JOSA
+
+IDENTIFIER_RE = re.compile(r"[A-Za-z]+[-_]?\d+(?:[-_]\d+)*")
+WORD_RE = re.compile(r"[가-힣]+|[A-Za-z]+|\d+")
+
+
+def _strip_josa(word: str) -> str:
+    for josa in JOSA:
+        if word.endswith(josa) and len(word) - len(josa) >= 2:
+            return word[: -len(josa)]
+    return word
+
+
+def search_tokens(text: str | None) -> list[str]:
+    """
+    Lexical tokens for indexing and querying:
+    identifiers ("spoil-101"), digit runs, lowercase latin words, josa-stripped Hangul words
+    and their character bigrams.
+    """
+    if not text:
+        return []
+    tokens = [m.group().lower().replace("_", "-") for m in IDENTIFIER_RE.finditer(text)]
+    for word in WORD_RE.findall(text):
+        if word[0].isdigit() or word.isascii():
+            tokens.append(word.lower())
+            continue
+        stem = _strip_josa(word)
+        tokens.append(stem)
+        if len(stem) > 2:
+            tokens.extend(stem[i:i + 2] for i in range(len(stem) - 1))
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed document set; rebuild it when the corpus changes."""
+
+    def __init__(self, documents: list[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+        self.postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self.lengths: list[int] = []
+        for idx, text in enumerate(documents):
+            counts = Counter(search_tokens(text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((idx, tf))
+        self.avg_length = (sum(self.lengths) / self.size) if self.size else 0.0
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int, allowed: set[int] | None = None) -> list[tuple[int, float]]:
+        """Top-k (document index, score) pairs; `allowed` restricts the result to a subset."""
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(search_tokens(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for idx, tf in postings:
+                if allowed is not None and idx not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[idx] / (self.avg_length or 1))
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse ranked id lists: score(id) = sum of 1 / (k + rank). Highest first."""
+    fused: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
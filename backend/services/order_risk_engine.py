@@ -0,0 +1,217 @@
+"""
+Delayed-order detection and bulk action engine.
+Loads open orders in one SQL pass, classifies delay / dispatch risk / open claims with vectorised
+NumPy rules, attaches templated drafts and optionally lets the LLM polish the drafts of the top-N cases.
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.core.llm_gateway import llm_gateway, Priority
+from backend.database.legacy import get_order_fulfilment_snapshot
+from backend.prompts.templates import ORDER_ACTION_TEMPLATES, ORDER_DRAFT_REFINE_SYSTEM
+
+logger = logging.getLogger(__name__)
+
+CLOSED_STATUSES = ["취소", "환불", "배송완료"]
+PRE_SHIPMENT_STATUSES = ["결제완료", "배송준비중"]
+DELAY_STATUS = "배송지연"
+
+CLAIM_LABELS = {"REFUND": "환불", "RETURN": "반품", "EXCHANGE": "교환", "CANCEL": "취소"}
+
+REFINE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "drafts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "product_order_id": {"type": "string"},
+                    "draft_message": {"type": "string"},
+                },
+                "required": ["product_order_id", "draft_message"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["drafts"],
+    "additionalProperties": False,
+}
+
+
+def _cutoff_minutes(value: str | None) -> int:
+    """'14:00' -> 840. Defaults to 14:00 when the store has no cutoff configured."""
+    try:
+        hours, minutes = (value or "14:00").split(":")
+        return int(hours) * 60 + int(minutes)
+    except ValueError:
+        return 14 * 60
+
+
+def delay_phrase(days_late: int) -> str:
+    """Draft wording for the delay; orders flagged only by the '배송지연' status have no day count."""
+    return f"{days_late}영업일 지연되어" if days_late > 0 else "지연되어"
+
+
+def _to_datetime64(values: list, unit: str = "m") -> np.ndarray:
+    return np.array([np.datetime64(v, unit) if v else np.datetime64("NaT", unit) for v in values])
+
+
+def classify_orders(rows: list[dict], now: datetime | None = None) -> list[dict]:
+    """
+    Classify orders with vectorised rules and return recommendations sorted by severity.
+    Timestamps are stored in UTC; dispatch cutoffs and business days are evaluated in store-local time.
+    """
+    if not rows:
+        return []
+
+    offset = np.timedelta64(settings.STORE_UTC_OFFSET_HOURS, "h")
+    now_local = np.datetime64(now or datetime.utcnow(), "m") + offset
+    today = now_local.astype("datetime64[D]")
+
+    payment = _to_datetime64([r["payment_date"] for r in rows]) + offset
+    delivered = _to_datetime64([r["delivery_complete_date"] for r in rows]) + offset
+    status = np.array([r["order_status"] or "" for r in rows], dtype=object)
+    segment = np.array([r["customer_segment"] or "" for r in rows], dtype=object)
+    has_claim = np.array([bool(r["claim_type"]) for r in rows])
+    cutoff = np.array([_cutoff_minutes(r["same_day_cutoff"]) for r in rows])
+
+    has_payment = ~np.isnat(payment)
+    is_delivered = ~np.isnat(delivered)
+
+    # Orders paid after the cutoff dispatch on the next business day
+    pay_day = np.where(has_payment, payment.astype("datetime64[D]"), today)
+    minute_of_day = np.where(has_payment, (payment - payment.astype("datetime64[D]")).astype(np.int64), 0)
+    after_cutoff = minute_of_day >= cutoff
+    dispatch_due = np.busday_offset(pay_day, after_cutoff.astype(np.int64), roll="forward")
+    expected_delivery = np.busday_offset(dispatch_due, settings.ORDER_DELIVERY_SLA_DAYS, roll="forward")
+
+    end_day = np.where(is_delivered, delivered.astype("datetime64[D]"), today)
+    days_late = np.where(has_payment, np.maximum(np.busday_count(expected_delivery, end_day), 0), 0)
+
+    is_open = ~np.isin(status, CLOSED_STATUSES) & ~is_delivered
+    explicit_delay = status == DELAY_STATUS
+    delayed = has_payment & (days_late > 0) & (is_open | is_delivered) | explicit_delay
+    dispatch_overdue = has_payment & np.isin(status, PRE_SHIPMENT_STATUSES) & (today >= dispatch_due) & ~delayed
+    open_claim = has_claim & ~np.isin(status, ["취소", "환불"])
+
+    segment_weight = np.select([segment == "VIP", segment == "CHURN_RISK"], [2.0, 1.5], 1.0)
+    severity = (
+        np.minimum(days_late, 10)
+        + 3.0 * open_claim
+        + 2.0 * explicit_delay
+        + 1.0 * dispatch_overdue
+    ) * segment_weight
+
+    action = np.select(
+        [
+            open_claim,
+            delayed & ((segment_weight > 1.0) | (days_late >= 3)),
+            delayed,
+            dispatch_overdue,
+        ],
+        ["process_claim", "offer_compensation", "send_apology_message", "expedite_dispatch"],
+        default="",
+    )
+
+    flagged = np.flatnonzero(action != "")
+    flagged = flagged[np.argsort(-severity[flagged], kind="stable")]
+
+    recommendations = []
+    for i in flagged:
+        row = rows[i]
+        reasons = []
+        if open_claim[i]:
+            reasons.append(f"클레임 접수({CLAIM_LABELS.get(row['claim_type'], row['claim_type'])}: {row['claim_reason'] or '사유 미기재'})")
+        if days_late[i] > 0:
+            reasons.append(f"배송 예정일 대비 {int(days_late[i])}영업일 지연")
+        elif explicit_delay[i]:
+            reasons.append("배송지연 상태")
+        if dispatch_overdue[i]:
+            reasons.append("출고 기한 경과 (미출고)")
+        if segment_weight[i] > 1.0:
+            reasons.append(f"{row['customer_segment']} 고객")
+
+        draft = ORDER_ACTION_TEMPLATES[action[i]].format(
+            customer_name=row["customer_name"] or "고객",
+            order_id=row["order_id"],
+            product_name=row["product_name"],
+            delay_phrase=delay_phrase(int(days_late[i])),
+            claim_label=CLAIM_LABELS.get(row["claim_type"], "클레임"),
+        )
+        recommendations.append({
+            "order_id": row["order_id"],
+            "product_order_id": row["product_order_id"],
+            "customer_id": row["customer_id"],
+            "customer_segment": row["customer_segment"],
+            "order_status": row["order_status"],
+            "recommended_action": str(action[i]),
+            "draft_message": draft,
+            "reason": ", ".join(reasons),
+            "days_late": int(days_late[i]),
+            "severity": round(float(severity[i]), 2),
+            "refined": False,
+        })
+    return recommendations
+
+
+async def refine_drafts(recommendations: list[dict], top_n: int) -> None:
+    """Polish the drafts of the `top_n` most severe cases in a single structured-output call."""
+    top = recommendations[:min(top_n, settings.ORDER_REFINE_MAX)]
+    if not top or not llm_gateway.enabled:
+        return
+    payload = "\n".join(
+        json.dumps({k: r[k] for k in ("product_order_id", "customer_segment", "reason", "draft_message")}, ensure_ascii=False)
+        for r in top
+    )
+    try:
+        response = await llm_gateway.chat(
+            model=settings.CS_AGENT_MODEL,
+            caller="orders.refine_drafts",
+            priority=Priority.STANDARD,
+            messages=[
+                {"role": "system", "content": ORDER_DRAFT_REFINE_SYSTEM},
+                {"role": "user", "content": payload},
+            ],
+            max_tokens=200 * len(top),
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "order_drafts", "schema": REFINE_SCHEMA, "strict": True},
+            },
+        )
+        refined = {d["product_order_id"]: d["draft_message"] for d in json.loads(response.choices[0].message.content)["drafts"]}
+    except Exception as e:
+        logger.error(f"주문 안내 초안 다듬기 실패: {e}")
+        return
+    for r in top:
+        if refined.get(r["product_order_id"]):
+            r["draft_message"] = refined[r["product_order_id"]].strip()
+            r["refined"] = True
+
+
+async def recommend_order_actions(order_ids: list[str] | None = None, refine_top_n: int = 0) -> dict:
+    """Detect delayed / at-risk orders (all open orders when no ids are given) and recommend actions."""
+    started = time.perf_counter()
+    rows = await asyncio.to_thread(get_order_fulfilment_snapshot, order_ids)
+    recommendations = classify_orders(rows)
+    if refine_top_n > 0:
+        await refine_drafts(recommendations, refine_top_n)
+
+    actions = {}
+    for r in recommendations:
+        actions[r["recommended_action"]] = actions.get(r["recommended_action"], 0) + 1
+    return {
+        "recommendations": recommendations,
+        "summary": {
+            "scanned": len(rows),
+            "flagged": len(recommendations),
+            "actions": actions,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
@@ -1,65 +1,712 @@
 """
 RAG connector using LangChain's Chroma integration.
 Uses standard LangChain Retriever and Embeddings for better scalability.
+Each corpus (manuals, self-evolved rules, products, QnAs, reviews) has its own collection.
+Retrieval is hybrid: dense similarity from Chroma and BM25 over the same documents are fused with
+reciprocal-rank fusion, so exact identifiers and keywords are not lost to embedding similarity.
 """
+import asyncio
+import json
+import logging
 import os
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+import numpy as np
 from langchain_core.documents import Document
 
 from backend.config.settings import settings
+from backend.core.cache import LRUCache, bump_generation, get_generation
+from backend.core.embedding_cache import CachedEmbeddings, content_hash, normalize_query
+from backend.core.llm_gateway import llm_gateway, Priority
+from backend.core.llm_usage import usage_writer
+from backend.services.chunking import chunk_document, join_chunks, parent_id_of
+from backend.services.lexical_index import BM25Index, reciprocal_rank_fusion
+
+logger = logging.getLogger(__name__)
+
+CORPORA = ("manual", "self_evolution", "product", "qna", "review")
+
+# Metadata keys each corpus can be filtered on; filter keys a corpus does not have are ignored for it
+CORPUS_FILTER_KEYS = {
+    "manual": {"domain", "sub_category", "difficulty", "urgency"},
+    "self_evolution": {"category"},
+    "product": {"product_id", "category", "status"},
+    "qna": {"product_id", "question_type", "is_answered"},
+    "review": {"product_id", "rating"},
+}
+
+
+def _where(filters: dict) -> dict | None:
+    """{key: value | [values]} -> Chroma `where` clause."""
+    clauses = [{key: {"$in": value} if isinstance(value, (list, tuple, set)) else value} for key, value in filters.items()]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _matches(metadata: dict, filters: dict) -> bool:
+    for key, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            if metadata.get(key) not in value:
+                return False
+        elif metadata.get(key) != value:
+            return False
+    return True
+
+
+@dataclass
+class RetrievalResult:
+    """Passages chosen for a prompt, with their relevance and how the selection was made."""
+    documents: list[Document] = field(default_factory=list)
+    scores: list[float] = field(default_factory=list)
+    trace: dict = field(default_factory=dict)
+
+    @property
+    def scored(self) -> list[tuple[Document, float]]:
+        return list(zip(self.documents, self.scores))
+
+
+def _passage_tokens(doc: Document) -> int:
+    return len(doc.page_content) // 2 + 1
+
+
+def select_passages(candidates: list[tuple[Document, float]], vectors: np.ndarray) -> tuple[list[int], dict]:
+    """
+    Adaptive-k selection over scored candidates (rows of `vectors` are their unit embeddings):
+
+    1. relevance cut-off: drop candidates below RAG_MIN_RELEVANCE;
+    2. gap detection: in relevance order, stop at the first drop larger than RAG_SCORE_GAP;
+    3. MMR: pick greedily by lambda * relevance - (1 - lambda) * max similarity to the picks so far,
+       skipping near-duplicates (similarity >= RAG_DUPLICATE_SIMILARITY) outright;
+    4. budget: stop at RAG_MAX_PASSAGES or when the next passage would exceed RAG_CONTEXT_TOKEN_BUDGET
+       (the first passage is always kept).
+
+    Returns the selected candidate indices in prompt order and a trace of every decision.
+    """
+    reasons: dict[int, str] = {}
+    order = sorted(range(len(candidates)), key=lambda i: candidates[i][1], reverse=True)
+    pool, previous = [], None
+    for i in order:
+        relevance = candidates[i][1]
+        if relevance < settings.RAG_MIN_RELEVANCE:
+            reasons[i] = "below_min_relevance"
+        elif previous is not None and previous - relevance > settings.RAG_SCORE_GAP:
+            reasons[i] = "score_gap"
+        if i in reasons:
+            # Everything ranked lower is cut for the same reason
+            for j in order[order.index(i):]:
+                reasons.setdefault(j, reasons[i])
+            break
+        pool.append(i)
+        previous = relevance
+
+    selected, tokens = [], 0
+    similarity = vectors @ vectors.T if len(vectors) else np.zeros((0, 0))
+    lam = settings.RAG_MMR_LAMBDA
+    while pool:
+        def mmr(i: int) -> float:
+            redundancy = max((similarity[i, j] for j in selected), default=0.0)
+            return lam * candidates[i][1] - (1 - lam) * redundancy
+
+        best = max(pool, key=mmr)
+        pool.remove(best)
+        if selected and max(similarity[best, j] for j in selected) >= settings.RAG_DUPLICATE_SIMILARITY:
+            reasons[best] = "near_duplicate"
+            continue
+        cost = _passage_tokens(candidates[best][0])
+        if selected and (len(selected) >= settings.RAG_MAX_PASSAGES or tokens + cost > settings.RAG_CONTEXT_TOKEN_BUDGET):
+            reasons[best] = "token_budget" if len(selected) < settings.RAG_MAX_PASSAGES else "max_passages"
+            continue
+        selected.append(best)
+        tokens += cost
+
+    trace = {
+        "candidates": [
+            {
+                "id": doc.id,
+                "corpus": doc.metadata.get("source"),
+                "relevance": round(float(relevance), 4),
+                "selected": i in selected,
+                "reason": reasons.get(i),
+            }
+            for i, (doc, relevance) in enumerate(candidates)
+        ],
+        "selected": len(selected),
+        "tokens": tokens,
+        "cut": next((reasons[i] for i in order if i in reasons), None),
+    }
+    return selected, trace
+
+
+class Corpus:
+    """One Chroma collection and its BM25 mirror."""
+
+    def __init__(self, name: str, client, embeddings, refresh_pool: ThreadPoolExecutor):
+        from langchain_chroma import Chroma
+
+        self.name = name
+        self.collection_name = f"{settings.CHROMA_COLLECTION_NAME}_{name}"
+        self.vector_store = Chroma(
+            client=client,
+            collection_name=self.collection_name,
+            embedding_function=embeddings,
+        )
+        # BM25 mirror of the collection as one (index, documents, version) tuple, so a concurrent
+        # search never pairs a new index with the old document list. It is rebuilt at ingest time,
+        # at warm-up and in the background, never inside a query.
+        self._lexical: tuple[BM25Index, list[Document], tuple[int, int]] | None = None
+        self._lexical_lock = threading.Lock()
+        self._refresh_pool = refresh_pool
+        self._pending_lock = threading.Lock()
+        self._refresh_pending = False
+
+    def count(self) -> int:
+        return self.vector_store._collection.count()
+
+    def generation(self) -> int:
+        """Bumped on every ingestion write, including writes from other processes (populate_rag.py)."""
+        return get_generation(self.collection_name)
+
+    def mark_changed(self) -> None:
+        bump_generation(self.collection_name)
+
+    @property
+    def has_lexical_index(self) -> bool:
+        return self._lexical is not None
+
+    @property
+    def lexical_version(self) -> tuple[int, int] | None:
+        """Version of the BM25 mirror searches currently use (part of the result cache key)."""
+        snapshot = self._lexical
+        return snapshot[2] if snapshot is not None else None
+
+    def refresh_lexical_index(self) -> None:
+        """(Re)build the BM25 mirror from the whole collection if it changed. Blocking."""
+        with self._lexical_lock:
+            version = (self.generation(), self.count())
+            if self._lexical is not None and self._lexical[2] == version:
+                return
+            data = self.vector_store.get(include=["documents", "metadatas"])
+            docs = [
+                Document(id=doc_id, page_content=text or "", metadata=meta or {})
+                for doc_id, text, meta in zip(data["ids"], data["documents"], data["metadatas"])
+            ]
+            index = BM25Index([d.page_content for d in docs], settings.RAG_BM25_K1, settings.RAG_BM25_B)
+            self._lexical = (index, docs, version)
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh_lexical_index()
+        except Exception as e:
+            logger.error(f"BM25 인덱스 갱신 실패 ({self.name}): {e}")
+        finally:
+            with self._pending_lock:
+                self._refresh_pending = False
+
+    def lexical_snapshot(self) -> tuple[BM25Index, list[Document], tuple[int, int]] | None:
+        """
+        The current BM25 mirror, possibly one ingestion behind (None before the first build).
+        A stale or missing mirror schedules a single background rebuild.
+        """
+        snapshot = self._lexical
+        if snapshot is None or snapshot[2] != (self.generation(), self.count()):
+            with self._pending_lock:
+                if self._refresh_pending:
+                    return snapshot
+                self._refresh_pending = True
+            self._refresh_pool.submit(self._refresh_in_background)
+        return snapshot
+
+    # --- Ingestion ---
+
+    def existing_hashes(self) -> dict[str, str | None]:
+        existing = self.vector_store.get(include=["metadatas"])
+        return {doc_id: (meta or {}).get("content_hash") for doc_id, meta in zip(existing["ids"], existing["metadatas"])}
+
+    def write_batch(self, batch: list[Document], vectors: list[list[float]]) -> None:
+        self.vector_store._collection.upsert(
+            ids=[doc.id for doc in batch],
+            embeddings=vectors,
+            documents=[doc.page_content for doc in batch],
+            metadatas=[doc.metadata for doc in batch],
+        )
+
+    def delete(self, ids: list[str]) -> None:
+        self.vector_store.delete(ids=ids)
+
+    def parent_document(self, parent_id: str) -> Document | None:
+        """Reassemble a chunked document from all of its chunks."""
+        data = self.vector_store.get(where={"parent_id": parent_id}, include=["documents", "metadatas"])
+        chunks = [
+            Document(id=doc_id, page_content=text or "", metadata=meta or {})
+            for doc_id, text, meta in zip(data["ids"], data["documents"], data["metadatas"])
+        ]
+        if not chunks:
+            return None
+        metadata = {
+            key: value for key, value in chunks[0].metadata.items()
+            if key not in ("chunk_index", "chunk_count", "body_offset", "content_hash")
+        }
+        return Document(id=parent_id, page_content=join_chunks(chunks), metadata=metadata)
+
+    def vectors(self, ids: list[str]) -> dict[str, list[float]]:
+        data = self.vector_store._collection.get(ids=ids, include=["embeddings"])
+        return dict(zip(data["ids"], data["embeddings"]))
+
+    # --- Retrieval ---
+
+    def search(self, query: str, embedding: list[float], k: int, filters: dict) -> list[tuple[Document, float, float]]:
+        """
+        Top-k (document, vector relevance 0-1, fused RRF score), ordered by RRF over the dense and
+        BM25 rankings. Documents found only lexically are scored against the same query embedding,
+        so callers that threshold on relevance see comparable values either way.
+        """
+        relevance = self.vector_store._select_relevance_score_fn()
+        pool = k * settings.RAG_CANDIDATE_MULTIPLIER
+        dense = self.vector_store.similarity_search_by_vector_with_relevance_scores(
+            embedding, k=pool, filter=_where(filters)
+        )
+        scored = {doc.id: (doc, relevance(distance)) for doc, distance in dense}
+        dense_ranking = list(scored)
+        if not settings.RAG_HYBRID_ENABLED:
+            fused = [(doc_id, 1.0 / (settings.RAG_RRF_K + rank)) for rank, doc_id in enumerate(dense_ranking[:k], start=1)]
+        else:
+            snapshot = self.lexical_snapshot()
+            lexical = []
+            if snapshot is not None:
+                index, docs, _ = snapshot
+                allowed = None
+                if filters:
+                    allowed = {idx for idx, doc in enumerate(docs) if _matches(doc.metadata, filters)}
+                lexical = [docs[idx].id for idx, _ in index.search(query, pool, allowed)]
+            fused = reciprocal_rank_fusion([dense_ranking, lexical], settings.RAG_RRF_K)[:k]
+
+        missing = [doc_id for doc_id, _ in fused if doc_id not in scored]
+        if missing:
+            extra = self.vector_store.similarity_search_by_vector_with_relevance_scores(
+                embedding, k=len(missing), ids=missing
+            )
+            scored.update({doc.id: (doc, relevance(distance)) for doc, distance in extra})
+        return [scored[doc_id] + (score,) for doc_id, score in fused if doc_id in scored]
+
 
 class RAGConnector:
     def __init__(self):
-        # Initialize OpenAI Embeddings
-        self.embeddings = OpenAIEmbeddings(
-            api_key=settings.OPENAI_API_KEY,
-            model="text-embedding-3-small"
+        # Initialize OpenAI Embeddings (on the gateway's shared connection pool), behind the disk cache
+        self.embeddings = CachedEmbeddings(
+            llm_gateway.embeddings(settings.RAG_EMBEDDING_MODEL), settings.RAG_EMBEDDING_MODEL
         )
-        
-        # Initialize LangChain Chroma VectorStore
-        self.vector_store = Chroma(
-            collection_name=settings.CHROMA_COLLECTION_NAME,
-            embedding_function=self.embeddings,
-            persist_directory=settings.CHROMA_DB_PATH
+
+        # One collection per corpus on a shared Chroma client, so a CS query only pays for policy
+        # text and large review volumes cannot crowd it out
+        import chromadb  # imported here: chromadb is the slowest import of the API process
+
+        self.client = chromadb.PersistentClient(path=settings.CHROMA_DB_PATH)
+        self._lexical_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-bm25")
+        self.corpora = {name: Corpus(name, self.client, self.embeddings, self._lexical_pool) for name in CORPORA}
+        self._search_pool = ThreadPoolExecutor(max_workers=len(CORPORA), thread_name_prefix="rag-search")
+        self.result_cache = LRUCache(settings.RAG_RESULT_CACHE_SIZE, name="rag_result")
+
+    def close(self) -> None:
+        self._search_pool.shutdown(wait=True)
+        self._lexical_pool.shutdown(wait=True)
+        self.client.close()
+
+    def refresh_lexical_indexes(self, corpora: Iterable[str] | None = None) -> None:
+        """Build the BM25 mirrors up front (warm-up), so no query runs without one."""
+        if not settings.RAG_HYBRID_ENABLED:
+            return
+        for corpus in self._resolve(corpora or CORPORA):
+            corpus.refresh_lexical_index()
+
+    def corpus(self, name: str) -> Corpus:
+        if name not in self.corpora:
+            raise ValueError(f"Unknown RAG corpus: {name} (expected one of {', '.join(CORPORA)})")
+        return self.corpora[name]
+
+    # --- Ingestion ---
+
+    @staticmethod
+    def pieces(document: Document, source: str) -> list[Document]:
+        """What ingestion stores (and embeds) for a document: its chunks, or the document itself."""
+        if source in settings.RAG_CHUNKED_CORPORA:
+            return chunk_document(document, settings.RAG_CHUNK_TOKENS, settings.RAG_CHUNK_OVERLAP_TOKENS)
+        return [document]
+
+    async def aembed_batch(self, texts: list[str], caller: str = "rag.ingest") -> list[list[float]]:
+        """Embed one batch through the gateway (limits + retries); cache hits cost nothing."""
+        cached = self.embeddings.lookup(texts)
+        missing = [text for text, vector in zip(texts, cached) if vector is None]
+        if not missing:
+            return cached
+        return await llm_gateway.call(
+            lambda: self.embeddings.aembed_documents(texts),
+            model=settings.RAG_EMBEDDING_MODEL,
+            caller=caller,
+            priority=Priority.BACKGROUND,
+            estimated_tokens=sum(len(text) for text in missing) // 2 + 1,
         )
-        
-        # Create a standard retriever
-        self.retriever = self.vector_store.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 3}
+
+    async def aupsert_documents(self, documents: Iterable[Document], source: str, prune: bool = True,
+                                progress: Callable[[dict], None] | None = None) -> dict:
+        """
+        Idempotent, streaming ingestion into the corpus `source` (e.g. "manual", "review").
+        Every document needs a stable `id`. Documents whose content hash is unchanged are skipped;
+        new or changed ones are embedded in batches (bounded by count and tokens, several batches in
+        flight) and written batch by batch. With `prune`, ids of this source that no longer appear
+        are deleted. `documents` may be a generator, so a cursor can be streamed straight in.
+        Documents of RAG_CHUNKED_CORPORA are stored as section-aware chunks ("<id>#<n>").
+        Returns counts: {"added", "updated", "unchanged", "deleted", "elapsed_s"}.
+        """
+        corpus = self.corpus(source)
+        started = time.perf_counter()
+        existing = await asyncio.to_thread(corpus.existing_hashes)
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        seen: set[str] = set()
+        in_flight: set[asyncio.Task] = set()
+        write_lock = asyncio.Lock()
+
+        async def flush(batch: list[Document]) -> None:
+            vectors = await self.aembed_batch([doc.page_content for doc in batch])
+            async with write_lock:
+                await asyncio.to_thread(corpus.write_batch, batch, vectors)
+            for doc in batch:
+                stats["updated" if doc.id in existing else "added"] += 1
+            if progress:
+                progress({"source": source, "seen": len(seen), **stats})
+
+        async def drain(limit: int) -> None:
+            while len(in_flight) > limit:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                in_flight.difference_update(done)
+                for task in done:
+                    task.result()  # re-raise the first failure
+
+        parents: set[str] = set()
+        batch, batch_tokens = [], 0
+        try:
+            for parent in documents:
+                if not parent.id:
+                    raise ValueError("upsert_documents requires a stable document id")
+                if parent.id in parents:
+                    continue
+                parents.add(parent.id)
+                for doc in self.pieces(parent, source):
+                    seen.add(doc.id)
+                    metadata = {key: value for key, value in doc.metadata.items() if key != "content_hash"}
+                    metadata["source"] = source
+                    metadata["content_hash"] = content_hash(
+                        doc.page_content + json.dumps(metadata, ensure_ascii=False, sort_keys=True, default=str)
+                    )
+                    if existing.get(doc.id) == metadata["content_hash"]:
+                        stats["unchanged"] += 1
+                        continue
+                    batch.append(Document(id=doc.id, page_content=doc.page_content, metadata=metadata))
+                    batch_tokens += len(doc.page_content) // 2 + 1
+                if len(batch) >= settings.RAG_INGEST_BATCH_SIZE or batch_tokens >= settings.RAG_INGEST_BATCH_TOKENS:
+                    in_flight.add(asyncio.create_task(flush(batch)))
+                    batch, batch_tokens = [], 0
+                    await drain(settings.RAG_INGEST_CONCURRENCY - 1)
+            if batch:
+                in_flight.add(asyncio.create_task(flush(batch)))
+            await drain(0)
+        except BaseException:
+            for task in in_flight:
+                task.cancel()
+            raise
+
+        # Without `prune`, still drop leftovers of the documents just written (chunks that no longer
+        # exist after a document shrank, or its pre-chunking id)
+        stale = [
+            doc_id for doc_id in existing
+            if doc_id not in seen and (prune or parent_id_of(doc_id) in parents)
+        ]
+        for i in range(0, len(stale), settings.RAG_INGEST_BATCH_SIZE):
+            await asyncio.to_thread(corpus.delete, stale[i:i + settings.RAG_INGEST_BATCH_SIZE])
+        stats["deleted"] = len(stale)
+        if stats["added"] or stats["updated"] or stale:
+            corpus.mark_changed()
+            # A process that serves queries rebuilds its mirror now, as part of the ingestion job;
+            # ingestion-only processes (populate_rag.py) leave it to the serving process
+            if settings.RAG_HYBRID_ENABLED and corpus.has_lexical_index:
+                await asyncio.to_thread(corpus.refresh_lexical_index)
+        stats["elapsed_s"] = round(time.perf_counter() - started, 2)
+        logger.info(f"RAG 적재 완료 ({source}): {stats}")
+        return stats
+
+    def upsert_documents(self, documents: Iterable[Document], source: str, prune: bool = True,
+                         progress: Callable[[dict], None] | None = None) -> dict:
+        """Synchronous entry point for scripts; see `aupsert_documents`."""
+        async def ingest() -> dict:
+            try:
+                return await self.aupsert_documents(documents, source, prune, progress)
+            finally:
+                await usage_writer.aclose()  # the embedding calls' usage rows die with this loop otherwise
+
+        return asyncio.run(ingest())
+
+    def add_manuals(self, manuals: list[dict], progress: Callable[[dict], None] | None = None) -> dict:
+        return self.upsert_documents(filter(None, map(manual_document, manuals)), "manual", progress=progress)
+
+    def add_products(self, rows: Iterable[dict], progress: Callable[[dict], None] | None = None) -> dict:
+        return self.upsert_documents(map(product_document, rows), "product", progress=progress)
+
+    def add_qnas(self, rows: Iterable[dict], progress: Callable[[dict], None] | None = None) -> dict:
+        return self.upsert_documents(map(qna_document, rows), "qna", progress=progress)
+
+    def add_reviews(self, rows: Iterable[dict], progress: Callable[[dict], None] | None = None) -> dict:
+        return self.upsert_documents(filter(None, map(review_document, rows)), "review", progress=progress)
+
+    # --- Retrieval ---
+
+    def _resolve(self, corpora: Iterable[str] | None) -> list[Corpus]:
+        return [self.corpus(name) for name in (corpora or settings.RAG_DEFAULT_CORPORA)]
+
+    def search(self, query: str, n_results: int = 3, corpora: Iterable[str] | None = None,
+               filters: dict | None = None) -> list[tuple[Document, float]]:
+        """
+        Hybrid search over the given corpora (default: RAG_DEFAULT_CORPORA), run concurrently.
+        `filters` maps metadata keys to a value or a list of values (e.g. {"domain": "배송"},
+        {"product_id": 1000068}); each corpus applies only the keys it has. Results from the
+        corpora are merged by their fused rank score and returned with vector relevance (0-1).
+        Results are cached per (query, corpora, filters, k), the corpora's ingestion generations and
+        BM25 mirror versions, so a repeated question skips embedding and search until one changes.
+        """
+        filters = filters or {}
+        resolved = self._resolve(corpora)
+        cache_key = (
+            normalize_query(query),
+            # A rebuilt BM25 mirror changes results too, e.g. the first build after startup
+            tuple((corpus.name, corpus.generation(), corpus.lexical_version) for corpus in resolved),
+            json.dumps(filters, ensure_ascii=False, sort_keys=True, default=str),
+            n_results,
         )
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        targets = [corpus for corpus in resolved if corpus.count() > 0]
+        if not targets:
+            return []
+        embedding = self.embeddings.embed_query(query)
+
+        def run(corpus: Corpus):
+            corpus_filters = {k: v for k, v in filters.items() if k in CORPUS_FILTER_KEYS[corpus.name]}
+            return corpus.search(query, embedding, n_results, corpus_filters)
+
+        if len(targets) == 1:
+            results = run(targets[0])
+        else:
+            results = [hit for hits in self._search_pool.map(run, targets) for hit in hits]
+        results.sort(key=lambda hit: (hit[2], hit[1]), reverse=True)
+        merged = [(doc, relevance) for doc, relevance, _ in results[:n_results]]
+        self.result_cache.set(cache_key, merged)
+        return list(merged)
 
-    def retrieve_context(self, query: str, n_results: int = 3, filter_category: str = None) -> str:
+    def _unit_vectors(self, docs: list[Document]) -> np.ndarray:
+        """Embeddings of retrieved documents (from the embedding cache, else from their collection)."""
+        vectors = self.embeddings.lookup([doc.page_content for doc in docs])
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        by_corpus: dict[str, list[int]] = {}
+        for i in missing:
+            by_corpus.setdefault(docs[i].metadata.get("source", ""), []).append(i)
+        for name, indices in by_corpus.items():
+            stored = self.corpora[name].vectors([docs[i].id for i in indices]) if name in self.corpora else {}
+            for i in indices:
+                vectors[i] = stored.get(docs[i].id)
+        if not docs:
+            return np.zeros((0, 0), dtype=np.float32)
+        dim = next((len(v) for v in vectors if v is not None), 1)
+        matrix = np.array([v if v is not None else np.zeros(dim) for v in vectors], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def expand_to_parents(self, documents: list[Document], scores: list[float]) -> tuple[list[Document], list[float]]:
+        """Replace chunks by their whole parent document (once per parent, at its best chunk's position)."""
+        expanded, expanded_scores, done = [], [], set()
+        for doc, score in zip(documents, scores):
+            parent_id = doc.metadata.get("parent_id")
+            corpus = self.corpora.get(doc.metadata.get("source", ""))
+            if not parent_id or corpus is None:
+                expanded.append(doc)
+                expanded_scores.append(score)
+                continue
+            if parent_id in done:
+                continue
+            done.add(parent_id)
+            expanded.append(corpus.parent_document(parent_id) or doc)
+            expanded_scores.append(score)
+        return expanded, expanded_scores
+
+    def retrieve(self, query: str, corpora: Iterable[str] | None = None, filters: dict | None = None,
+                 expand_parents: bool | None = None) -> RetrievalResult:
+        """
+        Adaptive-k retrieval for prompts: searches RAG_CANDIDATES candidates and keeps a variable
+        number of passages (see `select_passages`). The trace records every candidate's relevance
+        and why it was cut, for tuning the thresholds. With `expand_parents` (default
+        RAG_EXPAND_PARENTS) selected chunks are widened to their whole source document.
+        """
+        candidates = self.search(query, settings.RAG_CANDIDATES, corpora, filters)
+        selected, trace = select_passages(candidates, self._unit_vectors([doc for doc, _ in candidates]))
+        documents = [candidates[i][0] for i in selected]
+        scores = [candidates[i][1] for i in selected]
+        if settings.RAG_EXPAND_PARENTS if expand_parents is None else expand_parents:
+            documents, scores = self.expand_to_parents(documents, scores)
+            trace["expanded_to_parents"] = True
+        return RetrievalResult(documents=documents, scores=scores, trace=trace)
+
+    def retrieve_context(self, query: str, n_results: int = 3, filter_category: str = None,
+                         corpora: Iterable[str] | None = None, filters: dict | None = None) -> str:
         """
         Retrieve relevant context from ChromaDB based on the query.
         """
         try:
-            # Check if empty
-            if not self.vector_store._collection or self.vector_store._collection.count() == 0:
-                return "검색된 참고 자료가 없습니다 (DB가 비어있음)."
-                
-            search_kwargs = {"k": n_results}
+            filters = dict(filters or {})
             if filter_category:
-                search_kwargs["filter"] = {"category": filter_category}
-                
-            # Use retriever directly or similarity_search
-            docs = self.vector_store.similarity_search(query, **search_kwargs)
+                filters["category"] = filter_category
+            docs = [doc for doc, _ in self.search(query, n_results, corpora, filters)]
             
             if not docs:
+                # Only the empty-result path pays for the count
+                if all(corpus.count() == 0 for corpus in self._resolve(corpora)):
+                    return "검색된 참고 자료가 없습니다 (DB가 비어있음)."
                 return "검색된 관련 문서가 없습니다."
                 
-            # Combine the content of all retrieved documents
-            context = "\n\n".join([doc.page_content for doc in docs])
-            return context
+            return format_context(docs)
             
         except Exception as e:
-            print(f"RAG retrieval error: {e}")
+            logger.error(f"RAG retrieval error: {e}")
             return "참고 자료 검색 중 오류가 발생했습니다."
 
-# Singleton instance
-rag_connector = RAGConnector()
+    def search_with_scores(self, query: str, n_results: int = 3, corpora: Iterable[str] | None = None,
+                           filters: dict | None = None) -> list[tuple[Document, float]]:
+        """
+        Retrieve documents together with their relevance scores (0-1, higher is closer).
+        Used by the CS router to decide whether a query can skip the tool-calling agent.
+        """
+        try:
+            return self.search(query, n_results, corpora, filters)
+        except Exception as e:
+            logger.error(f"RAG scored retrieval error: {e}")
+            return []
+
+
+def manual_document(manual: dict) -> Document | None:
+    """CS manual entry (cs_manuals.json) -> Document keyed by its manual_id; None if it has no RAG content."""
+    content = manual.get("content_for_rag", "")
+    if not content or not manual.get("manual_id"):
+        return None
+    metadata = {
+        "domain": manual.get("domain", ""),
+        "sub_category": manual.get("sub_category", ""),
+        "difficulty": manual.get("difficulty", ""),
+        "urgency": manual.get("urgency", ""),
+        "ai_action_rules": json.dumps(manual.get("ai_action_rules", {}), ensure_ascii=False),
+    }
+    return Document(id=manual["manual_id"], page_content=content, metadata=metadata)
+
+
+def evolution_document(log_id: str, rule: dict) -> Document:
+    """Self-evolved rule -> Document; one rule per resolved log, so re-evolving a log replaces it."""
+    content = f"Category: {rule['category']}\nTopic: {rule['topic']}\nPolicy: {rule['policy']}\nScript: {rule['script']}"
+    return Document(id=f"evolution-{log_id}", page_content=content, metadata={"category": rule["category"]})
+
+
+def _metadata(**values) -> dict:
+    """Chroma metadata only takes str/int/float/bool: drop None, stringify dates."""
+    return {
+        key: value if isinstance(value, (str, int, float, bool)) else str(value)
+        for key, value in values.items()
+        if value is not None
+    }
+
+
+def product_document(row: dict) -> Document:
+    # Stock is left out on purpose: it changes constantly and would force re-writes
+    content = f"[상품] {row['product_name']}\n카테고리: {row.get('category_name') or '-'}\n판매가: {row.get('sale_price')}원\n상태: {row.get('status') or '-'}"
+    metadata = _metadata(product_id=row["origin_product_no"], category=row.get("category_name"), status=row.get("status"))
+    return Document(id=f"product-{row['origin_product_no']}", page_content=content, metadata=metadata)
+
+
+def qna_document(row: dict) -> Document:
+    product = f"{row['product_name']} " if row.get("product_name") else ""
+    content = (
+        f"[상품 문의] {product}({row.get('question_type') or '기타'})\n"
+        f"질문: {row['question_text']}\n답변: {row.get('answer_text') or '미답변'}"
+    )
+    metadata = _metadata(
+        product_id=row.get("origin_product_no"), question_type=row.get("question_type"), is_answered=row.get("is_answered")
+    )
+    return Document(id=f"qna-{row['question_id']}", page_content=content, metadata=metadata)
+
+
+def review_document(row: dict) -> Document | None:
+    if not row.get("review_text"):
+        return None
+    product = f"{row['product_name']} " if row.get("product_name") else ""
+    content = f"[리뷰] {product}(평점 {row['rating']})\n{row['review_text']}"
+    metadata = _metadata(product_id=row.get("product_id"), rating=row.get("rating"), created_at=row.get("created_at"))
+    return Document(id=f"review-{row['review_id']}", page_content=content, metadata=metadata)
+
+
+def format_context(docs: list[Document]) -> str:
+    """Combine the content of retrieved documents into a single prompt context block."""
+    return "\n\n".join([doc.page_content for doc in docs])
+
+class VectorStoreRegistry:
+    """
+    Process-wide owner of the Chroma client and the RAGConnector built on it.
+    Opened once (application startup, or lazily on first use by scripts) and closed on shutdown,
+    so every caller shares one client, one BM25 mirror and one result cache per corpus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connector: RAGConnector | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._connector is not None
+
+    def open(self) -> RAGConnector:
+        connector = self._connector
+        if connector is None:
+            with self._lock:
+                if self._connector is None:
+                    self._connector = RAGConnector()
+                    logger.info(f"벡터 스토어 열림: {settings.CHROMA_DB_PATH}")
+                connector = self._connector
+        return connector
+
+    get = open
+
+    def close(self) -> None:
+        with self._lock:
+            connector, self._connector = self._connector, None
+        if connector is not None:
+            connector.close()
+            logger.info("벡터 스토어 닫힘")
+
+
+class _SharedConnector:
+    """`rag_connector`: forwards to the registry's connector, opening it on first use."""
+
+    def __getattr__(self, name):
+        return getattr(vector_store_registry.get(), name)
+
+
+vector_store_registry = VectorStoreRegistry()
+rag_connector = _SharedConnector()
 
 def retrieve_cs_context(query: str) -> str:
-    """Convenience function for CS Agent to retrieve context."""
-    return rag_connector.retrieve_context(query, n_results=3)
+    """Convenience function for CS Agent to retrieve context (adaptive number of passages)."""
+    try:
+        result = rag_connector.retrieve(query)
+    except Exception as e:
+        logger.error(f"RAG retrieval error: {e}")
+        return "참고 자료 검색 중 오류가 발생했습니다."
+    return format_context(result.documents) if result.documents else "검색된 관련 문서가 없습니다."
@@ -1,75 +1,189 @@
-import os
-from openai import OpenAI
+import asyncio
+import hashlib
+import logging
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-import backend.database.legacy_connector as db_connector # 데이터베이스 커넥터 임포트
+from itertools import groupby
+from backend.database.legacy import iter_reviews_in_window # 풀 연결을 사용하는 레거시 커넥터
+from backend.config.settings import settings
+from backend.core.llm_gateway import llm_gateway, Priority
+from backend.database.session import SessionLocal
+from backend.models.orm import AICache
+from backend.prompts.templates import REVIEW_SUMMARY_SYSTEM, REVIEW_CHUNK_SUMMARY_PROMPT, REVIEW_SUMMARY_REDUCE_PROMPT
 
-# 환경 변수 및 OpenAI 클라이언트 초기화
+# 환경 변수 로드 (OpenAI 클라이언트는 공용 LLM 게이트웨이를 사용)
 load_dotenv()
-client = OpenAI()
 
-def summarize_recent_negative_reviews(days: int = 7):
+logger = logging.getLogger(__name__)
+
+CHUNK_SUMMARY_ARTIFACT = "review_chunk_summary"
+
+
+def _review_line(review: dict) -> str:
+    product = f"[{review['product_name']}] " if review.get('product_name') else ""
+    return f"- {product}{review['review_text']} (평점: {review['rating']})"
+
+
+def _build_chunks(reviews, token_budget: int) -> list[dict]:
+    """
+    리뷰 스트림을 날짜별로 묶고, 하루 분량이 토큰 예산을 넘으면 예산 단위로 나눕니다.
+    청크 경계가 날짜에 맞춰지므로 기간이 겹치는 재실행에서도 같은 날의 청크는 동일한 해시를 가집니다.
+    """
+    chunks = []
+    for day, day_reviews in groupby(reviews, key=lambda r: r['created_at'].date()):
+        lines, used = [], 0
+        for review in day_reviews:
+            line = _review_line(review)
+            cost = len(line) // 2 + 1
+            if lines and used + cost > token_budget:
+                chunks.append({"day": day, "lines": lines})
+                lines, used = [], 0
+            lines.append(line)
+            used += cost
+        if lines:
+            chunks.append({"day": day, "lines": lines})
+    for chunk in chunks:
+        chunk["hash"] = hashlib.sha256("\n".join(chunk["lines"]).encode("utf-8")).hexdigest()
+    return chunks
+
+
+def _get_cached_chunk_summaries(hashes: list[str]) -> dict[str, str]:
+    """이미 요약된 청크(ai_cache)를 해시로 조회합니다."""
+    if not hashes:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(AICache.entity_id, AICache.content)
+            .filter(AICache.artifact_type == CHUNK_SUMMARY_ARTIFACT, AICache.entity_id.in_(hashes))
+            .all()
+        )
+        return {entity_id: content for entity_id, content in rows}
+    except Exception as e:
+        logger.warning(f"청크 요약 캐시 조회 오류: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def _save_chunk_summaries(chunks: list[dict], model: str) -> None:
+    if not chunks:
+        return
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        for chunk in chunks:
+            db.add(AICache(
+                artifact_type=CHUNK_SUMMARY_ARTIFACT,
+                entity_id=chunk["hash"],
+                content=chunk["summary"],
+                metadata_json={"model": model, "day": chunk["day"].isoformat(), "reviews": len(chunk["lines"])},
+                generated_at=now,
+            ))
+        db.commit()
+    except Exception as e:
+        logger.warning(f"청크 요약 캐시 저장 오류: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+async def _complete(prompt: str, max_tokens: int) -> str:
+    response = await llm_gateway.chat(
+        model=settings.REVIEW_AGENT_MODEL,
+        caller="reviews.summary",
+        priority=Priority.BACKGROUND,
+        messages=[
+            {"role": "system", "content": REVIEW_SUMMARY_SYSTEM},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=max_tokens,
+        temperature=0.2
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def _summarize_chunk(chunk: dict) -> None:
+    """Map 단계: 청크 하나를 요약합니다."""
+    prompt = REVIEW_CHUNK_SUMMARY_PROMPT.format(period=chunk["day"].isoformat(), reviews="\n".join(chunk["lines"]))
+    chunk["summary"] = await _complete(prompt, max_tokens=300)
+
+
+async def _reduce(summaries: list[str], review_count: int) -> str:
+    """
+    Reduce 단계: 청크 요약들을 최종 보고서로 합칩니다.
+    요약이 너무 많으면 예산 단위로 묶어 중간 요약을 만든 뒤 다시 합칩니다.
+    """
+    budget = settings.REVIEW_SUMMARY_REDUCE_TOKENS
+    while True:
+        groups, current, used = [], [], 0
+        for summary in summaries:
+            cost = len(summary) // 2 + 1
+            # At least two summaries per group so every round shrinks the list
+            if len(current) >= 2 and used + cost > budget:
+                groups.append(current)
+                current, used = [], 0
+            current.append(summary)
+            used += cost
+        groups.append(current)
+        if len(groups) == 1:
+            break
+        summaries = await asyncio.gather(*[
+            _complete(REVIEW_CHUNK_SUMMARY_PROMPT.format(period="중간 요약", reviews="\n\n".join(group)), max_tokens=400)
+            for group in groups
+        ])
+    prompt = REVIEW_SUMMARY_REDUCE_PROMPT.format(review_count=review_count, summaries="\n\n".join(summaries))
+    return await _complete(prompt, max_tokens=800)
+
+
+async def summarize_recent_negative_reviews(days: int = 7):
     """
     지정된 기간 동안의 부정적인 리뷰(평점 2점 이하)를 요약합니다.
+    리뷰는 SQL 필터 + 서버 사이드 커서로 스트리밍하고, 날짜별 청크를 병렬로 요약(map)한 뒤
+    하나의 보고서로 합칩니다(reduce). 청크 요약은 캐시되어 겹치는 기간을 다시 실행하면
+    새 청크만 요약합니다.
     :param days: 요약할 기간(일 수)
     :return: 부정적인 리뷰에 대한 요약 문자열
     """
-    print(f"-> 🔍 최근 {days}일간의 부정적인 리뷰 요약을 시작합니다.")
-    
-    # 1. DB에서 모든 리뷰 가져오기
-    all_reviews = db_connector.get_reviews_from_db()
-    if not all_reviews:
-        return "분석할 리뷰 데이터가 없습니다."
-
-    # 2. 최근 'days' 동안의 부정적인 리뷰 필터링
-    cutoff_date = datetime.now() - timedelta(days=days)
-    negative_reviews = [
-        review for review in all_reviews
-        if review['created_at'] >= cutoff_date and review['rating'] <= 2
-    ]
-
-    if not negative_reviews:
+    logger.info(f"최근 {days}일간의 부정적인 리뷰 요약을 시작합니다.")
+
+    # 1. DB에서 기간/평점 조건에 맞는 리뷰만 스트리밍하여 청크로 묶기 (자정 기준으로 정렬된 기간)
+    since = datetime.combine(datetime.now().date() - timedelta(days=days), datetime.min.time())
+    chunks = await asyncio.to_thread(
+        lambda: _build_chunks(iter_reviews_in_window(since, max_rating=2), settings.REVIEW_SUMMARY_CHUNK_TOKENS)
+    )
+    if not chunks:
         return f"최근 {days}일 동안 평점 2점 이하의 부정적인 리뷰가 없습니다."
+    review_count = sum(len(chunk["lines"]) for chunk in chunks)
 
-    # 3. LLM을 사용하여 요약 생성
-    review_texts = "\n".join([f"- {r['review_text']} (평점: {r['rating']})" for r in negative_reviews])
-    
-    system_prompt = f"""
-    당신은 판매 데이터를 분석하는 전문 애널리스트입니다.
-    아래에 제공된 최근 부정적인 고객 리뷰 목록을 분석하여, 주요 불만 사항과 반복되는 패턴을 요약해주세요.
-    결과는 판매자가 쉽게 이해할 수 있도록 명확하고 간결한 보고서 형식으로 작성해야 합니다.
-    """
-    
-    user_prompt = f"""
-    [최근 부정 리뷰 목록]
-    {review_texts}
-
-    [분석 및 요약 요청]
-    위 리뷰들을 바탕으로 다음 항목에 대해 요약 보고서를 작성해주세요:
-    1. 주요 불만 카테고리 (예: 제품 품질, 배송, 포장 등)
-    2. 가장 자주 언급되는 문제점
-    3. 판매자가 즉시 조치해야 할 사항 (있을 경우)
-    """
+    # 2. 캐시된 청크 요약 재사용
+    cached = await asyncio.to_thread(_get_cached_chunk_summaries, [chunk["hash"] for chunk in chunks])
+    for chunk in chunks:
+        if chunk["hash"] in cached:
+            chunk["summary"] = cached[chunk["hash"]]
+    pending = [chunk for chunk in chunks if "summary" not in chunk]
+    logger.info(f"리뷰 {review_count}건, 청크 {len(chunks)}개 (새로 요약할 청크 {len(pending)}개)")
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo", # 요약에는 저비용 모델 사용
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.2
-        )
-        summary = response.choices[0].message.content
-        print(f"-> ✅ 리뷰 요약 생성 완료.")
+        # 3. Map: 새 청크를 병렬로 요약 (동시성은 LLM 게이트웨이가 제한)
+        results = await asyncio.gather(*[_summarize_chunk(chunk) for chunk in pending], return_exceptions=True)
+        failed = [r for r in results if isinstance(r, Exception)]
+        await asyncio.to_thread(_save_chunk_summaries, [c for c in pending if "summary" in c], settings.REVIEW_AGENT_MODEL)
+        if failed:
+            raise failed[0]
+
+        # 4. Reduce: 청크 요약을 날짜순으로 합쳐 최종 보고서 생성
+        summaries = [f"[{chunk['day'].isoformat()}] {chunk['summary']}" for chunk in chunks]
+        summary = await _reduce(summaries, review_count)
+        logger.info("리뷰 요약 생성 완료.")
         return summary
     except Exception as e:
-        print(f"⚠️ 리뷰 요약 중 LLM 호출 오류 발생: {e}")
+        logger.error(f"리뷰 요약 중 LLM 호출 오류 발생: {e}")
         return "리뷰 요약 중 오류가 발생했습니다."
 
 if __name__ == '__main__':
     # 모듈 테스트
     print("--- 리뷰 분석 모듈 테스트 ---")
-    summary_report = summarize_recent_negative_reviews(days=30) # 테스트를 위해 30일로 설정
+    summary_report = asyncio.run(summarize_recent_negative_reviews(days=30)) # 테스트를 위해 30일로 설정
     print("\n[요약 보고서]\n", summary_report)
     print("--- 테스트 완료 ---")
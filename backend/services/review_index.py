@@ -0,0 +1,264 @@
+"""
+Incremental keyword / aspect index over reviews and QnAs.
+New documents are found with an anti-join against text_index_docs, analysed once, and folded
+into per-product, per-day term and aspect counters. Summaries and aspect filters then read the
+small counter tables instead of re-scanning review text. The index is refreshed by a background
+task (`index_refresher`, started with the app) rather than on request paths.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import suppress
+from datetime import date
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from backend.config.settings import settings
+from backend.database.legacy import get_unindexed_texts
+from backend.database.session import SessionLocal
+from backend.models.orm import TextIndexDoc, TextTermCount, TextAspectCount
+from backend.services.text_analyzer import (
+    ASPECTS, POSITIVE, NEGATIVE, NEUTRAL, analyze_text, keyword_polarity,
+)
+
+logger = logging.getLogger(__name__)
+
+_refresh_lock = threading.Lock()
+
+
+# --- Indexing ---
+
+def _index_batch(rows: list[dict]) -> int:
+    """Analyse and fold one batch into the index in a single transaction. Returns docs indexed."""
+    analyses = {(r["source"], r["doc_id"]): (r, analyze_text(r["text"], r["rating"])) for r in rows}
+
+    db = SessionLocal()
+    try:
+        # Claim the documents first: a concurrent indexer that got there earlier wins, and its
+        # documents are skipped here, so counts are never added twice.
+        claimed = db.execute(
+            pg_insert(TextIndexDoc)
+            .values([
+                {
+                    "source": r["source"],
+                    "doc_id": r["doc_id"],
+                    "product_id": r["product_id"],
+                    "day": r["day"],
+                    "sentiment": a.sentiment,
+                    "sentiment_score": a.score,
+                    "aspects": a.aspects,
+                }
+                for r, a in analyses.values()
+            ])
+            .on_conflict_do_nothing()
+            .returning(TextIndexDoc.source, TextIndexDoc.doc_id)
+        ).all()
+
+        terms = defaultdict(lambda: [0, 0, 0])
+        aspects = defaultdict(lambda: [0, 0, 0])
+        for key in claimed:
+            r, a = analyses[tuple(key)]
+            base = (r["source"], r["product_id"], r["day"])
+            for term in a.terms:
+                counts = terms[base + (term[:100],)]
+                counts[0] += 1
+                counts[1] += a.sentiment == POSITIVE
+                counts[2] += a.sentiment == NEGATIVE
+            for aspect, polarity in a.aspects.items():
+                counts = aspects[base + (aspect,)]
+                counts[0] += 1
+                counts[1] += polarity == POSITIVE
+                counts[2] += polarity == NEGATIVE
+
+        if terms:
+            stmt = pg_insert(TextTermCount).values([
+                {"source": s, "product_id": p, "day": d, "term": t, "doc_count": c, "positive": pos, "negative": neg}
+                for (s, p, d, t), (c, pos, neg) in terms.items()
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["source", "product_id", "day", "term"],
+                set_={
+                    "doc_count": TextTermCount.doc_count + stmt.excluded.doc_count,
+                    "positive": TextTermCount.positive + stmt.excluded.positive,
+                    "negative": TextTermCount.negative + stmt.excluded.negative,
+                },
+            ))
+        if aspects:
+            stmt = pg_insert(TextAspectCount).values([
+                {"source": s, "product_id": p, "day": d, "aspect": asp, "mentions": c, "positive": pos, "negative": neg}
+                for (s, p, d, asp), (c, pos, neg) in aspects.items()
+            ])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["source", "product_id", "day", "aspect"],
+                set_={
+                    "mentions": TextAspectCount.mentions + stmt.excluded.mentions,
+                    "positive": TextAspectCount.positive + stmt.excluded.positive,
+                    "negative": TextAspectCount.negative + stmt.excluded.negative,
+                },
+            ))
+        db.commit()
+        return len(claimed)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"리뷰 키워드 인덱싱 실패: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def refresh_index() -> int:
+    """Fold every not-yet-indexed review / QnA into the index. Returns the number of new docs."""
+    total = 0
+    with _refresh_lock:
+        while True:
+            rows = get_unindexed_texts(settings.TEXT_INDEX_BATCH_SIZE, settings.STORE_UTC_OFFSET_HOURS)
+            if not rows:
+                break
+            indexed = _index_batch(rows)
+            total += indexed
+            if indexed == 0 or len(rows) < settings.TEXT_INDEX_BATCH_SIZE:
+                break
+    if total:
+        logger.info(f"리뷰 키워드 인덱스 갱신: {total}건")
+    return total
+
+
+class IndexRefresher:
+    """Refreshes the index every TEXT_INDEX_REFRESH_INTERVAL seconds on a background task."""
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._stop: asyncio.Event | None = None
+
+    def start(self) -> None:
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.to_thread(refresh_index)
+            except Exception as e:
+                logger.error(f"리뷰 키워드 인덱스 갱신 실패: {e}")
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._stop.wait(), settings.TEXT_INDEX_REFRESH_INTERVAL)
+
+    async def aclose(self) -> None:
+        """Stop after the refresh in progress, if any (application shutdown)."""
+        if self._task is not None:
+            self._stop.set()
+            await self._task
+            self._task = None
+
+
+index_refresher = IndexRefresher()
+
+
+# --- Queries ---
+
+def _apply_filters(query, model, source: str, product_id: int | None, since: date | None):
+    query = query.filter(model.source == source)
+    if product_id is not None:
+        query = query.filter(model.product_id == product_id)
+    if since is not None:
+        query = query.filter(model.day >= since)
+    return query
+
+
+def _term_sentiment(term: str, positive: int, negative: int) -> str:
+    polarity = keyword_polarity(term)
+    if polarity:
+        return polarity
+    if positive > negative:
+        return POSITIVE
+    if negative > positive:
+        return NEGATIVE
+    return NEUTRAL
+
+
+def get_keyword_summary(source: str = "review", product_id: int | None = None,
+                        since: date | None = None, limit: int = 10) -> list[dict]:
+    """Top terms by document count: [{"word", "count", "sentiment"}]."""
+    db = SessionLocal()
+    try:
+        count = func.sum(TextTermCount.doc_count).label("count")
+        query = db.query(
+            TextTermCount.term, count, func.sum(TextTermCount.positive), func.sum(TextTermCount.negative)
+        )
+        query = _apply_filters(query, TextTermCount, source, product_id, since)
+        rows = query.group_by(TextTermCount.term).order_by(count.desc(), TextTermCount.term).limit(limit).all()
+        return [
+            {"word": term, "count": int(c), "sentiment": _term_sentiment(term, int(pos), int(neg))}
+            for term, c, pos, neg in rows
+        ]
+    except Exception as e:
+        logger.error(f"리뷰 키워드 요약 조회 실패: {e}")
+        return []
+    finally:
+        db.close()
+
+
+def _aspect_entries(rows) -> list[dict]:
+    summary = [
+        {
+            "aspect": aspect,
+            "label": ASPECTS[aspect][0] if aspect in ASPECTS else aspect,
+            "mentions": int(mentions),
+            "positive": int(pos),
+            "negative": int(neg),
+        }
+        for aspect, mentions, pos, neg in rows
+    ]
+    return sorted(summary, key=lambda a: a["mentions"], reverse=True)
+
+
+def get_aspect_summary(source: str = "review", product_id: int | None = None,
+                       since: date | None = None) -> list[dict]:
+    """Mentions and positive / negative split per aspect."""
+    db = SessionLocal()
+    try:
+        query = db.query(
+            TextAspectCount.aspect,
+            func.sum(TextAspectCount.mentions),
+            func.sum(TextAspectCount.positive),
+            func.sum(TextAspectCount.negative),
+        )
+        query = _apply_filters(query, TextAspectCount, source, product_id, since)
+        rows = query.group_by(TextAspectCount.aspect).all()
+        return _aspect_entries(rows)
+    except Exception as e:
+        logger.error(f"리뷰 관점 요약 조회 실패: {e}")
+        return []
+    finally:
+        db.close()
+
+
+def summarize_reviews(reviews: list[dict], limit: int = 10) -> tuple[list[dict], list[dict]]:
+    """
+    Keyword and aspect summaries of an already-filtered list of reviews, in the same shape as
+    get_keyword_summary / get_aspect_summary. Used for filters the counter tables do not carry
+    (rating, aspect), where the reviews are fetched anyway.
+    """
+    terms = defaultdict(lambda: [0, 0, 0])
+    aspects = defaultdict(lambda: [0, 0, 0])
+    for review in reviews:
+        a = analyze_text(review.get("review_text"), review.get("rating"))
+        for term in a.terms:
+            counts = terms[term[:100]]
+            counts[0] += 1
+            counts[1] += a.sentiment == POSITIVE
+            counts[2] += a.sentiment == NEGATIVE
+        for aspect, polarity in a.aspects.items():
+            counts = aspects[aspect]
+            counts[0] += 1
+            counts[1] += polarity == POSITIVE
+            counts[2] += polarity == NEGATIVE
+
+    top = sorted(terms.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+    keywords = [
+        {"word": term, "count": c, "sentiment": _term_sentiment(term, pos, neg)}
+        for term, (c, pos, neg) in top
+    ]
+    return keywords, _aspect_entries((aspect, *counts) for aspect, counts in aspects.items())
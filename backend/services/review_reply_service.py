@@ -0,0 +1,181 @@
+"""
+Batch review-reply generation.
+Packs several reviews into each structured-output call, runs the batches concurrently under the
+LLM gateway limits and stores every draft in ai_cache so reopening a review is instant.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator
+
+from backend.config.settings import settings
+from backend.core.llm_gateway import llm_gateway, Priority
+from backend.database.session import SessionLocal
+from backend.models.orm import AICache
+from backend.prompts.templates import REVIEW_REPLY_BATCH_SYSTEM, REVIEW_REPLY_BATCH_PROMPT
+
+logger = logging.getLogger(__name__)
+
+REVIEW_REPLY_ARTIFACT = "review_reply_draft"
+
+REPLY_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "replies": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "review_id": {"type": "string"},
+                    "reply": {"type": "string"},
+                },
+                "required": ["review_id", "reply"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["replies"],
+    "additionalProperties": False,
+}
+
+
+# --- Draft storage (Tier 2 cache) ---
+
+def get_stored_drafts(review_ids: list[str]) -> dict[str, str]:
+    """Return {review_id: draft} for reviews that already have a stored reply draft."""
+    if not review_ids:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(AICache.entity_id, AICache.content)
+            .filter(AICache.artifact_type == REVIEW_REPLY_ARTIFACT, AICache.entity_id.in_(review_ids))
+            .all()
+        )
+        return {entity_id: content for entity_id, content in rows}
+    except Exception as e:
+        logger.error(f"리뷰 답변 초안 조회 실패: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def save_drafts(drafts: dict[str, str], model: str) -> None:
+    """Insert or overwrite reply drafts."""
+    if not drafts:
+        return
+    db = SessionLocal()
+    try:
+        existing = {
+            row.entity_id: row
+            for row in db.query(AICache).filter(
+                AICache.artifact_type == REVIEW_REPLY_ARTIFACT, AICache.entity_id.in_(list(drafts))
+            )
+        }
+        now = datetime.utcnow()
+        for review_id, reply in drafts.items():
+            row = existing.get(review_id)
+            if row is None:
+                db.add(AICache(
+                    artifact_type=REVIEW_REPLY_ARTIFACT,
+                    entity_id=review_id,
+                    content=reply,
+                    metadata_json={"model": model},
+                    generated_at=now,
+                ))
+            else:
+                row.content = reply
+                row.metadata_json = {"model": model}
+                row.generated_at = now
+        db.commit()
+    except Exception as e:
+        logger.error(f"리뷰 답변 초안 저장 실패: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+# --- Generation ---
+
+def _format_batch(reviews: list[dict]) -> str:
+    return "\n".join(
+        json.dumps({
+            "review_id": r["review_id"],
+            "product_name": r.get("product_name") or "",
+            "rating": r.get("rating"),
+            "review_text": r.get("review_text") or "",
+        }, ensure_ascii=False)
+        for r in reviews
+    )
+
+
+async def _generate_batch(reviews: list[dict]) -> list[dict]:
+    """One structured-output call for a batch of reviews. Returns one result per review."""
+    model = settings.REVIEW_AGENT_MODEL
+    wanted = {r["review_id"] for r in reviews}
+    try:
+        response = await llm_gateway.chat(
+            model=model,
+            caller="reviews.reply_batch",
+            priority=Priority.BACKGROUND,
+            messages=[
+                {"role": "system", "content": REVIEW_REPLY_BATCH_SYSTEM},
+                {"role": "user", "content": REVIEW_REPLY_BATCH_PROMPT.format(reviews=_format_batch(reviews))},
+            ],
+            max_tokens=150 * len(reviews),
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "review_replies", "schema": REPLY_BATCH_SCHEMA, "strict": True},
+            },
+        )
+        replies = json.loads(response.choices[0].message.content)["replies"]
+    except Exception as e:
+        logger.error(f"리뷰 답변 배치 생성 실패 ({len(reviews)}건): {e}")
+        return [{"review_id": review_id, "error": "generation_failed"} for review_id in wanted]
+
+    drafts = {
+        item["review_id"]: item["reply"].strip()
+        for item in replies
+        if item.get("review_id") in wanted and item.get("reply", "").strip()
+    }
+    await asyncio.to_thread(save_drafts, drafts, model)
+
+    results = [{"review_id": review_id, "reply": reply, "cached": False} for review_id, reply in drafts.items()]
+    results += [{"review_id": review_id, "error": "missing_in_response"} for review_id in wanted - drafts.keys()]
+    return results
+
+
+async def generate_reply_drafts(reviews: list[dict], regenerate: bool = False) -> AsyncIterator[dict]:
+    """
+    Yield reply results as they become available:
+    stored drafts first (unless `regenerate`), then each generated batch as soon as it finishes.
+    """
+    review_ids = [r["review_id"] for r in reviews]
+    stored = {} if regenerate else await asyncio.to_thread(get_stored_drafts, review_ids)
+    for review_id in review_ids:
+        if review_id in stored:
+            yield {"review_id": review_id, "reply": stored[review_id], "cached": True}
+
+    pending = [r for r in reviews if r["review_id"] not in stored]
+    if not pending:
+        return
+    if not llm_gateway.enabled:
+        for r in pending:
+            yield {"review_id": r["review_id"], "error": "openai_api_key_missing"}
+        return
+
+    size = max(1, settings.REVIEW_REPLY_BATCH_SIZE)
+    tasks = [
+        asyncio.create_task(_generate_batch(pending[i:i + size]))
+        for i in range(0, len(pending), size)
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            for result in await finished:
+                yield result
+    finally:
+        # Client disconnected (the stream is closed early): stop the batches nobody will read
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,202 @@
+"""
+Append-only journal for self-evolved CS rules.
+Each evolved rule is one JSON line with a monotonically increasing sequence number, appended
+under an exclusive file lock, so feedback events cost O(1) regardless of manual size and
+concurrent writers (tasks, workers, processes) never lose each other's rules.
+The manual snapshot (cs_manuals.json) is only rewritten on compaction, which folds the journal
+into it atomically (temp file + rename) and truncates the journal.
+Readers replay snapshot + journal; entries are keyed by log_id, so replay is idempotent even if
+a compaction was interrupted between the rename and the truncate.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from backend.config.settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+def _lock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return
+    # msvcrt locks a byte range from the current position; LK_LOCK gives up after ~10s
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _replace_atomically(path: str, text: str) -> None:
+    """Write to a temp file in the same directory, fsync and rename over `path`."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+class RuleJournal:
+    def __init__(self, path: str, snapshot_path: str, compact_every: int):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.compact_every = compact_every
+        self.lock_path = f"{path}.lock"
+        self.seq_path = f"{path}.seq"  # "<last seq> <last compacted seq>"
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.lock_path, "a+") as lock:
+            _lock_file(lock)
+            try:
+                yield
+            finally:
+                _unlock_file(lock)
+
+    def _read_seq(self) -> tuple[int, int]:
+        try:
+            with open(self.seq_path, encoding="utf-8") as f:
+                last, compacted = f.read().split()
+                return int(last), int(compacted)
+        except (FileNotFoundError, ValueError):
+            return self._recover_seq()
+
+    def _recover_seq(self) -> tuple[int, int]:
+        # Sidecar lost or unreadable: rebuild it from the entries themselves, so sequence numbers
+        # never restart below rules already written (compacted rules keep their seq in the snapshot)
+        journal = [e["seq"] for e in self._read_journal() if isinstance(e.get("seq"), int)]
+        snapshot = [e["seq"] for e in self._read_snapshot() if isinstance(e.get("seq"), int)]
+        last = max(journal + snapshot, default=0)
+        compacted = min(journal) - 1 if journal else last
+        if last:
+            logger.warning(f"규칙 저널 시퀀스 파일을 복구합니다: last={last}, compacted={compacted}")
+        return last, compacted
+
+    def _write_seq(self, last: int, compacted: int):
+        _replace_atomically(self.seq_path, f"{last} {compacted}")
+
+    def append(self, log_id: str, rule: dict) -> int:
+        """Append one evolved rule and return its sequence number."""
+        return self.append_many([(log_id, rule)])[0]
+
+    def append_many(self, rules: list[tuple[str, dict]]) -> list[int]:
+        """Append (log_id, rule) pairs under one lock and one fsync; returns their sequence numbers."""
+        if not rules:
+            return []
+        with self._locked():
+            last, compacted = self._read_seq()
+            seqs = list(range(last + 1, last + 1 + len(rules)))
+            now = time.time()
+            lines = [
+                json.dumps({"seq": seq, "log_id": log_id, "created_at": now, **rule}, ensure_ascii=False) + "\n"
+                for seq, (log_id, rule) in zip(seqs, rules)
+            ]
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self._write_seq(seqs[-1], compacted)
+        return seqs
+
+    def last_seq(self) -> int:
+        """Sequence number of the newest entry; changes whenever any writer appends a rule."""
+        return self._read_seq()[0]
+
+    def pending(self) -> int:
+        """Entries appended since the last compaction."""
+        last, compacted = self._read_seq()
+        return last - compacted
+
+    def _read_journal(self) -> list[dict]:
+        entries = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn last line from a crashed writer; everything before it is intact
+                        logger.warning("규칙 저널의 손상된 줄을 건너뜁니다.")
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _read_snapshot(self) -> list[dict]:
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    @staticmethod
+    def _merge(snapshot: list[dict], journal: list[dict]) -> list[dict]:
+        # Re-evolving the same log replaces its rule in place; manuals (no log_id) pass through
+        merged, positions = [], {}
+        for entry in snapshot + journal:
+            log_id = entry.get("log_id")
+            if log_id is None:
+                merged.append(entry)
+            elif log_id in positions:
+                merged[positions[log_id]] = entry
+            else:
+                positions[log_id] = len(merged)
+                merged.append(entry)
+        return merged
+
+    def load(self) -> list[dict]:
+        """Manuals and evolved rules: the snapshot with the journal replayed on top."""
+        return self._merge(self._read_snapshot(), self._read_journal())
+
+    def evolved_rules(self) -> list[dict]:
+        return [entry for entry in self.load() if entry.get("log_id") is not None]
+
+    def compact(self) -> int:
+        """Fold the journal into the snapshot. Returns the number of journal entries compacted."""
+        with self._locked():
+            journal = self._read_journal()
+            last, _ = self._read_seq()
+            if not journal:
+                self._write_seq(last, last)
+                return 0
+            merged = self._merge(self._read_snapshot(), journal)
+            _replace_atomically(self.snapshot_path, json.dumps(merged, indent=4, ensure_ascii=False))
+            open(self.path, "w").close()
+            self._write_seq(last, last)
+        logger.info(f"규칙 저널 압축 완료: {len(journal)}건을 매뉴얼 스냅샷에 반영")
+        return len(journal)
+
+    def maybe_compact(self) -> int:
+        if self.pending() < self.compact_every:
+            return 0
+        return self.compact()
+
+
+rule_journal = RuleJournal(settings.RULE_JOURNAL_PATH, settings.CS_MANUALS_PATH, settings.RULE_JOURNAL_COMPACT_EVERY)
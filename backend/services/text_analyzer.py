@@ -0,0 +1,170 @@
+"""
+Lightweight Korean text analysis for reviews and QnAs.
+Rule-based on purpose (no morphological analyser dependency): josa stripping for noun-like
+terms and adjacent-noun bigrams, a canonical keyword lexicon with polarity and negation
+handling, and aspect detection (delivery, packaging, taste, expiry, price).
+"""
+import re
+from dataclasses import dataclass, field
+
+POSITIVE = "positive"
+NEGATIVE = "negative"
+NEUTRAL = "neutral"
+
+TOKEN_RE = re.compile(r"[가-힣]+|[a-zA-Z]+")
+SENTENCE_RE = re.compile(r"[^.!?~\n]+[.!?~]*")
+# Opinions on either side of "...는데", "...지만" or a comma are scored separately
+CLAUSE_RE = re.compile(r"(?<=데)\s+|(?<=지만)\s+|,")
+QUESTION_RE = re.compile(r"(\?|나요|까요|ㄹ까|인가요|되나요)\s*[.!~]*$")
+
+# Longest first so "에서" is stripped before "서"
+JOSA = sorted(
+    ["은", "는", "이", "가", "을", "를", "에", "에서", "에게", "께", "한테", "으로", "로", "와", "과",
+     "도", "만", "의", "까지", "부터", "보다", "처럼", "이랑", "랑", "이나", "나", "이요", "엔", "에는", "에선"],
+    key=len, reverse=True,
+)
+# Endings that mark a predicate (verb/adjective) rather than a noun
+PREDICATE_ENDINGS = (
+    "요", "다", "네", "죠", "고", "서", "게", "지", "데", "면", "니", "까", "어", "아", "야", "져", "워", "해", "했", "됨", "음", "듯",
+)
+STOPWORDS = {
+    "정말", "진짜", "너무", "완전", "그냥", "조금", "약간", "다음", "생각", "이거", "그거", "저거", "이번",
+    "언제", "어떻게", "제일", "가장", "문의", "문의드립니다", "안녕하세요", "감사합니다", "그리고", "근데",
+}
+
+NEGATION_BEFORE = re.compile(r"(안|못)\s*$")
+NEGATION_AFTER = re.compile(r"^\S*\s*(않|없|아니|못)")
+
+# Canonical keyword -> (polarity, pattern). The canonical form is what the summary shows.
+KEYWORD_LEXICON = {
+    "맛있어요": (POSITIVE, re.compile(r"맛있|맛나|존맛|꿀맛|맛집")),
+    "배송빠름": (POSITIVE, re.compile(r"배송.{0,6}(빠르|빠른|빨라|빨랐|빠름|빠릅)|빨리\s*(왔|도착|받)")),
+    "가성비": (POSITIVE, re.compile(r"가성비|가격\s*대비|저렴")),
+    "재구매": (POSITIVE, re.compile(r"재구매|(또|다시)\s*(시킬|살|주문|구매)")),
+    "포장꼼꼼": (POSITIVE, re.compile(r"포장.{0,6}(꼼꼼|깔끔|튼튼|완벽)")),
+    "신선해요": (POSITIVE, re.compile(r"신선|싱싱")),
+    "양많음": (POSITIVE, re.compile(r"양.{0,3}(많|푸짐|넉넉)")),
+    "만족": (POSITIVE, re.compile(r"만족|최고|추천|좋아요|좋네요|좋습니다")),
+    "배송느림": (NEGATIVE, re.compile(r"배송.{0,8}(느리|느려|느렸|늦|지연)|늦게\s*(왔|도착|받)|너무\s*느려")),
+    "포장불량": (NEGATIVE, re.compile(r"포장.{0,8}(터|찢|파손|불량|엉망)|터져|찢어져|파손|새서|샜")),
+    "맛별로": (NEGATIVE, re.compile(r"맛\s*없|맛이\s*(이상|별로|예전\s*같지)|싱거|비려|비린")),
+    "유통기한": (NEGATIVE, re.compile(r"유통\s*기한|소비\s*기한|상했|상한|쉰내|곰팡")),
+    "별로": (NEGATIVE, re.compile(r"별로|실망|최악|비추")),
+    "양적음": (NEGATIVE, re.compile(r"양.{0,3}(적|작)")),
+    "비싸요": (NEGATIVE, re.compile(r"비싸|비쌈")),
+    "환불요청": (NEGATIVE, re.compile(r"환불|반품")),
+}
+
+ASPECTS = {
+    "delivery": ("배송", re.compile(r"배송|택배|도착|출고|발송|늦게\s*(왔|도착)|빨리\s*(왔|도착)")),
+    "packaging": ("포장", re.compile(r"포장|박스|아이스팩|터져|찢어|파손|새서|샜")),
+    "taste": ("맛", re.compile(r"맛|간이|싱거|식감|조리|비려|비린")),
+    "expiry": ("유통기한/신선도", re.compile(r"유통\s*기한|소비\s*기한|신선|싱싱|상했|상한|쉰내|곰팡")),
+    "price": ("가격", re.compile(r"가격|가성비|비싸|비쌈|저렴|할인")),
+}
+
+
+@dataclass
+class TextAnalysis:
+    terms: set[str] = field(default_factory=set)
+    sentiment: str = NEUTRAL
+    score: float = 0.0
+    aspects: dict[str, str] = field(default_factory=dict)  # aspect -> polarity
+
+
+def _strip_josa(token: str) -> str:
+    for josa in JOSA:
+        if token.endswith(josa) and len(token) > len(josa):
+            return token[: -len(josa)]
+    return token
+
+
+def noun_terms(sentence: str) -> list[str]:
+    """Noun-like tokens (josa stripped, predicates and stopwords dropped) in sentence order."""
+    nouns = []
+    for token in TOKEN_RE.findall(sentence):
+        token = token.lower()
+        if token in STOPWORDS:
+            continue
+        stem = _strip_josa(token)
+        if len(stem) < 2 or stem in STOPWORDS or (stem == token and token.endswith(PREDICATE_ENDINGS)):
+            continue
+        nouns.append(stem)
+    return nouns
+
+
+def _lexicon_hits(clause: str, question: bool = False) -> list[tuple[str | None, int]]:
+    """
+    Canonical keywords in a clause with their polarity (+1/-1).
+    Negated positives flip ("안 맛있어요"); positives inside questions ("어떻게 해야 맛있나요?") are ignored.
+    """
+    hits = []
+    for keyword, (polarity, pattern) in KEYWORD_LEXICON.items():
+        match = pattern.search(clause)
+        if not match:
+            continue
+        if polarity == NEGATIVE:
+            hits.append((keyword, -1))
+        elif question:
+            continue
+        elif NEGATION_BEFORE.search(clause[:match.start()]) or NEGATION_AFTER.search(clause[match.end():]):
+            hits.append((None, -1))  # not the keyword itself, but a negative opinion
+        else:
+            hits.append((keyword, 1))
+    return hits
+
+
+def _label(score: float) -> str:
+    if score > 0:
+        return POSITIVE
+    if score < 0:
+        return NEGATIVE
+    return NEUTRAL
+
+
+def rating_polarity(rating: int | None) -> int:
+    if rating is None:
+        return 0
+    return 1 if rating >= 4 else -1 if rating <= 2 else 0
+
+
+def analyze_text(text: str | None, rating: int | None = None) -> TextAnalysis:
+    """
+    Extract terms, overall sentiment and per-aspect sentiment from one review / QnA.
+    When the lexicon finds no opinion words, the star rating (if any) decides the polarity.
+    """
+    result = TextAnalysis()
+    if not text:
+        return result
+
+    total = 0
+    aspect_scores: dict[str, int] = {}
+    for sentence in (s.strip() for s in SENTENCE_RE.findall(text)):
+        question = bool(QUESTION_RE.search(sentence))
+        for clause in CLAUSE_RE.split(sentence):
+            if not clause.strip():
+                continue
+            nouns = noun_terms(clause)
+            result.terms.update(nouns)
+            result.terms.update(f"{a} {b}" for a, b in zip(nouns, nouns[1:]))
+
+            hits = _lexicon_hits(clause, question)
+            result.terms.update(keyword for keyword, _ in hits if keyword)
+            clause_score = sum(sign for _, sign in hits)
+            total += clause_score
+
+            for aspect, (_, pattern) in ASPECTS.items():
+                if pattern.search(clause):
+                    aspect_scores[aspect] = aspect_scores.get(aspect, 0) + clause_score
+
+    fallback = rating_polarity(rating)
+    result.score = max(-1.0, min(1.0, total / 2)) if total else float(fallback) * 0.5
+    result.sentiment = _label(result.score)
+    result.aspects = {aspect: _label(score or fallback) for aspect, score in aspect_scores.items()}
+    return result
+
+
+def keyword_polarity(term: str) -> str | None:
+    """Lexicon polarity of a canonical keyword, or None for free-text terms."""
+    entry = KEYWORD_LEXICON.get(term)
+    return entry[0] if entry else None
@@ -48,6 +48,5 @@ def get_reviews_by_product(product_no: int) -> str:
     특정 상품(product_no)에 대한 리뷰 내역을 조회합니다.
     최근 고객 피드백이나 불만 사항을 확인할 때 사용합니다.
     """
-    reviews = get_reviews_from_db()
-    result = [r for r in reviews if r.get("productNo") == product_no]
-    return json.dumps(result, ensure_ascii=False)
+    result = get_reviews_from_db(product_id=product_no)
+    return json.dumps(result, ensure_ascii=False, default=str)
@@ -2,23 +2,22 @@
 CS Agent Graph using LangGraph.
 Implements a retrieval-augmented tool-calling agent.
 """
+from functools import lru_cache
+
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
 
 from backend.config.settings import settings
+from backend.core.llm_gateway import llm_gateway, Priority, estimate_tokens
 from backend.workflows.state import AgentState
 from backend.prompts.templates import CS_SYSTEM_PROMPT
-from backend.services.rag_service import retrieve_cs_context
+from backend.services.rag_service import rag_connector, format_context
 from backend.tools.customer_tools import get_customer_info, get_order_details
 from backend.tools.product_tools import get_product_info, get_qna_by_product, get_reviews_by_product
 
 
 # 1. Define tools and LLM
-# We use the small model configured in settings for CS
-llm = ChatOpenAI(model=settings.CS_AGENT_MODEL, temperature=0.1)
-
 tools = [
     get_customer_info,
     get_order_details,
@@ -27,18 +26,36 @@ tools = [
     get_reviews_by_product
 ]
 
-llm_with_tools = llm.bind_tools(tools)
+
+# Clients are built on first use (or by the startup warm-up), not at import
+@lru_cache(maxsize=None)
+def get_llm():
+    """We use the small model configured in settings for CS."""
+    return llm_gateway.chat_model(settings.CS_AGENT_MODEL, temperature=0.1)
+
+
+@lru_cache(maxsize=None)
+def get_llm_with_tools():
+    return get_llm().bind_tools(tools)
 
 
 # 2. Define graph nodes
 def retrieve(state: AgentState) -> dict:
     """RAG retrieval node — fetches CS manual context based on the user's latest message."""
+    # The orchestrator's fast-path router may already have retrieved context for this query
+    if state.get("retrieved_context"):
+        return {}
     last_message = state["messages"][-1].content
-    context = retrieve_cs_context(last_message)
-    return {"retrieved_context": context}
+    try:
+        result = rag_connector.retrieve(last_message)
+    except Exception as e:
+        print(f"RAG retrieval error: {e}")
+        return {"retrieved_context": "참고 자료 검색 중 오류가 발생했습니다.", "retrieval_trace": {}}
+    context = format_context(result.documents) if result.documents else "검색된 관련 문서가 없습니다."
+    return {"retrieved_context": context, "retrieval_trace": result.trace}
 
 
-def generate(state: AgentState) -> dict:
+async def generate(state: AgentState) -> dict:
     """LLM generation node — produces response (may include tool calls)."""
     # Inject context and store settings into the system prompt
     # TODO: Fetch actual failure logs if needed (hardcoding empty for now)
@@ -51,8 +68,14 @@ def generate(state: AgentState) -> dict:
     # Construct the message list: System + all conversation history
     messages = [SystemMessage(content=system)] + list(state["messages"])
     
-    # Invoke LLM
-    response = llm_with_tools.invoke(messages)
+    # Invoke LLM (interactive priority through the shared gateway)
+    response = await llm_gateway.call(
+        lambda: get_llm_with_tools().ainvoke(messages),
+        model=settings.CS_AGENT_MODEL,
+        caller="cs_agent",
+        priority=Priority.INTERACTIVE,
+        estimated_tokens=estimate_tokens(messages),
+    )
     
     # Track tool calls if made
     tool_calls_made = list(state.get("tool_calls_made", []))
@@ -76,25 +99,28 @@ def should_use_tools(state: AgentState) -> str:
 
 
 # 3. Build the graph
-graph_builder = StateGraph(AgentState)
-
-# Add nodes
-graph_builder.add_node("retrieve", retrieve)
-graph_builder.add_node("generate", generate)
-graph_builder.add_node("tools", ToolNode(tools))
-
-# Add edges
-graph_builder.set_entry_point("retrieve")
-graph_builder.add_edge("retrieve", "generate")
-graph_builder.add_conditional_edges(
-    "generate",
-    should_use_tools,
-    {
-        "tools": "tools",
-        END: END,
-    }
-)
-graph_builder.add_edge("tools", "generate")
+@lru_cache(maxsize=None)
+def get_cs_agent_graph():
+    """Compiled CS agent graph, built once on first use."""
+    graph_builder = StateGraph(AgentState)
+
+    # Add nodes
+    graph_builder.add_node("retrieve", retrieve)
+    graph_builder.add_node("generate", generate)
+    graph_builder.add_node("tools", ToolNode(tools))
+
+    # Add edges
+    graph_builder.set_entry_point("retrieve")
+    graph_builder.add_edge("retrieve", "generate")
+    graph_builder.add_conditional_edges(
+        "generate",
+        should_use_tools,
+        {
+            "tools": "tools",
+            END: END,
+        }
+    )
+    graph_builder.add_edge("tools", "generate")
 
-# Compile
-cs_agent_graph = graph_builder.compile()
+    # Compile
+    return graph_builder.compile()
@@ -2,13 +2,15 @@
 AI Manager Graph using LangGraph.
 Implements a top-level orchestrator agent with access to multiple store tools.
 """
+from functools import lru_cache
+
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
 from langchain_core.tools import tool
 
 from backend.config.settings import settings
+from backend.core.llm_gateway import llm_gateway, Priority, estimate_tokens
 from backend.workflows.state import AgentState
 from backend.database.legacy import (
     get_unanswered_qnas_count,
@@ -62,8 +64,14 @@ tools = [
 ]
 
 # We use the primary model (gpt-4o or gpt-4o-mini)
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-llm_with_tools = llm.bind_tools(tools)
+MANAGER_MODEL = "gpt-4o-mini"
+
+
+# Built on first use (or by the startup warm-up), not at import
+@lru_cache(maxsize=None)
+def get_llm_with_tools():
+    return llm_gateway.chat_model(MANAGER_MODEL, temperature=0).bind_tools(tools)
+
 
 # 2. Define nodes
 MANAGER_PROMPT = """당신은 StoreManager OS의 최고 AI 비즈니스 매니저입니다.
@@ -73,12 +81,18 @@ MANAGER_PROMPT = """당신은 StoreManager OS의 최고 AI 비즈니스 매니
 답변 포맷은 보기 좋게 불릿 포인트나 짧은 문단으로 구성하세요. 'AI가 분석한 결과입니다' 같은 불필요한 말은 피하세요.
 """
 
-def generate(state: AgentState) -> dict:
+async def generate(state: AgentState) -> dict:
     """LLM generation node"""
     system = MANAGER_PROMPT
     messages = [SystemMessage(content=system)] + list(state["messages"])
     
-    response = llm_with_tools.invoke(messages)
+    response = await llm_gateway.call(
+        lambda: get_llm_with_tools().ainvoke(messages),
+        model=MANAGER_MODEL,
+        caller="manager_agent",
+        priority=Priority.INTERACTIVE,
+        estimated_tokens=estimate_tokens(messages),
+    )
     
     tool_calls_made = list(state.get("tool_calls_made", []))
     if hasattr(response, "tool_calls") and response.tool_calls:
@@ -87,7 +101,7 @@ def generate(state: AgentState) -> dict:
             
     return {
         "messages": [response],
-        "model_used": "gpt-4o-mini",
+        "model_used": MANAGER_MODEL,
         "tool_calls_made": tool_calls_made
     }
 
@@ -98,19 +112,22 @@ def should_use_tools(state: AgentState) -> str:
     return END
 
 # 3. Build the graph
-graph_builder = StateGraph(AgentState)
-graph_builder.add_node("generate", generate)
-graph_builder.add_node("tools", ToolNode(tools))
-
-graph_builder.set_entry_point("generate")
-graph_builder.add_conditional_edges(
-    "generate",
-    should_use_tools,
-    {
-        "tools": "tools",
-        END: END,
-    }
-)
-graph_builder.add_edge("tools", "generate")
+@lru_cache(maxsize=None)
+def get_manager_agent_graph():
+    """Compiled manager agent graph, built once on first use."""
+    graph_builder = StateGraph(AgentState)
+    graph_builder.add_node("generate", generate)
+    graph_builder.add_node("tools", ToolNode(tools))
+
+    graph_builder.set_entry_point("generate")
+    graph_builder.add_conditional_edges(
+        "generate",
+        should_use_tools,
+        {
+            "tools": "tools",
+            END: END,
+        }
+    )
+    graph_builder.add_edge("tools", "generate")
 
-manager_agent_graph = graph_builder.compile()
+    return graph_builder.compile()
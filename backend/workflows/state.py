@@ -15,6 +15,8 @@ class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
     # Context retrieved from RAG
     retrieved_context: str
+    # Per-candidate relevance and cut reasons of that retrieval (for threshold tuning)
+    retrieval_trace: dict
     # Names of tools that were called (for logging/debugging)
     tool_calls_made: list[str]
     # Store policies and context (injected at graph start)
@@ -22,5 +24,5 @@ class AgentState(TypedDict):
     # Session metadata
     session_type: str   # "cs" | "copilot" | "review"
     customer_id: str | None
-    # Which model was used (for cost tracking)
+    # Which model was used (per-call tokens and cost are recorded in llm_usage)
     model_used: str
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from backend.agents import cs_router
+from backend.agents.cs_router import extract_script
+from backend.services.chunking import chunk_document, join_chunks, parent_id_of, split_units
+
+SCRIPT = (
+    "고객님, 배송이 늦어져 정말 죄송합니다. 오늘 중으로 택배사에 긴급 확인을 요청드렸습니다. "
+    "내일 오전까지 배송 현황을 다시 안내드리겠습니다. 불편을 드린 점 보상해 드리고자 3,000원 할인 쿠폰을 발급해 드렸습니다. "
+    "추가로 궁금하신 점이 있으시면 언제든지 문의해 주세요."
+)
+RULE = Document(
+    id="evolution-LOG-1",
+    page_content=(
+        "Category: 배송\nTopic: 택배사 사정으로 인한 배송 지연 문의\n"
+        "Policy: 택배사 사유의 지연은 택배사에 확인을 요청하고, 2영업일 이상 지연되면 할인 쿠폰을 지급한다.\n"
+        f"Script: {SCRIPT}"
+    ),
+    metadata={"category": "배송", "source": "self_evolution"},
+)
+MANUAL = Document(
+    id="manual-7",
+    page_content=(
+        "문제 정의: 상품 파손 고객 문의: 받은 상품이 깨져 있어요 "
+        "해결 흐름: 1. 파손 사진을 요청합니다. 2. 사진 확인 후 재발송 또는 환불을 선택하게 합니다. "
+        "3. 회수 택배를 접수합니다."
+    ),
+    metadata={"source": "manual"},
+)
+
+
+def test_units_follow_sections_and_steps():
+    units = split_units(MANUAL.page_content, target=80)
+    assert units[:3] == ["문제 정의: 상품 파손", "고객 문의: 받은 상품이 깨져 있어요", "해결 흐름:"]
+    assert units[3].startswith("1. ") and units[4].startswith("2. ") and units[5].startswith("3. ")
+
+
+@pytest.mark.parametrize("doc", [RULE, MANUAL])
+def test_chunks_round_trip_to_the_parent(doc):
+    chunks = chunk_document(doc, target=40, overlap=10)
+    assert len(chunks) > 1
+    assert [c.id for c in chunks] == [f"{doc.id}#{i}" for i in range(len(chunks))]
+    for index, chunk in enumerate(chunks):
+        assert chunk.metadata["parent_id"] == doc.id == parent_id_of(chunk.id)
+        assert chunk.metadata["chunk_index"] == index
+        assert chunk.metadata["chunk_count"] == len(chunks)
+        assert chunk.metadata["source"] == doc.metadata["source"]
+    # Later chunks repeat the title line (or overlap) ahead of their own body
+    assert all(c.metadata["body_offset"] > 0 for c in chunks[1:])
+    rebuilt = join_chunks(list(reversed(chunks)))
+    assert rebuilt.split() == doc.page_content.split()
+    if doc is RULE:
+        # Sections come back on their own lines, which is how rules are written
+        assert rebuilt == doc.page_content
+
+
+def test_short_document_is_one_chunk():
+    doc = Document(id="manual-1", page_content="문제 정의: 짧은 문서", metadata={})
+    [chunk] = chunk_document(doc, target=80, overlap=20)
+    assert chunk.page_content == doc.page_content
+    assert chunk.metadata["chunk_count"] == 1
+
+
+def _connector(parents: dict[str, Document]):
+    def expand_to_parents(documents, scores):
+        expanded = [parents.get(d.metadata.get("parent_id"), d) for d in documents]
+        return expanded, scores
+    return SimpleNamespace(expand_to_parents=expand_to_parents)
+
+
+def _truncated_script_chunk():
+    chunks = chunk_document(RULE, target=40, overlap=10)
+    script_chunks = [c for c in chunks if "Script:" in c.page_content]
+    # The script starts in a chunk that does not hold all of it
+    chunk = script_chunks[0]
+    assert SCRIPT not in chunk.page_content
+    return chunks, chunk
+
+
+def test_extract_script_reads_the_whole_parent_rule(monkeypatch):
+    chunks, chunk = _truncated_script_chunk()
+    parent = Document(id=RULE.id, page_content=join_chunks(chunks), metadata=RULE.metadata)
+    monkeypatch.setattr(cs_router, "rag_connector", _connector({RULE.id: parent}))
+    assert extract_script(chunk, 0.9) == SCRIPT
+
+
+def test_extract_script_refuses_a_truncated_script(monkeypatch):
+    _, chunk = _truncated_script_chunk()
+    monkeypatch.setattr(cs_router, "rag_connector", _connector({}))  # parent cannot be rebuilt
+    assert extract_script(chunk, 0.9) is None
+
+
+def test_extract_script_from_whole_documents(monkeypatch):
+    monkeypatch.setattr(cs_router, "rag_connector", _connector({}))
+    assert extract_script(RULE) == SCRIPT
+    assert extract_script(MANUAL) is None
+    # A single-chunk rule is its own parent
+    [only] = chunk_document(RULE, target=2000, overlap=20)
+    assert extract_script(only) == SCRIPT
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.config.settings import settings
+from backend.services import churn_scoring
+from backend.services.churn_scoring import _risk_level, build_features, score
+
+AS_OF = datetime(2026, 10, 19)
+
+
+@pytest.fixture(autouse=True)
+def churn_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CHURN_DEFAULT_CADENCE_DAYS", 30.0)
+    monkeypatch.setattr(settings, "CHURN_HIGH_RISK", 0.7)
+    monkeypatch.setattr(settings, "CHURN_MEDIUM_RISK", 0.4)
+
+
+def customer(customer_id, last_days_ago=None, first_days_ago=None, orders=0, lines=None, claims=0,
+             rating=None, failed_cs=0):
+    return {
+        "customer_id": customer_id,
+        "last_payment": AS_OF - timedelta(days=last_days_ago) if last_days_ago is not None else None,
+        "first_payment": AS_OF - timedelta(days=first_days_ago) if first_days_ago is not None else None,
+        "order_count": orders,
+        "order_lines": orders if lines is None else lines,
+        "claim_count": claims,
+        "avg_rating": rating,
+        "failed_cs": failed_cs,
+    }
+
+
+def test_features():
+    rows = [
+        # Orders every 10 days, last one 40 days ago: four gaps overdue
+        customer("regular", last_days_ago=40, first_days_ago=140, orders=11, lines=20, claims=5, rating=3.0, failed_cs=9),
+        customer("one_time", last_days_ago=15, first_days_ago=15, orders=1),
+        customer("never"),
+    ]
+    f = build_features(rows, AS_OF)
+    np.testing.assert_allclose(f["days_since_last_order"], [40, 15, 0])
+    np.testing.assert_allclose(f["order_cadence_days"], [10, 30, 30])
+    np.testing.assert_allclose(f["recency_months"], [40 / 30, 0.5, 0])
+    np.testing.assert_allclose(f["overdue_log"], [np.log(4), np.log(0.5), 0])
+    np.testing.assert_allclose(f["order_count_log"], np.log1p([11, 1, 0]))
+    np.testing.assert_allclose(f["claim_ratio"], [0.25, 0, 0])
+    np.testing.assert_allclose(f["rating_deficit"], [1.0, 0, 0])
+    np.testing.assert_allclose(f["failed_cs"], [5, 0, 0])
+
+
+def test_cadence_floor_and_overdue_clip():
+    rows = [customer("daily", last_days_ago=365, first_days_ago=375, orders=11)]
+    f = build_features(rows, AS_OF)
+    assert f["order_cadence_days"][0] == 7.0
+    assert f["overdue_log"][0] == 3.0
+
+
+def test_lapsed_unhappy_customer_scores_higher():
+    rows = [
+        customer("active", last_days_ago=5, first_days_ago=200, orders=20, rating=5.0),
+        customer("lapsed", last_days_ago=120, first_days_ago=200, orders=5, claims=2, rating=2.0, failed_cs=2),
+    ]
+    probability, contributions, names = score(build_features(rows, AS_OF))
+    assert probability[1] > probability[0]
+    assert ((probability > 0) & (probability < 1)).all()
+    assert names == list(churn_scoring.WEIGHTS)
+    # Contributions are relative to the population mean
+    np.testing.assert_allclose(contributions.sum(axis=0), 0, atol=1e-9)
+
+
+def test_risk_levels():
+    assert list(_risk_level(np.array([0.1, 0.4, 0.69, 0.7, 0.95]))) == ["low", "medium", "medium", "high", "high"]
+
+
+def test_refresh_stores_scores_and_top_factors(monkeypatch):
+    rows = [
+        customer("active", last_days_ago=2, first_days_ago=100, orders=12, rating=4.8),
+        customer("lapsed", last_days_ago=150, first_days_ago=200, orders=3, claims=2, rating=1.5, failed_cs=3),
+    ]
+    # Scores are relative to the latest order, not the wall clock
+    rows.append(customer("latest", last_days_ago=0, first_days_ago=60, orders=4))
+    stored = []
+    monkeypatch.setattr(churn_scoring, "get_churn_features", lambda: rows)
+    monkeypatch.setattr(churn_scoring, "_upsert", stored.extend)
+
+    result = churn_scoring.refresh_churn_scores()
+    assert result["scored"] == 3
+    assert result["as_of"] == AS_OF.isoformat()
+    records = {r["customer_id"]: r for r in stored}
+    assert records["lapsed"]["score"] > records["active"]["score"]
+    assert records["lapsed"]["risk_level"] == "high"
+    factors = records["lapsed"]["top_factors"]
+    assert 0 < len(factors) <= 3
+    assert factors[0]["feature"] == "recency_months"
+    assert all(f["contribution"] > 0 for f in factors)
+    assert records["lapsed"]["features"]["days_since_last_order"] == 150.0
+
+
+def test_refresh_without_customers(monkeypatch):
+    monkeypatch.setattr(churn_scoring, "get_churn_features", lambda: [])
+    assert churn_scoring.refresh_churn_scores()["scored"] == 0
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.config.settings import settings
+from backend.services.customer_segmentation import compute_cuts, crossed_cut_ranges, score_segments
+
+NOW = datetime(2026, 10, 19, 3, 0)
+DAY = 86400
+
+
+@pytest.fixture(autouse=True)
+def store_settings(monkeypatch):
+    monkeypatch.setattr(settings, "STORE_UTC_OFFSET_HOURS", 9)
+
+
+def customer(days_ago, frequency, monetary):
+    last = NOW - timedelta(days=days_ago) if days_ago is not None else None
+    return {"last_payment": last, "frequency": frequency, "monetary": monetary}
+
+
+def population():
+    # Customer i ordered 10 * i days ago; the more recent, the more orders and spend
+    return [customer(10 * i, 10 - i, (10 - i) * 100_000) for i in range(10)]
+
+
+def test_cuts_are_quintiles_over_buyers():
+    rows = population() + [customer(None, 0, 0)]
+    cuts = compute_cuts(rows, NOW)
+    assert cuts["recency_age"] == pytest.approx([18 * DAY, 36 * DAY, 54 * DAY, 72 * DAY])
+    assert cuts["frequency"] == pytest.approx([2.8, 4.6, 6.4, 8.2])
+    assert cuts["monetary"] == pytest.approx([280_000, 460_000, 640_000, 820_000])
+    assert compute_cuts([customer(None, 0, 0)], NOW) == {}
+
+
+def test_segments():
+    rows = population()
+    rows.append(customer(1, 1, 30_000))    # first order yesterday
+    rows.append(customer(None, 0, 0))      # never ordered
+    cuts = compute_cuts(population(), NOW)
+    segments = list(score_segments(rows, cuts, NOW))
+    assert segments[0] == "VIP"
+    assert segments[9] == "REGULAR"        # lapsed but low value
+    assert segments[-2:] == ["NEW", "NEW"]
+
+
+def test_valuable_customers_lapse_into_churn_risk_without_new_orders():
+    rows = population()
+    cuts = compute_cuts(rows, NOW)
+    assert list(score_segments(rows, cuts, NOW)).count("CHURN_RISK") == 0
+    # Same rows and cut points, scored 100 days later: every customer is older than the last cut
+    later = list(score_segments(rows, cuts, NOW + timedelta(days=100)))
+    assert later[0] == later[1] == "CHURN_RISK"
+    assert "VIP" not in later
+
+
+def test_crossed_cut_ranges_cover_customers_whose_recency_score_changed():
+    rows = population()
+    cuts = compute_cuts(rows, NOW)
+    previous_run, now = NOW, NOW + timedelta(days=10)
+    ranges = crossed_cut_ranges(cuts, previous_run, now)
+    assert len(ranges) == len(cuts["recency_age"])
+
+    def age(row, at):
+        return (at - row["last_payment"]).total_seconds()
+
+    def in_ranges(row):
+        local_day = (row["last_payment"] + timedelta(hours=9)).date()
+        return any(start <= local_day <= end for start, end in ranges)
+
+    crossed = [
+        any(age(row, previous_run) < cut <= age(row, now) for cut in cuts["recency_age"]) for row in rows
+    ]
+    # Ages 10/30/50/70 days move past the 18/36/54/72-day cuts
+    assert crossed == [i in (1, 3, 5, 7) for i in range(10)]
+    assert all(in_ranges(row) for row, hit in zip(rows, crossed) if hit)
+    # The most recent buyer is far from every cut point and is not rescored
+    assert not in_ranges(rows[0])
@@ -0,0 +1,115 @@
+from datetime import date
+
+import pytest
+
+from backend.config.settings import settings
+from backend.services import demand_forecast
+from backend.services.demand_forecast import fit_forecasts
+
+HISTORY_END = date(2026, 10, 18)
+DAYS = 56
+
+
+@pytest.fixture(autouse=True)
+def forecast_settings(monkeypatch):
+    monkeypatch.setattr(settings, "FORECAST_HISTORY_DAYS", DAYS)
+    monkeypatch.setattr(settings, "FORECAST_HORIZON_DAYS", 30)
+    monkeypatch.setattr(settings, "FORECAST_SMOOTHING_ALPHA", 0.3)
+    monkeypatch.setattr(settings, "FORECAST_SEASONAL_SHRINKAGE", 50.0)
+    monkeypatch.setattr(settings, "INVENTORY_LEAD_TIME_DAYS", 3)
+    monkeypatch.setattr(settings, "INVENTORY_REVIEW_PERIOD_DAYS", 14)
+    monkeypatch.setattr(settings, "INVENTORY_SERVICE_LEVEL", 0.95)
+
+
+def product(no, stock):
+    return {"origin_product_no": no, "product_name": f"상품 {no}", "stock_quantity": stock}
+
+
+def daily(no, quantities):
+    return [{"origin_product_no": no, "day_index": day, "quantity": qty} for day, qty in enumerate(quantities) if qty]
+
+
+def test_constant_demand():
+    [forecast] = fit_forecasts([product(1, 10)], daily(1, [5] * DAYS), HISTORY_END).values()
+    assert forecast["avg_daily_demand"] == pytest.approx(5.0)
+    assert forecast["predicted_demand_next_30_days"] == 150
+    assert forecast["safety_stock"] == 0
+    assert forecast["reorder_point"] == 15          # 3 days of lead time
+    assert forecast["recommended_reorder_qty"] == 75  # lead time + review period, minus stock
+    assert forecast["needs_reorder"] is True
+    assert forecast["days_of_cover"] == 2.0
+    assert forecast["trend_pct"] == 0.0
+
+
+def test_no_sales():
+    [forecast] = fit_forecasts([product(1, 40)], [], HISTORY_END).values()
+    assert forecast["predicted_demand_next_30_days"] == 0
+    assert forecast["recommended_reorder_qty"] == 0
+    assert forecast["needs_reorder"] is False
+    assert forecast["days_of_cover"] is None
+    assert "판매 이력이 없어" in forecast["reason"]
+
+
+def test_rising_trend_and_noise_raise_safety_stock():
+    rising = [2] * (DAYS - 14) + [4] * 14
+    noisy = [0, 6] * (DAYS // 2)
+    forecasts = fit_forecasts(
+        [product(1, 100), product(2, 100)], daily(1, rising) + daily(2, noisy), HISTORY_END
+    )
+    assert forecasts[1]["trend_pct"] == 100.0
+    assert "100% 증가" in forecasts[1]["reason"]
+    # Recent weeks weigh more than the long-run mean of ~2.5 a day
+    assert forecasts[1]["avg_daily_demand"] > 3.0
+    assert forecasts[2]["safety_stock"] > 0
+    assert forecasts[2]["reorder_point"] > forecasts[2]["safety_stock"]
+
+
+def test_weekly_pattern_is_learned():
+    # 20 units every Saturday only (2026-10-17 is a Saturday, day index DAYS - 2)
+    saturdays = [20 if (day - (DAYS - 2)) % 7 == 0 else 0 for day in range(DAYS)]
+    [forecast] = fit_forecasts([product(1, 0)], daily(1, saturdays), HISTORY_END).values()
+    # ~20 units a week over the 30-day horizon (4 Saturdays and 2 weekdays)
+    assert 60 <= forecast["predicted_demand_next_30_days"] <= 100
+
+
+def test_rows_outside_catalog_or_window_are_ignored():
+    rows = daily(1, [1] * DAYS) + [
+        {"origin_product_no": 999, "day_index": 3, "quantity": 500},
+        {"origin_product_no": 1, "day_index": DAYS, "quantity": 500},
+        {"origin_product_no": 1, "day_index": -1, "quantity": 500},
+    ]
+    forecasts = fit_forecasts([product(1, 0)], rows, HISTORY_END)
+    assert set(forecasts) == {1}
+    assert forecasts[1]["avg_daily_demand"] == pytest.approx(1.0)
+
+
+def test_empty_catalog():
+    assert fit_forecasts([], daily(1, [1] * DAYS), HISTORY_END) == {}
+
+
+def test_catalog_forecast_is_shared_as_a_dict(monkeypatch):
+    shared, computed = {}, []
+    watermark = {"order_count": 10, "last_payment_date": None, "total_stock": 5}
+
+    def compute(wm):
+        computed.append(wm)
+        return {"watermark": demand_forecast._watermark_key(wm), "generated_at": "now", "forecasts": {1: {}}}
+
+    monkeypatch.setattr(settings, "FORECAST_WATERMARK_TTL", 0)
+    monkeypatch.setattr(demand_forecast, "_memo", None)
+    monkeypatch.setattr(demand_forecast, "_compute", compute)
+    monkeypatch.setattr(demand_forecast, "get_sales_watermark", lambda: dict(watermark))
+    monkeypatch.setattr(demand_forecast, "get_shared_value", shared.get)
+    monkeypatch.setattr(demand_forecast, "set_shared_value", shared.__setitem__)
+
+    first = demand_forecast.get_catalog_forecast()
+    assert shared == {demand_forecast.CACHE_NAME: first}
+    assert demand_forecast.get_catalog_forecast() is first
+    # Another process already computed this watermark: reuse its entry
+    monkeypatch.setattr(demand_forecast, "_memo", None)
+    assert demand_forecast.get_catalog_forecast() == first
+    assert len(computed) == 1
+
+    watermark["order_count"] = 11
+    assert demand_forecast.get_catalog_forecast()["watermark"].startswith("11|")
+    assert len(computed) == 2
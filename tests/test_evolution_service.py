@@ -0,0 +1,124 @@
+import asyncio
+import json
+import zlib
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import evolution_service
+from backend.services.evolution_service import EvolutionQueue
+from backend.services.rule_journal import RuleJournal
+
+DELAY_RULE = {
+    "category": "배송",
+    "topic": "택배사 사정으로 인한 배송 지연",
+    "policy": "택배사에 확인을 요청하고 2영업일 이상 지연되면 3,000원 쿠폰을 지급한다.",
+    "script": "고객님, 배송이 늦어져 죄송합니다. 택배사에 확인을 요청드렸습니다.",
+}
+REFUND_RULE = {
+    "category": "환불",
+    "topic": "신선식품 변질 시 환불",
+    "policy": "사진을 받은 뒤 회수 없이 전액 환불한다.",
+    "script": "불편을 드려 죄송합니다. 사진 확인 후 바로 전액 환불해 드리겠습니다.",
+}
+
+
+def test_queue_closes_batches_by_size_and_window(monkeypatch):
+    monkeypatch.setattr(evolution_service.settings, "EVOLUTION_BATCH_SIZE", 3)
+    monkeypatch.setattr(evolution_service.settings, "EVOLUTION_BATCH_WINDOW_SECONDS", 0.05)
+    queue = EvolutionQueue()
+    batches = []
+
+    async def record(events):
+        batches.append([log_id for log_id, _ in events])
+
+    queue.evolve_batch = record
+
+    async def scenario():
+        for i in range(5):
+            queue.submit(f"LOG-{i}", "정답")
+        await asyncio.sleep(0.2)
+        queue.submit("LOG-late", "정답")  # after the window: a batch of its own
+        await queue.aclose()  # drains what is still queued
+
+    asyncio.run(scenario())
+    assert batches == [["LOG-0", "LOG-1", "LOG-2"], ["LOG-3", "LOG-4"], ["LOG-late"]]
+
+
+def embed(text: str) -> list[float]:
+    """Character-bigram hashing: near-identical rules get near-identical vectors."""
+    vector = [0.0] * 256
+    for a, b in zip(text, text[1:]):
+        vector[zlib.crc32((a + b).encode()) % 256] += 1.0
+    return vector
+
+
+@pytest.fixture
+def evolution(tmp_path, monkeypatch):
+    journal = RuleJournal(str(tmp_path / "rules.jsonl"), str(tmp_path / "cs_manuals.json"), compact_every=100)
+    journal.append("LOG-1", DELAY_RULE)
+    world = SimpleNamespace(journal=journal, rules=[], upserted=[], learned=[], embedded=[])
+
+    async def chat(**kwargs):
+        content = json.dumps({"rules": world.rules}, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def aembed_batch(texts, caller=None):
+        world.embedded.append(list(texts))
+        return [embed(t) for t in texts]
+
+    async def aupsert_documents(documents, source, prune):
+        world.upserted.extend(doc.id for doc in documents)
+
+    def inquiry_logs(log_ids):
+        return [{"log_id": i, "input_text": "문의", "ai_action_failed": "오답"} for i in log_ids]
+
+    monkeypatch.setattr(evolution_service, "llm_gateway", SimpleNamespace(enabled=True, chat=chat))
+    monkeypatch.setattr(evolution_service, "rag_connector", SimpleNamespace(
+        aembed_batch=aembed_batch, aupsert_documents=aupsert_documents, pieces=lambda doc, source: [doc],
+    ))
+    monkeypatch.setattr(evolution_service, "rule_journal", journal)
+    monkeypatch.setattr(evolution_service, "get_inquiry_logs_by_ids", inquiry_logs)
+    monkeypatch.setattr(evolution_service, "mark_inquiry_logs_learned", world.learned.extend)
+    monkeypatch.setattr(evolution_service.settings, "EVOLUTION_DUPLICATE_SIMILARITY", 0.9)
+    return world
+
+
+def test_duplicates_merge_into_existing_and_same_batch_rules(evolution):
+    evolution.rules = [
+        # Same incident as the learned LOG-1 rule, slightly reworded
+        {"log_ids": ["LOG-2"], **DELAY_RULE, "script": DELAY_RULE["script"] + " 곧 다시 안내드리겠습니다."},
+        {"log_ids": ["LOG-4"], **REFUND_RULE},
+        # Proposed separately by the model, but the same rule as LOG-4
+        {"log_ids": ["LOG-5"], **REFUND_RULE, "policy": REFUND_RULE["policy"] + " "},
+    ]
+    queue = EvolutionQueue()
+    stats = asyncio.run(queue.evolve_batch([("LOG-2", "a"), ("LOG-4", "b"), ("LOG-5", "c"), ("LOG-2", "d")]))
+
+    assert stats == {"events": 3, "rules": 1, "merged": 2}
+    rules = {r["log_id"]: r for r in evolution.journal.evolved_rules()}
+    assert set(rules) == {"LOG-1", "LOG-4"}
+    assert rules["LOG-1"]["merged_log_ids"] == ["LOG-2"]
+    assert rules["LOG-1"]["script"].endswith("곧 다시 안내드리겠습니다.")  # the newer correction wins
+    assert rules["LOG-4"]["merged_log_ids"] == ["LOG-5"]
+    assert sorted(evolution.upserted) == ["evolution-LOG-1", "evolution-LOG-4"]
+    assert evolution.learned == ["LOG-2", "LOG-4", "LOG-5"]
+    # One embedding call for the batch; the learned rule was embedded once, alongside it
+    assert len(evolution.embedded) == 1
+
+
+def test_rule_cache_follows_the_journal(evolution):
+    evolution.rules = [{"log_ids": ["LOG-4"], **REFUND_RULE}]
+    queue = EvolutionQueue()
+    asyncio.run(queue.evolve_batch([("LOG-4", "b")]))
+    assert queue._rules_seq == evolution.journal.last_seq() == 2
+
+    # Another worker learns a rule meanwhile; the next batch reloads it and matches against it
+    other = {**DELAY_RULE, "topic": "폭설로 인한 배송 지연"}
+    evolution.journal.append("LOG-9", other)
+    evolution.rules = [{"log_ids": ["LOG-10"], **other}]
+    stats = asyncio.run(queue.evolve_batch([("LOG-10", "e")]))
+    assert stats["merged"] == 1 and stats["rules"] == 0
+    assert {r["log_id"]: r for r in evolution.journal.evolved_rules()}["LOG-9"]["merged_log_ids"] == ["LOG-10"]
+    # Only the newly seen rule and the batch's texts were embedded; cached vectors were reused
+    assert all(evolution_service._rule_text(REFUND_RULE) not in texts for texts in evolution.embedded[1:])
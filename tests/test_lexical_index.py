@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from backend.services.lexical_index import BM25Index, reciprocal_rank_fusion, search_tokens
+
+DOCS = [
+    "[SPOIL-101] 신선식품 변질 시 전액 환불 안내",
+    "제주도로 배송되는 주문은 추가 배송비가 발생합니다",
+    "상품 1000032 재입고 일정 안내",
+    "배송 지연 시 쿠폰을 지급합니다. 배송 지연 사유를 먼저 안내합니다",
+]
+
+
+def test_tokens():
+    tokens = search_tokens("[SPOIL_101] 제주도로 배송 ABC 1000032")
+    assert "spoil-101" in tokens
+    assert {"제주도", "제주", "주도"} <= set(tokens)
+    assert {"배송", "abc", "1000032"} <= set(tokens)
+    assert search_tokens(None) == search_tokens("") == []
+
+
+def test_identifier_and_place_name_matches():
+    index = BM25Index(DOCS)
+    assert index.search("SPOIL-101 문의", 1)[0][0] == 0
+    assert index.search("제주 배송비", 1)[0][0] == 1
+    assert index.search("1000032", 4) == [(2, pytest.approx(index.search("1000032", 1)[0][1]))]
+
+
+def test_scores_follow_bm25():
+    index = BM25Index(["사과 사과 배", "사과", "배"], k1=1.2, b=0.75)
+    scores = dict(index.search("사과", 3))
+    idf = math.log(1 + (3 - 2 + 0.5) / (2 + 0.5))
+    avg_length = 5 / 3
+
+    def expected(tf, length):
+        norm = 1.2 * (1 - 0.75 + 0.75 * length / avg_length)
+        return idf * tf * 2.2 / (tf + norm)
+
+    assert set(scores) == {0, 1}
+    assert scores[0] == pytest.approx(expected(2, 3))
+    assert scores[1] == pytest.approx(expected(1, 1))
+    # Length normalisation: the one-word document outranks two mentions in a longer one
+    assert scores[1] > scores[0]
+
+
+def test_allowed_subset_and_unknown_terms():
+    index = BM25Index(DOCS)
+    assert [idx for idx, _ in index.search("배송", 4, allowed={3})] == [3]
+    assert index.search("존재하지않는단어", 4) == []
+    assert BM25Index([]).search("배송", 3) == []
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    scores = dict(fused)
+    assert fused[0][0] == "b"
+    assert scores["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert scores["a"] == pytest.approx(1 / 61)
+    assert scores["d"] == pytest.approx(1 / 62)
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "d", "c"]
+    assert reciprocal_rank_fusion([]) == []
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.core import llm_gateway
+from backend.core.llm_gateway import Priority, _PrioritySemaphore, _TokenBucket
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def scenario():
+        slots = _PrioritySemaphore(1)
+        await slots.acquire(Priority.BACKGROUND)
+        order = []
+
+        async def worker(name, priority):
+            await slots.acquire(priority)
+            order.append(name)
+            slots.release()
+
+        tasks = []
+        for name, priority in [("batch-1", Priority.BACKGROUND), ("reply", Priority.STANDARD),
+                               ("batch-2", Priority.BACKGROUND), ("chat", Priority.INTERACTIVE)]:
+            tasks.append(asyncio.create_task(worker(name, priority)))
+            await _settle()
+        assert order == []
+        slots.release()
+        await asyncio.gather(*tasks)
+        return order, slots._value
+
+    order, value = asyncio.run(scenario())
+    assert order == ["chat", "reply", "batch-1", "batch-2"]
+    assert value == 1
+
+
+def test_reserved_slots_are_kept_for_interactive_callers():
+    async def scenario():
+        slots = _PrioritySemaphore(3, reserved=1)
+        await slots.acquire(Priority.BACKGROUND)
+        await slots.acquire(Priority.STANDARD)
+        # The last slot is reserved: background work queues even though it is free
+        background = asyncio.create_task(slots.acquire(Priority.BACKGROUND))
+        await _settle()
+        assert not background.done() and slots._value == 1
+        # An interactive call jumps straight into the reserved slot
+        await asyncio.wait_for(slots.acquire(Priority.INTERACTIVE), 1)
+        assert slots._value == 0
+        slots.release()  # interactive done: still only the reserved slot free
+        await _settle()
+        assert not background.done()
+        slots.release()
+        await asyncio.wait_for(background, 1)
+        assert slots._value == 1
+
+    asyncio.run(scenario())
+
+
+def test_reservation_never_takes_every_slot():
+    assert _PrioritySemaphore(1, reserved=4)._reserved == 0
+    assert _PrioritySemaphore(4, reserved=4)._reserved == 3
+
+
+def test_cancelled_waiter_hands_a_granted_slot_on():
+    async def scenario():
+        slots = _PrioritySemaphore(1)
+        await slots.acquire(Priority.INTERACTIVE)
+        first = asyncio.create_task(slots.acquire(Priority.INTERACTIVE))
+        second = asyncio.create_task(slots.acquire(Priority.BACKGROUND))
+        await _settle()
+        # Grant the slot to `first`, then cancel it before it gets to run
+        slots.release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await asyncio.wait_for(second, 1)
+        assert slots._value == 0
+        slots.release()
+        assert slots._value == 1 and not slots._waiters
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_queued_waiter_is_skipped():
+    async def scenario():
+        slots = _PrioritySemaphore(1)
+        await slots.acquire(Priority.STANDARD)
+        queued = asyncio.create_task(slots.acquire(Priority.INTERACTIVE))
+        await _settle()
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        slots.release()
+        assert slots._value == 1 and not slots._waiters
+
+    asyncio.run(scenario())
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Swap the module's references only; the event loop keeps the real clock
+    monkeypatch.setattr(llm_gateway, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(llm_gateway, "asyncio", SimpleNamespace(sleep=clock.sleep))
+    return clock
+
+
+def test_bucket_waits_for_the_refill(clock):
+    bucket = _TokenBucket(600)  # 10 tokens per second
+    asyncio.run(bucket.take(500))
+    assert bucket.tokens == 100 and clock.slept == []
+
+    asyncio.run(bucket.take(300))
+    assert clock.slept == [pytest.approx(20.0)]
+    assert bucket.tokens == pytest.approx(0)
+
+    clock.now += 600  # refill is capped at capacity
+    bucket._refill()
+    assert bucket.tokens == 600
+
+
+def test_bucket_caps_oversized_requests_and_reconciles(clock):
+    bucket = _TokenBucket(600)
+    asyncio.run(bucket.take(10_000))  # larger than a minute's budget: waits for a full bucket at most
+    assert bucket.tokens == 0 and clock.slept == []
+
+    bucket.adjust(-200)  # estimate was 200 too high
+    assert bucket.tokens == 200
+    bucket.adjust(5_000)  # far over the estimate: debt is capped at one minute
+    assert bucket.tokens == -600
+    asyncio.run(bucket.take(60))
+    assert clock.slept == [pytest.approx(66.0)]
@@ -0,0 +1,52 @@
+import pytest
+
+from backend.agents import manager_intents
+from backend.agents.manager_intents import IntentMatch, _keyword_match, answer_manager_intent, classify_manager_intent
+
+
+@pytest.fixture(autouse=True)
+def keyword_only(monkeypatch):
+    monkeypatch.setattr(manager_intents.settings, "MANAGER_INTENT_EMBEDDINGS_ENABLED", False)
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("미답변 문의 몇 개야?", "unanswered_qnas"),
+    ("처리 안 된 반품 있어?", "pending_claims"),
+    ("클레임 대기 건수 알려줘", "pending_claims"),
+    ("재고 부족한 상품 뭐야?", "low_stock"),
+    ("이번 주 마진 제일 높은 상품", "top_margin"),
+    ("매출 상위 상품 보여줘", "top_margin"),
+    ("최근 부정 리뷰 보여줘", "negative_reviews"),
+    ("VIP 고객 명단 보여줘", "customer_segment"),
+    ("오늘 스토어 현황 알려줘", "store_kpis"),
+    ("주요 지표 요약해줘", "store_kpis"),
+])
+def test_structured_questions_take_the_keyword_path(query, intent):
+    assert _keyword_match(query) == intent
+    match = classify_manager_intent(query)
+    assert (match.intent, match.method) == (intent, "keyword")
+
+
+@pytest.mark.parametrize("query", [
+    "이번 달 수익 얼마야?",              # a figure, not a ranking
+    "순이익률 개선 방법 알려줘",
+    "재고 현황 알려줘",                   # not store-wide
+    "반품 기간은 며칠이야? 얼마나 걸려?",  # policy
+    "VIP 고객 혜택 정책 뭐야?",
+])
+def test_other_questions_go_to_the_agent(query):
+    assert _keyword_match(query) is None
+    assert classify_manager_intent(query) is None
+
+
+def test_segment_answer_tolerates_missing_totals(monkeypatch):
+    customers = [
+        {"name": "김고객", "customer_id": "customer_001", "total_spend": None, "total_orders": 1},
+        {"name": "이고객", "customer_id": "customer_002", "total_spend": 120000, "total_orders": 3},
+    ]
+    monkeypatch.setattr(manager_intents, "get_customers_by_segment", lambda segment: customers)
+    answer, function = answer_manager_intent(IntentMatch("customer_segment", "keyword", params={"segment": "VIP"}))
+    assert function == "get_customer_segment"
+    assert "누적 120,000원" in answer
+    assert "누적 0원" in answer
+    assert answer.index("이고객") < answer.index("김고객")
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import pytest
+
+from backend.config.settings import settings
+from backend.services.order_risk_engine import classify_orders, delay_phrase
+
+# Wednesday 2026-10-14, 17:00 store-local (KST)
+NOW = datetime(2026, 10, 14, 8, 0)
+
+
+@pytest.fixture(autouse=True)
+def store_settings(monkeypatch):
+    monkeypatch.setattr(settings, "STORE_UTC_OFFSET_HOURS", 9)
+    monkeypatch.setattr(settings, "ORDER_DELIVERY_SLA_DAYS", 2)
+
+
+def order(product_order_id, **overrides):
+    row = {
+        "order_id": f"ORD-{product_order_id}",
+        "product_order_id": product_order_id,
+        "customer_id": "customer_001",
+        "customer_name": "김고객",
+        "product_name": "왕갈비탕",
+        "customer_segment": "REGULAR",
+        "order_status": "배송중",
+        "payment_date": None,
+        "delivery_complete_date": None,
+        "claim_type": None,
+        "claim_reason": None,
+        "same_day_cutoff": "14:00",
+    }
+    row.update(overrides)
+    return row
+
+
+def by_id(recommendations):
+    return {r["product_order_id"]: r for r in recommendations}
+
+
+def test_business_days_late_since_expected_delivery():
+    # Paid Thu 10:00 KST (before cutoff): dispatch Thu, expected delivery Mon 10-05
+    rows = [order("A", payment_date=datetime(2026, 10, 1, 1, 0))]
+    [rec] = classify_orders(rows, now=NOW)
+    assert rec["days_late"] == 7
+    assert rec["recommended_action"] == "offer_compensation"
+    assert "배송 예정일 대비 7영업일 지연" in rec["reason"]
+    assert "배송이 7영업일 지연되어" in rec["draft_message"]
+
+
+def test_short_delay_escalates_only_for_valued_segments():
+    paid = datetime(2026, 10, 9, 1, 0)  # Fri 10:00 KST -> expected Tue 10-13, one business day late
+    rows = [order("VIP", payment_date=paid, customer_segment="VIP"), order("REG", payment_date=paid)]
+    recs = by_id(classify_orders(rows, now=NOW))
+    assert recs["VIP"]["days_late"] == recs["REG"]["days_late"] == 1
+    assert recs["VIP"]["recommended_action"] == "offer_compensation"
+    assert recs["REG"]["recommended_action"] == "send_apology_message"
+    assert "VIP 고객" in recs["VIP"]["reason"]
+
+
+def test_status_only_delay_has_no_day_count():
+    rows = [order("S", order_status="배송지연")]
+    [rec] = classify_orders(rows, now=NOW)
+    assert rec["days_late"] == 0
+    assert rec["recommended_action"] == "send_apology_message"
+    assert rec["reason"] == "배송지연 상태"
+    assert "배송이 지연되어" in rec["draft_message"]
+    assert "0영업일" not in rec["draft_message"]
+
+
+def test_dispatch_cutoff_is_store_local():
+    rows = [
+        # Mon 15:00 KST, after the 14:00 cutoff: due Tue, still unshipped on Wed
+        order("LATE", payment_date=datetime(2026, 10, 12, 6, 0), order_status="배송준비중"),
+        # Wed 15:00 KST: due Thu, not overdue yet
+        order("TODAY", payment_date=datetime(2026, 10, 14, 6, 0), order_status="결제완료"),
+    ]
+    recs = by_id(classify_orders(rows, now=NOW))
+    assert set(recs) == {"LATE"}
+    assert recs["LATE"]["recommended_action"] == "expedite_dispatch"
+    assert recs["LATE"]["reason"] == "출고 기한 경과 (미출고)"
+
+
+def test_open_claim_and_closed_orders():
+    rows = [
+        order("CLAIM", order_status="배송완료", payment_date=datetime(2026, 10, 12, 1, 0),
+              delivery_complete_date=datetime(2026, 10, 13, 1, 0), claim_type="REFUND", claim_reason="파손"),
+        order("CANCELLED", order_status="취소", payment_date=datetime(2026, 10, 1, 1, 0), claim_type="CANCEL"),
+        order("ONTIME", order_status="배송완료", payment_date=datetime(2026, 10, 12, 1, 0),
+              delivery_complete_date=datetime(2026, 10, 13, 1, 0)),
+    ]
+    recs = by_id(classify_orders(rows, now=NOW))
+    assert set(recs) == {"CLAIM"}
+    assert recs["CLAIM"]["recommended_action"] == "process_claim"
+    assert recs["CLAIM"]["reason"] == "클레임 접수(환불: 파손)"
+    assert "환불 요청을 확인했습니다" in recs["CLAIM"]["draft_message"]
+
+
+def test_sorted_by_severity():
+    rows = [
+        order("DISPATCH", payment_date=datetime(2026, 10, 12, 6, 0), order_status="배송준비중"),
+        order("LATE7", payment_date=datetime(2026, 10, 1, 1, 0)),
+        order("STATUS", order_status="배송지연"),
+        order("CLAIM", claim_type="EXCHANGE"),
+    ]
+    assert [r["product_order_id"] for r in classify_orders(rows, now=NOW)] == ["LATE7", "CLAIM", "STATUS", "DISPATCH"]
+
+
+def test_empty_and_delay_phrase():
+    assert classify_orders([], now=NOW) == []
+    assert delay_phrase(0) == "지연되어"
+    assert delay_phrase(3) == "3영업일 지연되어"
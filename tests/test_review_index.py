@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from backend.api.routers import reviews as reviews_router
+from backend.services.review_index import summarize_reviews
+
+REVIEWS = [
+    {"review_text": "배송이 너무 느려요. 맛은 좋아요", "rating": 2},
+    {"review_text": "배송 빠르고 포장 꼼꼼해요", "rating": 5},
+    {"review_text": None, "rating": 3},
+]
+
+
+def test_summaries_of_fetched_reviews():
+    keywords, aspects = summarize_reviews(REVIEWS, limit=3)
+    assert len(keywords) == 3
+    assert keywords[0] == {"word": "배송", "count": 2, "sentiment": "neutral"}
+    counts = [k["count"] for k in keywords]
+    assert counts == sorted(counts, reverse=True)
+
+    by_aspect = {a["aspect"]: a for a in aspects}
+    assert aspects[0]["aspect"] == "delivery"
+    assert by_aspect["delivery"] == {"aspect": "delivery", "label": "배송", "mentions": 2, "positive": 1, "negative": 1}
+    assert by_aspect["packaging"]["positive"] == 1
+    assert summarize_reviews([]) == ([], [])
+
+
+def test_since_is_a_store_local_day(monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return cls(2026, 10, 18, 16, 30)  # already 10-19 01:30 in the store (UTC+9)
+
+    monkeypatch.setattr(reviews_router, "datetime", FrozenDatetime)
+    monkeypatch.setattr(reviews_router.settings, "STORE_UTC_OFFSET_HOURS", 9)
+    assert str(reviews_router._local_since(7)) == "2026-10-12"
+    assert reviews_router._local_since(None) is None
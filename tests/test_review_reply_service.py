@@ -0,0 +1,33 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.services import review_reply_service
+
+
+def test_closing_the_stream_cancels_unfinished_batches(monkeypatch):
+    cancelled = []
+
+    async def generate_batch(reviews):
+        review_id = reviews[0]["review_id"]
+        try:
+            await asyncio.sleep(0 if review_id == "R-0" else 10)
+        except asyncio.CancelledError:
+            cancelled.append(review_id)
+            raise
+        return [{"review_id": review_id, "reply": "감사합니다", "cached": False}]
+
+    monkeypatch.setattr(review_reply_service, "_generate_batch", generate_batch)
+    monkeypatch.setattr(review_reply_service, "llm_gateway", SimpleNamespace(enabled=True))
+    monkeypatch.setattr(review_reply_service.settings, "REVIEW_REPLY_BATCH_SIZE", 1)
+
+    async def read_one_then_disconnect():
+        drafts = review_reply_service.generate_reply_drafts(
+            [{"review_id": f"R-{i}"} for i in range(3)], regenerate=True
+        )
+        first = await anext(drafts)
+        await drafts.aclose()
+        return first
+
+    first = asyncio.run(read_one_then_disconnect())
+    assert first["review_id"] == "R-0"
+    assert sorted(cancelled) == ["R-1", "R-2"]
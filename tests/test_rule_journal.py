@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from backend.services.rule_journal import RuleJournal
+
+MANUAL = {"manual_id": "M-1", "domain": "배송", "content": "배송 지연 안내"}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    snapshot = tmp_path / "cs_manuals.json"
+    snapshot.write_text(json.dumps([MANUAL], ensure_ascii=False), encoding="utf-8")
+    return RuleJournal(str(tmp_path / "rules.jsonl"), str(snapshot), compact_every=3)
+
+
+def rule(topic):
+    return {"category": "배송", "topic": topic}
+
+
+def test_append_and_replay(journal):
+    assert journal.append("LOG-1", rule("지연")) == 1
+    assert journal.append_many([("LOG-2", rule("파손")), ("LOG-1", rule("지연 재학습"))]) == [2, 3]
+    assert journal.last_seq() == 3 and journal.pending() == 3
+
+    loaded = journal.load()
+    assert loaded[0] == MANUAL
+    # Re-evolving LOG-1 replaces its rule in place
+    assert [(r["log_id"], r["topic"]) for r in loaded[1:]] == [("LOG-1", "지연 재학습"), ("LOG-2", "파손")]
+    assert len(journal.evolved_rules()) == 2
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(journal):
+    journal.append_many([("LOG-1", rule("지연")), ("LOG-2", rule("파손"))])
+    assert journal.maybe_compact() == 0  # below compact_every
+    before = journal.load()
+
+    assert journal.compact() == 2
+    assert open(journal.path).read() == ""
+    assert json.load(open(journal.snapshot_path, encoding="utf-8")) == before
+    assert journal.pending() == 0
+    # Sequence numbers continue after compaction
+    assert journal.append("LOG-3", rule("환불")) == 3
+    assert journal.compact() == 1
+    assert journal.compact() == 0
+
+
+def test_replay_is_idempotent_after_an_interrupted_compaction(journal):
+    journal.append_many([("LOG-1", rule("지연")), ("LOG-2", rule("파손"))])
+    expected = journal.load()
+    # Crash between the snapshot rename and the journal truncate: entries exist in both
+    with open(journal.snapshot_path, "w", encoding="utf-8") as f:
+        json.dump(expected, f, ensure_ascii=False)
+    assert journal.load() == expected
+    assert journal.compact() == 2
+    assert journal.load() == expected
+
+
+def test_torn_last_line_is_skipped(journal):
+    journal.append_many([("LOG-1", rule("지연")), ("LOG-2", rule("파손"))])
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 3, "log_id": "LOG-3", "top')
+    assert [r["log_id"] for r in journal.evolved_rules()] == ["LOG-1", "LOG-2"]
+
+
+@pytest.mark.parametrize("damage", ["missing", "garbage"])
+def test_sequence_is_recovered_from_the_entries(journal, damage):
+    journal.append_many([("LOG-1", rule("지연")), ("LOG-2", rule("파손"))])
+    journal.compact()
+    journal.append("LOG-3", rule("환불"))
+
+    if damage == "missing":
+        os.remove(journal.seq_path)
+    else:
+        with open(journal.seq_path, "w") as f:
+            f.write("3 ")
+
+    assert journal.last_seq() == 3
+    assert journal.pending() == 1
+    assert journal.append("LOG-4", rule("교환")) == 4